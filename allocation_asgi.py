@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the allocation engine with push-based real-time monitoring
+Every route of app.py is served unchanged from a thread pool, except the
+Server-Sent Events feed (/api/realtime/stream/<session_id>), which runs on the
+event loop: an open dashboard costs a coroutine and a small queue rather than a
+server thread, so one process holds hundreds of streams.
+
+    uvicorn allocation_asgi:app --host 0.0.0.0 --port 5001
+
+Monitoring sessions and their event broker are in-memory, so run one process.
+Tuning: WSGI_THREADS (threads for the Flask routes, default 16),
+REALTIME_MAX_STREAMS (open streams, default 500).
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as service
+from src.admission import REJECTED, overloaded_body
+from src.database import migrate_schema
+
+WSGI_THREADS = int(os.environ.get('WSGI_THREADS', 16))
+
+
+class EventStreamResponse(StreamingResponse):
+    """Streaming response that runs `on_close` however the stream ends, even before its first event"""
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, media_type='text/event-stream', headers=service.SSE_HEADERS, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+async def stream_realtime_updates(request):
+    slots = service.stream_slots
+    if slots.acquire() == REJECTED:
+        return JSONResponse(overloaded_body(slots), status_code=503,
+                            headers={'Retry-After': str(slots.retry_after)})
+
+    session_id = request.path_params['session_id']
+    monitor = service.realtime_monitor
+    loop = asyncio.get_running_loop()
+    # Session lookups may read the spill file, so they stay off the loop
+    subscription = await run_in_threadpool(monitor.subscribe, session_id, loop)
+    if subscription is None:
+        slots.release()
+        return JSONResponse({'success': False, 'message': 'Session not found'}, status_code=404)
+
+    monitor.ensure_demo_feed(service.REALTIME_DEMO_INTERVAL)
+    snapshot = await run_in_threadpool(monitor.session_metrics, session_id)
+
+    async def events():
+        yield service.SSE_RETRY
+        yield service.sse_message('snapshot', {'session_metrics': snapshot})
+        while True:
+            message = await subscription.get(timeout=service.REALTIME_KEEPALIVE_SECONDS)
+            yield service.SSE_KEEPALIVE if message is None else service.sse_message('update', message)
+
+    def close():
+        subscription.close()
+        slots.release()
+
+    return EventStreamResponse(events(), close)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    with service.app.app_context():
+        migrate_schema(service.db)
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/api/realtime/stream/{session_id}', stream_realtime_updates, methods=['GET']),
+        Mount('/', app=WSGIMiddleware(service.app, workers=WSGI_THREADS)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Starting PM Smart Allocation Engine (asyncio streams)...")
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), log_level='warning')
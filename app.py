@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 import os
@@ -7,24 +7,81 @@ import uuid
 from datetime import datetime, timedelta
 
 # Import our custom modules
-from src.models import db, Intern, Project, Mentor, Allocation, AllocationHistory, YojanaCompliance
+from src.database import configure_database, init_database, migrate_schema
+from src.models import db, Intern, Project, Mentor, Allocation, AllocationHistory, YojanaCompliance, ACTIVE_ALLOCATION_STATUSES, skill_candidate_pairs
+from src.models import report_counters_enabled, yojana_report_totals
+from src.compliance import stream_bulk_compliance
+from src.admission import REJECTED, ConcurrencyLimiter, overloaded_body
+from src.cache import TTLSnapshot
+from src.feature_store import AllocationFeatureStore
+from src.metrics import RequestMetrics
+from src.profiling import RequestProfiler
 from src.allocation_engine import SmartAllocationEngine, RealTimeAllocationMonitor, AIInsightsGenerator, AllocationChatBot
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'smart-allocation-engine-secret-key'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pm_allocation.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['YOJANA_REPORT_COUNTERS'] = os.environ.get('YOJANA_REPORT_COUNTERS', '0') == '1'
+configure_database(app)
 
 # Initialize extensions
-db.init_app(app)
+init_database(app, db)
 CORS(app)
 
+# Real-time stream settings (seconds); the demo feed simulates events for watched sessions
+REALTIME_KEEPALIVE_SECONDS = 15
+REALTIME_DEMO_INTERVAL = float(os.environ.get('REALTIME_DEMO_INTERVAL', 0))
+# Open streams per process; allocation_asgi.py serves them as coroutines, not threads
+REALTIME_MAX_STREAMS = int(os.environ.get('REALTIME_MAX_STREAMS', 500))
+stream_slots = ConcurrencyLimiter(max_concurrent=REALTIME_MAX_STREAMS, retry_after=5)
+
 # Initialize AI components
 allocation_engine = SmartAllocationEngine()
-realtime_monitor = RealTimeAllocationMonitor()
+realtime_monitor = RealTimeAllocationMonitor(
+    allocation_engine,
+    max_events=int(os.environ.get('REALTIME_MAX_EVENTS', 200)),
+    max_sessions=int(os.environ.get('REALTIME_MAX_SESSIONS', 100)),
+    ttl_seconds=float(os.environ.get('REALTIME_SESSION_TTL', 3600)),
+    memory_budget_bytes=int(float(os.environ.get('REALTIME_MEMORY_BUDGET_MB', 64)) * 1024 * 1024),
+    # Optional SQLite file shared by workers so sessions survive eviction and restarts
+    spill_path=os.environ.get('REALTIME_SPILL_PATH') or None
+)
 insights_generator = AIInsightsGenerator()
-ai_chatbot = AllocationChatBot(allocation_engine)
+# Chatbot answers come from aggregate queries; cached per (intent, allocation version)
+allocation_features = AllocationFeatureStore(version_ttl=float(os.environ.get('CHATBOT_VERSION_TTL', 1)))
+ai_chatbot = AllocationChatBot(allocation_engine, feature_store=allocation_features)
+
+# Request and model metrics, exported on GET /metrics
+request_metrics = RequestMetrics(app, namespace='smart_allocation')
+request_metrics.registry.gauge_callback(
+    'smart_allocation_model_info', 'Allocation engine version and training state',
+    lambda: {('SmartEngine_v1.0', str(allocation_engine.is_trained).lower()): 1},
+    labelnames=('version', 'trained'))
+request_metrics.registry.gauge_callback(
+    'smart_allocation_realtime_sessions', 'Live real-time monitoring sessions',
+    lambda: len(realtime_monitor.active_sessions))
+request_metrics.registry.gauge_callback(
+    'smart_allocation_realtime_session_bytes', 'Estimated memory held by live monitoring sessions',
+    lambda: realtime_monitor.active_sessions.stats()['estimated_bytes'])
+request_metrics.registry.gauge_callback(
+    'smart_allocation_realtime_session_evictions', 'Monitoring sessions evicted from memory',
+    lambda: realtime_monitor.active_sessions.evictions)
+request_metrics.registry.gauge_callback(
+    'smart_allocation_realtime_subscribers', 'Connected real-time stream clients',
+    lambda: realtime_monitor.broker.subscriber_count())
+request_metrics.registry.gauge_callback(
+    'smart_allocation_realtime_streams_rejected', 'Real-time streams refused because the worker was at REALTIME_MAX_STREAMS',
+    lambda: stream_slots.outcomes[REJECTED])
+request_metrics.registry.gauge_callback(
+    'smart_allocation_insights_history_size', 'Insight batches retained in memory',
+    lambda: len(insights_generator.insights_history))
+request_metrics.registry.gauge_callback(
+    'smart_allocation_insights_cache_hits', 'Insight requests served from the per-batch cache',
+    lambda: insights_generator.cache_hits)
+
+# Opt-in sampled profiling of the allocation run (see /admin/profiling)
+request_profiler = RequestProfiler(app, endpoints=['generate_allocations'])
 
 # API Routes
 
@@ -47,6 +104,15 @@ def health_check():
         }
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: only report ready when the database answers"""
+    try:
+        db.session.execute(db.text('SELECT 1'))
+        return jsonify({'status': 'ready', 'pid': os.getpid()})
+    except Exception as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+
 # Intern Management APIs
 @app.route('/api/interns', methods=['GET', 'POST'])
 def manage_interns():
@@ -78,8 +144,12 @@ def manage_interns():
         return jsonify({'message': 'Intern created successfully', 'id': intern.id}), 201
     
     else:
-        # Get all interns
-        interns = Intern.query.all()
+        # Get all interns, optionally filtered by skill (?skill=Python&min_proficiency=7)
+        skill = request.args.get('skill')
+        if skill:
+            interns = Intern.with_skill(skill, request.args.get('min_proficiency', 0, type=int)).all()
+        else:
+            interns = Intern.query.all()
         return jsonify([{
             'id': intern.id,
             'name': intern.name,
@@ -227,27 +297,37 @@ def manage_mentors():
 def generate_allocations():
     """Main allocation generation endpoint"""
     try:
-        # Get all unallocated interns
-        allocated_intern_ids = db.session.query(Allocation.intern_id).filter(
-            Allocation.status.in_(['pending', 'active'])
-        ).all()
-        allocated_intern_ids = [id[0] for id in allocated_intern_ids]
+        # Get all unallocated interns (NOT EXISTS anti-join, resolved by the status indexes)
+        intern_allocated = db.session.query(Allocation.id).filter(
+            Allocation.status.in_(ACTIVE_ALLOCATION_STATUSES),
+            Allocation.intern_id == Intern.id
+        ).exists()
         
-        interns = Intern.query.filter(~Intern.id.in_(allocated_intern_ids)).all()
+        available_interns = Intern.query.filter(~intern_allocated)
+        interns = available_interns.all()
         
         # Get available projects
-        allocated_project_ids = db.session.query(Allocation.project_id).filter(
-            Allocation.status.in_(['pending', 'active'])
-        ).all()
-        allocated_project_ids = [id[0] for id in allocated_project_ids]
+        project_allocated = db.session.query(Allocation.id).filter(
+            Allocation.status.in_(ACTIVE_ALLOCATION_STATUSES),
+            Allocation.project_id == Project.id
+        ).exists()
         
-        projects = Project.query.filter(~Project.id.in_(allocated_project_ids)).all()
+        available_projects = Project.query.filter(~project_allocated)
+        projects = available_projects.all()
         
         # Get available mentors
         mentors = Mentor.query.all()
         
+        # Candidate generation from the normalized skill tables
+        candidate_projects = skill_candidate_pairs(
+            available_interns.with_entities(Intern.id),
+            available_projects.with_entities(Project.id)
+        )
+        
         # Generate allocations
-        result = allocation_engine.generate_optimal_allocation(interns, projects, mentors)
+        result = allocation_engine.generate_optimal_allocation(
+            interns, projects, mentors, constraints={'candidate_projects': candidate_projects}
+        )
         
         # Save allocations to database
         saved_allocations = []
@@ -277,14 +357,17 @@ def generate_allocations():
             total_mentors=len(mentors),
             average_match_score=result['average_score'],
             allocation_time_seconds=result['processing_time'],
-            algorithm_version=result['algorithm_version']
+            algorithm_version=result['algorithm_version'],
+            run_metrics=json.dumps(result['metrics'])
         )
         
         db.session.add(history)
         db.session.commit()
+        dashboard_snapshot.invalidate()
+        allocation_features.invalidate()
         
         # Generate AI insights
-        insights = insights_generator.generate_advanced_insights(result)
+        insights = insights_generator.generate_advanced_insights(result['allocations'], batch_id=batch_id, memoize=True)
         
         # Start real-time monitoring
         realtime_monitor.start_monitoring_session(batch_id, result['allocations'])
@@ -296,7 +379,8 @@ def generate_allocations():
             'summary': {
                 'total_allocations': result['total_matches'],
                 'average_score': result['average_score'],
-                'processing_time': result['processing_time']
+                'processing_time': result['processing_time'],
+                'metrics': result['metrics']
             },
             'insights': insights
         })
@@ -360,6 +444,14 @@ def submit_feedback(allocation_id):
     allocation.updated_at = datetime.now()
     
     db.session.commit()
+    allocation_features.invalidate()
+    
+    realtime_monitor.record_allocation_event(allocation.intern_id, allocation.project_id, {
+        'type': 'feedback_received',
+        'message': f'Feedback received for allocation {allocation.id}',
+        'allocation_id': allocation.id,
+        'project_rating': allocation.project_rating
+    })
     
     return jsonify({'message': 'Feedback submitted successfully'})
 
@@ -374,19 +466,70 @@ def get_realtime_updates(session_id):
         return jsonify({
             'success': True,
             'update': update,
-            'session_metrics': realtime_monitor.active_sessions.get(session_id, {}).get('metrics', {})
+            'session_metrics': realtime_monitor.session_metrics(session_id)
         })
     else:
         return jsonify({'success': False, 'message': 'Session not found'}), 404
 
+SSE_RETRY = 'retry: 3000\n\n'
+SSE_KEEPALIVE = ': keep-alive\n\n'
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/realtime/stream/<session_id>', methods=['GET'])
+def stream_realtime_updates(session_id):
+    """
+    Server-Sent Events feed of a monitoring session. Each client blocks on its own
+    subscription and is sent an event only when one is recorded for the session.
+    This threaded version serves `python app.py`; a stream holds a thread while
+    open, so production serves this path from allocation_asgi.py instead.
+    """
+    if stream_slots.acquire() == REJECTED:
+        return jsonify(overloaded_body(stream_slots)), 503, {'Retry-After': str(stream_slots.retry_after)}
+    
+    subscription = realtime_monitor.subscribe(session_id)
+    if subscription is None:
+        stream_slots.release()
+        return jsonify({'success': False, 'message': 'Session not found'}), 404
+    
+    realtime_monitor.ensure_demo_feed(REALTIME_DEMO_INTERVAL)
+    snapshot = realtime_monitor.session_metrics(session_id)
+    
+    def generate():
+        yield SSE_RETRY
+        yield sse_message('snapshot', {'session_metrics': snapshot})
+        while True:
+            message = subscription.get(timeout=REALTIME_KEEPALIVE_SECONDS)
+            # Comment line keeps proxies from closing an idle stream
+            yield SSE_KEEPALIVE if message is None else sse_message('update', message)
+    
+    def close():
+        # Runs when the response is closed, even if the client left before the first event
+        subscription.close()
+        stream_slots.release()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+    response.call_on_close(close)
+    return response
+
 @app.route('/api/ai/insights', methods=['POST'])
 def get_ai_insights():
     """Get AI-generated insights for allocations"""
     data = request.json
     allocations = data.get('allocations', [])
     historical_data = data.get('historical_data')
+    batch_id = data.get('batch_id')
+    
+    # A batch id alone is enough when the batch is still being monitored; only
+    # those server-side allocations may be memoized under the batch id
+    from_session = bool(batch_id) and not allocations
+    if from_session:
+        allocations = realtime_monitor.active_sessions.get(batch_id, {}).get('allocations', [])
     
-    insights = insights_generator.generate_advanced_insights(allocations, historical_data)
+    insights = insights_generator.generate_advanced_insights(
+        allocations, historical_data, batch_id=batch_id, memoize=from_session)
     
     return jsonify({
         'success': True,
@@ -412,42 +555,55 @@ def chat_with_ai():
 @app.route('/api/analytics/dashboard', methods=['GET'])
 def get_analytics_dashboard():
     """Get comprehensive analytics for dashboard"""
-    # Get allocation statistics
-    total_interns = Intern.query.count()
-    total_projects = Project.query.count()
-    total_mentors = Mentor.query.count()
-    total_allocations = Allocation.query.count()
+    return jsonify(dashboard_snapshot.get())
+
+def build_dashboard_analytics():
+    """Compute dashboard analytics with aggregate SQL instead of loading rows"""
+    completed = Allocation.status == 'completed'
     
-    # Get recent allocations
-    recent_allocations = Allocation.query.order_by(Allocation.created_at.desc()).limit(10).all()
+    # Entity counts and allocation statistics in a single statement
+    (total_interns, total_projects, total_mentors, total_allocations,
+     completed_count, successful_count, avg_rating) = db.session.query(
+        db.session.query(db.func.count(Intern.id)).scalar_subquery(),
+        db.session.query(db.func.count(Project.id)).scalar_subquery(),
+        db.session.query(db.func.count(Mentor.id)).scalar_subquery(),
+        db.func.count(Allocation.id),
+        db.func.sum(db.case((completed, 1), else_=0)),
+        db.func.sum(db.case((completed & (Allocation.project_rating >= 4), 1), else_=0)),
+        db.func.avg(Allocation.project_rating)
+    ).select_from(Allocation).one()
     
-    # Calculate success metrics
-    completed_allocations = Allocation.query.filter_by(status='completed').all()
-    avg_rating = db.session.query(db.func.avg(Allocation.project_rating)).filter(
-        Allocation.project_rating.isnot(None)
-    ).scalar() or 0
+    # Get recent allocations with their intern, project and mentor in one join
+    recent_allocations = db.session.query(
+        Allocation.id, Intern.name, Project.title, Mentor.name,
+        Allocation.match_score, Allocation.status, Allocation.created_at
+    ).join(Intern, Allocation.intern_id == Intern.id).join(
+        Project, Allocation.project_id == Project.id
+    ).join(
+        Mentor, Allocation.mentor_id == Mentor.id
+    ).order_by(Allocation.created_at.desc()).limit(10).all()
     
     # Get allocation history
     allocation_history = AllocationHistory.query.order_by(AllocationHistory.created_at.desc()).limit(5).all()
     
-    return jsonify({
+    return {
         'summary': {
             'total_interns': total_interns,
             'total_projects': total_projects,
             'total_mentors': total_mentors,
             'total_allocations': total_allocations,
-            'success_rate': len([a for a in completed_allocations if (a.project_rating or 0) >= 4]) / max(len(completed_allocations), 1) * 100,
-            'average_rating': round(avg_rating, 2)
+            'success_rate': (successful_count or 0) / max(completed_count or 0, 1) * 100,
+            'average_rating': round(avg_rating or 0, 2)
         },
         'recent_activity': [{
-            'allocation_id': a.id,
-            'intern_name': a.intern.name,
-            'project_title': a.project.title,
-            'mentor_name': a.mentor.name,
-            'match_score': a.match_score,
-            'status': a.status,
-            'created_at': a.created_at.isoformat()
-        } for a in recent_allocations],
+            'allocation_id': allocation_id,
+            'intern_name': intern_name,
+            'project_title': project_title,
+            'mentor_name': mentor_name,
+            'match_score': match_score,
+            'status': status,
+            'created_at': created_at.isoformat()
+        } for allocation_id, intern_name, project_title, mentor_name, match_score, status, created_at in recent_allocations],
         'performance_trends': [{
             'batch_id': h.allocation_batch_id,
             'date': h.created_at.strftime('%Y-%m-%d'),
@@ -455,7 +611,13 @@ def get_analytics_dashboard():
             'total_allocations': h.total_interns,
             'processing_time': h.allocation_time_seconds
         } for h in allocation_history]
-    })
+    }
+
+# Short-lived snapshot so many polling dashboards share one computation
+dashboard_snapshot = TTLSnapshot(build_dashboard_analytics, ttl_seconds=float(os.environ.get('DASHBOARD_SNAPSHOT_TTL', 5)))
+request_metrics.registry.gauge_callback(
+    'smart_allocation_dashboard_snapshot_fresh', 'Whether the dashboard snapshot is within its TTL',
+    lambda: int(dashboard_snapshot.is_fresh))
 
 # PM Internship Yojana Integration APIs
 @app.route('/api/yojana/compliance/<int:intern_id>', methods=['GET', 'PUT'])
@@ -508,42 +670,38 @@ def manage_yojana_compliance(intern_id):
 @app.route('/api/yojana/batch-report', methods=['GET'])
 def generate_yojana_batch_report():
     """Generate comprehensive report for PM Internship Yojana"""
-    interns = Intern.query.all()
-    total_interns = len(interns)
-    
-    # Category-wise distribution
-    category_distribution = {}
-    state_distribution = {}
-    
-    for intern in interns:
-        category = intern.category or 'General'
-        state = intern.state or 'Unknown'
-        
-        category_distribution[category] = category_distribution.get(category, 0) + 1
-        state_distribution[state] = state_distribution.get(state, 0) + 1
-    
-    # Compliance statistics
-    compliance_records = YojanaCompliance.query.all()
-    verified_docs = len([c for c in compliance_records if c.documents_verified])
-    completed_interns = len([c for c in compliance_records if c.certificate_issued])
+    totals = yojana_report_totals(use_counters=report_counters_enabled())
+    total_interns = totals['total_interns']
+    completed_interns = totals['certificate_issued']
     
     return jsonify({
         'batch_summary': {
             'total_interns': total_interns,
-            'category_distribution': category_distribution,
-            'state_distribution': state_distribution,
-            'documents_verified': verified_docs,
+            'category_distribution': totals['category_distribution'],
+            'state_distribution': totals['state_distribution'],
+            'documents_verified': totals['documents_verified'],
             'completed_interns': completed_interns,
             'completion_rate': (completed_interns / max(total_interns, 1)) * 100
         },
         'compliance_metrics': {
-            'average_attendance': db.session.query(db.func.avg(YojanaCompliance.attendance_percentage)).scalar() or 0,
-            'reports_submitted': db.session.query(db.func.sum(YojanaCompliance.weekly_reports_submitted)).scalar() or 0,
-            'presentations_completed': len([c for c in compliance_records if c.final_presentation])
+            'average_attendance': totals['average_attendance'],
+            'reports_submitted': totals['reports_submitted'],
+            'presentations_completed': totals['final_presentation']
         },
         'generated_at': datetime.now().isoformat()
     })
 
+@app.route('/api/yojana/compliance/bulk', methods=['GET'])
+def stream_yojana_compliance():
+    """Stream compliance scores and stipend eligibility for all (or filtered) interns as NDJSON"""
+    return Response(
+        stream_with_context(stream_bulk_compliance(
+            category=request.args.get('category'),
+            state=request.args.get('state')
+        )),
+        mimetype='application/x-ndjson'
+    )
+
 # Utility Functions
 def calculate_compliance_score(compliance):
     """Calculate overall compliance score for Yojana requirements"""
@@ -564,7 +722,7 @@ def calculate_compliance_score(compliance):
 def create_tables():
     """Create database tables"""
     with app.app_context():
-        db.create_all()
+        migrate_schema(db)
 
 # Error handlers
 @app.errorhandler(404)
@@ -577,7 +735,7 @@ def internal_error(error):
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        migrate_schema(db)
     
     print("🚀 PM Smart Allocation Engine Starting...")
     print("🤖 AI Engine: Ready")
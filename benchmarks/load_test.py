@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Closed-loop HTTP load generator for the recommendation service
+Opens `--concurrency` connections that each send requests back to back for
+`--duration` seconds (keep-alive where the server allows it) and reports
+throughput, latency percentiles, status codes and how many connections were
+actually sustained. Standard library only, so it runs against either server:
+
+    python recommendation_api.py                       # Flask, port 5000
+    PORT=5001 python recommendation_asgi.py            # asyncio, port 5001
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 200
+    python benchmarks/load_test.py --url http://127.0.0.1:5001 --concurrency 200
+
+`--target` may be repeated as METHOD:PATH[:JSON_BODY]; connections cycle through
+the targets. The default mix is the candidate portal's calls.
+
+With `--rate`, load is open-loop instead: requests start at a fixed arrival rate
+whatever the server's speed (at most `--concurrency` outstanding), and latency is
+measured from the scheduled start, so an overloaded server shows its real tail
+rather than slowing the generator down:
+
+    python benchmarks/load_test.py --rate 400 --concurrency 2000 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+DEFAULT_TARGETS = [
+    'POST:/recommend:{"candidate_id": 101, "n": 10}',
+    'GET:/applications?candidate_id=101',
+    'GET:/allotment?candidate_id=101',
+    'POST:/apply:{"candidate_id": 101, "company_name": "Tech Solutions India", "job_title": "Intern"}',
+]
+
+
+def parse_target(spec):
+    method, rest = spec.split(':', 1)
+    path, _, body = rest.partition(':')
+    return method.upper(), path, body.encode() if body else b''
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}  # "METHOD PATH" -> [seconds]
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.connections_opened = 0
+        self.peak_open = 0
+        self.open = 0
+
+    def connected(self):
+        self.connections_opened += 1
+        self.open += 1
+        self.peak_open = max(self.peak_open, self.open)
+
+    def disconnected(self):
+        self.open -= 1
+
+
+async def read_response(reader):
+    """Status code and whether the server keeps the connection open"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    version, status = status_line.split(b' ', 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get(b'transfer-encoding', b'').lower() == b'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif b'content-length' in headers:
+        await reader.readexactly(int(headers[b'content-length']))
+    else:
+        await reader.read()  # body delimited by close
+        return int(status), False
+
+    connection = headers.get(b'connection', b'').lower()
+    keep_alive = connection != b'close' and (version == b'HTTP/1.1' or connection == b'keep-alive')
+    return int(status), keep_alive
+
+
+async def client(host, port, targets, deadline, stats, timeout):
+    writer = None
+    offset = random.randrange(len(targets))
+    sent = 0
+    try:
+        while time.perf_counter() < deadline:
+            method, path, body = targets[(offset + sent) % len(targets)]
+            sent += 1
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+                    stats.connected()
+                request = (f'{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\n'
+                           f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n').encode() + body
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                stats.errors[type(e).__name__] += 1
+                keep_alive = False
+                status = None
+
+            if status is not None:
+                stats.latencies.setdefault(f'{method} {path}', []).append(time.perf_counter() - started)
+                stats.statuses[status] += 1
+            if not keep_alive and writer is not None:
+                writer.close()
+                writer = None
+                stats.disconnected()
+    finally:
+        if writer is not None:
+            writer.close()
+            stats.disconnected()
+
+
+async def single_request(host, port, target, scheduled, stats, timeout):
+    """One request on its own connection, timed from when it was due"""
+    method, path, body = target
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        stats.connected()
+        writer.write((f'{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n'
+                      f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n').encode() + body)
+        await writer.drain()
+        status, _ = await asyncio.wait_for(read_response(reader), timeout)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+        stats.errors[type(e).__name__] += 1
+        return
+    finally:
+        if writer is not None:
+            writer.close()
+            stats.disconnected()
+    stats.latencies.setdefault(f'{method} {path}', []).append(time.perf_counter() - scheduled)
+    stats.statuses[status] += 1
+
+
+async def open_loop(host, port, targets, deadline, stats, args):
+    interval = 1.0 / args.rate
+    outstanding = set()
+    scheduled = time.perf_counter()
+    sent = 0
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(outstanding) >= args.concurrency:
+            stats.errors['client_limit'] += 1
+        else:
+            task = asyncio.create_task(single_request(
+                host, port, targets[sent % len(targets)], scheduled, stats, args.timeout))
+            outstanding.add(task)
+            task.add_done_callback(outstanding.discard)
+        sent += 1
+        scheduled += interval
+    if outstanding:
+        await asyncio.wait(outstanding)
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    targets = [parse_target(t) for t in (args.target or DEFAULT_TARGETS)]
+    stats = Stats()
+    deadline = time.perf_counter() + args.duration
+
+    started = time.perf_counter()
+    if args.rate:
+        await open_loop(url.hostname, url.port or 80, targets, deadline, stats, args)
+    else:
+        await asyncio.gather(*(client(url.hostname, url.port or 80, targets, deadline, stats, args.timeout)
+                               for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    def summary(values):
+        values = sorted(values)
+        ms = lambda value: round(value * 1000, 2) if value is not None else None
+        return {
+            'p50': ms(percentile(values, 0.50)),
+            'p95': ms(percentile(values, 0.95)),
+            'p99': ms(percentile(values, 0.99)),
+            'max': ms(values[-1] if values else None)
+        }
+
+    latencies = [value for values in stats.latencies.values() for value in values]
+    ok = sum(count for status, count in stats.statuses.items() if status < 500)
+    return {
+        'url': args.url,
+        'concurrency': args.concurrency,
+        'offered_rps': args.rate,
+        'duration_s': round(elapsed, 2),
+        'requests': len(latencies),
+        'successful': ok,
+        'throughput_rps': round(ok / elapsed, 1),
+        'latency_ms': summary(latencies),
+        'latency_ms_by_target': {target: summary(values) for target, values in sorted(stats.latencies.items())},
+        'statuses': dict(sorted(stats.statuses.items())),
+        'errors': dict(stats.errors),
+        'connections_opened': stats.connections_opened,
+        'peak_concurrent_connections': stats.peak_open
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=100, help='Simultaneous connections')
+    parser.add_argument('--rate', type=float, help='Open-loop arrival rate in requests/second')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds to sustain load')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds')
+    parser.add_argument('--target', action='append', help='METHOD:PATH[:JSON_BODY], repeatable')
+    parser.add_argument('--output', help='Also write the result JSON here')
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    return 0 if result['successful'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
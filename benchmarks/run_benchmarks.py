@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+PM Smart Allocation Engine - Benchmark Suite
+Times the allocation engine, insights, recommendation scoring, list endpoints
+and bulk database paths on fixed-seed synthetic datasets, writes JSON results
+and fails when a case regresses past the threshold against a baseline run. A cold
+`import app` is also timed against an import budget in fresh interpreters.
+
+    python benchmarks/run_benchmarks.py --scales 1k,10k --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000}
+
+# Modules that must not be loaded just by importing a service
+DEFERRED_MODULES = ('pandas', 'sklearn', 'scipy', 'nltk', 'textblob')
+
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{'seconds': time.perf_counter() - started,
+                  'deferred_loaded': [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Process high-water RSS in MB (None where getrusage is unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, iterations, items_per_call=1, warmup=1):
+    """Run fn repeatedly and summarise per-call latency and item throughput"""
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(elapsed / iterations * 1000, 3),
+        'throughput_per_s': round(iterations * items_per_call / elapsed, 2) if elapsed else None,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def iterations_for(size, small, large):
+    return small if size <= 10000 else large
+
+
+def seed_allocations(db, num_projects, num_interns, num_mentors, seed):
+    """Bulk insert one pending allocation per project so allocation endpoints have data"""
+    from src.models import Allocation
+
+    rng = random.Random(f'{seed}:allocations')
+    interns = rng.sample(range(1, num_interns + 1), min(num_projects, num_interns))
+    rows = [{
+        'intern_id': intern_id,
+        'project_id': project_id,
+        'mentor_id': rng.randint(1, num_mentors),
+        'match_score': rng.uniform(50, 95),
+        'skill_match_score': rng.uniform(40, 95),
+        'preference_match_score': rng.uniform(40, 95),
+        'availability_match_score': rng.uniform(60, 95),
+        'status': 'pending'
+    } for project_id, intern_id in enumerate(interns, start=1)]
+
+    db.session.execute(Allocation.__table__.insert(), rows)
+    db.session.commit()
+
+
+def bench_database(app, db, size, args):
+    from src.models import Intern, skill_candidate_pairs
+    from src.compliance import stream_bulk_compliance
+    from src.sample_data import PMYojanaSampleDataGenerator
+
+    results = {}
+    num_projects, num_mentors = max(1, size // 20), max(1, size // 50)
+
+    with app.app_context():
+        started = time.perf_counter()
+        PMYojanaSampleDataGenerator().populate_at_scale(
+            size, num_projects, num_mentors, seed=args.seed, workers=args.workers
+        )
+        elapsed = time.perf_counter() - started
+        results['db.populate_at_scale'] = {
+            'iterations': 1,
+            'p50_ms': round(elapsed * 1000, 3),
+            'p99_ms': round(elapsed * 1000, 3),
+            'mean_ms': round(elapsed * 1000, 3),
+            'throughput_per_s': round(size / elapsed, 2),
+            'peak_rss_mb': peak_rss_mb()
+        }
+
+        seed_allocations(db, num_projects, size, num_mentors, args.seed)
+        iterations = iterations_for(size, 10, 3)
+
+        results['db.bulk_compliance_stream'] = measure(
+            lambda: sum(1 for _ in stream_bulk_compliance()), iterations, items_per_call=size
+        )
+        results['db.skill_candidate_pairs'] = measure(
+            lambda: skill_candidate_pairs(), iterations
+        )
+        results['db.intern_with_skill'] = measure(
+            lambda: Intern.with_skill('Python', 7).count(), iterations * 5
+        )
+
+    return results, num_projects, num_mentors
+
+
+def bench_engine(app, size, args):
+    from src.allocation_engine import SmartAllocationEngine
+    from src.models import Intern, Project, Mentor
+
+    results = {}
+    engine = SmartAllocationEngine()
+
+    with app.app_context():
+        interns = Intern.query.order_by(Intern.id).limit(min(size, args.engine_interns)).all()
+        projects = Project.query.order_by(Project.id).limit(args.engine_projects).all()
+        mentors = Mentor.query.order_by(Mentor.id).limit(args.engine_mentors).all()
+
+        pairs = [(i.get_skills(), p.get_required_skills()) for i in interns for p in projects][:500]
+        results['engine.calculate_skill_match'] = measure(
+            lambda: [engine.calculate_skill_match(a, b) for a, b in pairs], 5, items_per_call=len(pairs)
+        )
+
+        random.seed(args.seed)
+        triples = len(interns) * len(projects) * len(mentors)
+        results['engine.generate_optimal_allocation'] = measure(
+            lambda: engine.generate_optimal_allocation(interns, projects, mentors), 3, items_per_call=triples
+        )
+        results['engine.generate_optimal_allocation']['triples'] = triples
+
+    return results
+
+
+def pandas_generate_insights(allocations_data):
+    """Reference: the DataFrame implementation SmartAllocationEngine.generate_insights replaced"""
+    import pandas as pd
+
+    df = pd.DataFrame(allocations_data['allocations'])
+
+    recommendations = []
+    if df['skill_match'].mean() < 70:
+        recommendations.append({'type': 'skill_improvement',
+                                'message': 'Consider organizing skill development workshops for interns',
+                                'priority': 'high'})
+    if df['preference_match'].mean() < 75:
+        recommendations.append({'type': 'preference_alignment',
+                                'message': 'Improve project descriptions to better match intern interests',
+                                'priority': 'medium'})
+
+    risks = []
+    low_success_allocations = df[df['success_probability'] < 60]
+    if len(low_success_allocations) > 0:
+        risks.append({'type': 'low_success_probability', 'count': len(low_success_allocations),
+                      'message': f'{len(low_success_allocations)} allocations have low success probability'})
+
+    suggestions = []
+    if df['availability_match'].mean() < 80:
+        suggestions.append({'area': 'scheduling', 'suggestion': 'Implement flexible scheduling options',
+                            'potential_improvement': '15-20% better availability matching'})
+
+    return {
+        'summary': {
+            'total_allocations': len(df),
+            'average_match_score': round(df['final_score'].mean(), 2),
+            'high_confidence_matches': len(df[df['final_score'] >= 85]),
+            'processing_time': allocations_data['processing_time']
+        },
+        'skill_analysis': {
+            'low_skill_matches': len(df[df['skill_match'] < 60]),
+            'average_skill_match': round(df['skill_match'].mean(), 2),
+            'skill_distribution': df['skill_match'].describe().to_dict()
+        },
+        'recommendations': recommendations,
+        'risk_factors': risks,
+        'optimization_suggestions': suggestions
+    }
+
+
+def bench_insights(size, args):
+    """NumPy insights against the pandas reference on `size` synthetic allocations"""
+    from src.allocation_engine import SmartAllocationEngine
+
+    rng = random.Random(args.seed)
+    allocations_data = {
+        'processing_time': 1.0,
+        'allocations': [{
+            'intern_id': i, 'project_id': i % 500, 'mentor_id': i % 50,
+            'final_score': rng.uniform(30, 100),
+            'skill_match': rng.uniform(0, 100),
+            'preference_match': rng.uniform(20, 100),
+            'availability_match': rng.uniform(40, 100),
+            'success_probability': rng.uniform(0, 100)
+        } for i in range(size)]
+    }
+
+    engine = SmartAllocationEngine()
+    expected = json.dumps(pandas_generate_insights(allocations_data), sort_keys=True)
+    actual = json.dumps(engine.generate_insights(allocations_data), sort_keys=True)
+    if actual != expected:
+        raise SystemExit(f'❌ NumPy insights differ from the pandas reference at {size} allocations')
+
+    iterations = iterations_for(size, 10, 3)
+    results = {
+        'insights.pandas_reference': measure(lambda: pandas_generate_insights(allocations_data), iterations, items_per_call=size),
+        'insights.generate_insights': measure(lambda: engine.generate_insights(allocations_data), iterations, items_per_call=size)
+    }
+    results['insights.generate_insights']['identical_output'] = True
+    return results
+
+
+def bench_recommendation(size, args):
+    """Score resumes against a synthetic internship catalogue of `size` postings"""
+    import numpy as np
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    import recommendation_api
+
+    rng = random.Random(f'{args.seed}:recommendation')
+    skills = ['Python', 'SQL', 'Data Analysis', 'Machine Learning', 'React', 'Node.js', 'Excel',
+              'Tableau', 'Deep Learning', 'NLP', 'Java', 'C++', 'UI/UX', 'Cloud', 'Marketing']
+    cities = ['Delhi', 'Mumbai', 'Bengaluru', 'Chennai', 'Lucknow', 'Pune', 'Hyderabad']
+
+    internships = pd.DataFrame([{
+        'internship_id': 2000 + i,
+        'job_title': f'{rng.choice(skills)} Intern',
+        'job_description': f'Intern in {rng.choice(cities)}. Required skills: {", ".join(rng.sample(skills, 4))}.',
+        'Company_name': f'Company {i % 500}'
+    } for i in range(size)])
+    candidates = pd.DataFrame([{
+        'candidate_id': 100 + i,
+        'candidate_name': f'Candidate {i}',
+        'resume': f'Student seeking internship in {rng.choice(cities)}. I have skills in {", ".join(rng.sample(skills, 3))}.'
+    } for i in range(200)])
+
+    vectorizer = TfidfVectorizer()
+    matrix = vectorizer.fit_transform(
+        (internships['job_title'] + ' ' + internships['job_description']).map(recommendation_api.preprocess_text)
+    )
+
+    recommendation_api.tfidf_vectorizer = vectorizer
+    recommendation_api.internship_matrix = matrix
+    recommendation_api.internship_df = internships
+    recommendation_api.candidates_df = candidates
+
+    ids = np.array(candidates['candidate_id'])
+    state = {'i': 0}
+
+    def recommend_next():
+        candidate_id = int(ids[state['i'] % len(ids)])
+        state['i'] += 1
+        recommendation_api.recommendation_internship(candidate_id, 10)
+
+    client = recommendation_api.app.test_client()
+
+    return {
+        'recommendation.recommendation_internship': measure(recommend_next, iterations_for(size, 200, 50)),
+        'recommendation.POST /recommend': measure(
+            lambda: client.post('/recommend', json={'candidate_id': int(rng.choice(ids)), 'n': 10}),
+            iterations_for(size, 200, 50)
+        )
+    }
+
+
+def bench_endpoints(app, size):
+    from app import dashboard_snapshot
+
+    client = app.test_client()
+    iterations = iterations_for(size, 10, 3)
+
+    def dashboard():
+        dashboard_snapshot.invalidate()
+        client.get('/api/analytics/dashboard')
+
+    return {
+        'api.GET /api/interns': measure(lambda: client.get('/api/interns'), iterations, items_per_call=size),
+        'api.GET /api/projects': measure(lambda: client.get('/api/projects'), iterations),
+        'api.GET /api/mentors': measure(lambda: client.get('/api/mentors'), iterations),
+        'api.GET /api/allocations': measure(lambda: client.get('/api/allocations'), iterations),
+        'api.GET /api/analytics/dashboard (uncached)': measure(dashboard, iterations * 5),
+        'api.GET /api/yojana/batch-report': measure(lambda: client.get('/api/yojana/batch-report'), iterations * 5)
+    }
+
+
+def bench_startup(workdir, args):
+    """Time a cold `import app` in fresh interpreters and check heavy imports stay deferred"""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+    probe = STARTUP_PROBE.format(module='app', deferred=DEFERRED_MODULES)
+
+    runs = []
+    for _ in range(args.startup_runs):
+        completed = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env,
+                                   capture_output=True, text=True, check=True)
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    seconds = sorted(run['seconds'] for run in runs)
+    return {
+        'p50_ms': round(percentile(seconds, 0.5) * 1000, 3),
+        'max_ms': round(seconds[-1] * 1000, 3),
+        'runs': len(runs),
+        'budget_ms': args.import_budget * 1000,
+        'deferred_loaded': sorted({m for run in runs for m in run['deferred_loaded']})
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return regressions where p50 latency grew by more than `threshold` (fraction)"""
+    regressions = []
+    for scale, cases in results['results'].items():
+        for case, metrics in cases.items():
+            previous = baseline.get('results', {}).get(scale, {}).get(case)
+            if not previous or not previous.get('p50_ms'):
+                continue
+
+            change = (metrics['p50_ms'] - previous['p50_ms']) / previous['p50_ms']
+            if change > threshold:
+                regressions.append(f"{scale} {case}: p50 {previous['p50_ms']}ms -> {metrics['p50_ms']}ms (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the PM Smart Allocation Engine hot paths')
+    parser.add_argument('--scales', default='1k,10k,100k', help=f'Comma list of {", ".join(SCALES)}')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None, help='Data generation processes')
+    parser.add_argument('--engine-interns', type=int, default=100, help='Interns fed to the allocation engine')
+    parser.add_argument('--engine-projects', type=int, default=20)
+    parser.add_argument('--engine-mentors', type=int, default=5)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='Previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p50 slowdown (0.2 = 20%%)')
+    parser.add_argument('--import-budget', type=float, default=2.0, help='Allowed cold `import app` time in seconds')
+    parser.add_argument('--startup-runs', type=int, default=5)
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f'Unknown scale(s): {", ".join(unknown)}')
+
+    # The app reads DATABASE_URL at import time, so point it at a scratch database first
+    workdir = tempfile.mkdtemp(prefix='pm_bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    # Measure cold start before this process imports anything heavy
+    startup = bench_startup(workdir, args)
+    print(f"🚀 Cold import app: p50 {startup['p50_ms']:.1f}ms (budget {startup['budget_ms']:.0f}ms)")
+
+    from app import app, db
+    from src.database import migrate_schema
+
+    with app.app_context():
+        migrate_schema(db)
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed
+        },
+        'startup': startup,
+        'results': {}
+    }
+
+    for scale in scales:
+        size = SCALES[scale]
+        print(f'⏱️  Scale {scale} ({size} interns)')
+
+        results, _, _ = bench_database(app, db, size, args)
+        results.update(bench_engine(app, size, args))
+        results.update(bench_insights(size, args))
+        results.update(bench_recommendation(size, args))
+        results.update(bench_endpoints(app, size))
+        output['results'][scale] = results
+
+        for case, metrics in results.items():
+            print(f"  {case:<48} p50 {metrics['p50_ms']:>10.3f}ms  p99 {metrics['p99_ms']:>10.3f}ms  "
+                  f"{metrics['throughput_per_s'] or 0:>12.2f}/s  rss {metrics['peak_rss_mb']}MB")
+
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f'📄 Results written to {args.output}')
+
+    startup_failures = []
+    if startup['p50_ms'] > startup['budget_ms']:
+        startup_failures.append(f"cold import p50 {startup['p50_ms']}ms exceeds {startup['budget_ms']:.0f}ms budget")
+    if startup['deferred_loaded']:
+        startup_failures.append(f"import app loaded deferred modules: {', '.join(startup['deferred_loaded'])}")
+    if startup_failures:
+        for line in startup_failures:
+            print(f'❌ {line}')
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(output, json.load(f), args.threshold)
+        if regressions:
+            print(f'❌ {len(regressions)} regression(s) over {args.threshold:.0%}:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print('✅ No regressions against baseline')
+
+
+if __name__ == '__main__':
+    main()
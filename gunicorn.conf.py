@@ -0,0 +1,47 @@
+"""
+Gunicorn settings shared by both services (see wsgi.py)
+
+Reloading:
+    kill -HUP <master>    restart workers gracefully (same preloaded code and model)
+    kill -USR2 <master>   start a new master that reloads code and model artifacts,
+                          then `kill -TERM <old master>` once the new one is ready
+"""
+
+import multiprocessing
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# One process per core; a few threads each keep I/O-bound requests overlapping.
+# The allocation app keeps real-time sessions in memory and streams them to
+# dashboards, so production serves it from allocation_asgi.py instead (see DEPLOYMENT_GUIDE.md)
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('WORKER_THREADS', 4))
+
+# Load the app (and its model) once in the master before forking workers
+preload_app = True
+
+timeout = int(os.environ.get('WORKER_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Recycle workers periodically so slow leaks cannot accumulate
+max_requests = int(os.environ.get('MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', 500))
+
+accesslog = os.environ.get('ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def when_ready(server):
+    server.log.info('Master ready with %s workers x %s threads on %s', workers, threads, bind)
+
+
+def post_fork(server, worker):
+    server.log.info('Worker %s forked from preloaded master', worker.pid)
+
+
+def worker_int(worker):
+    worker.log.info('Worker %s interrupted, finishing in-flight requests', worker.pid)
@@ -4,13 +4,47 @@ PM Smart Allocation Engine - Data Initialization Script
 This script populates the database with realistic sample data for PM Internship Yojana
 """
 
+import argparse
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import app, db
+from src.database import deduplicate_compliance, migrate_schema
 from src.sample_data import PMYojanaSampleDataGenerator, create_yojana_integration_demo
 
+def generate_load_test_data(args):
+    """Generate a large deterministic dataset for load testing"""
+    print("🏭 Generating PM Internship Yojana load-test dataset...")
+    print("=" * 60)
+    
+    with app.app_context():
+        if args.output == "database":
+            migrate_schema(db)
+        
+        result = PMYojanaSampleDataGenerator().populate_at_scale(
+            num_interns=args.interns,
+            num_projects=args.projects,
+            num_mentors=args.mentors,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            output=args.output,
+            output_dir=args.output_dir
+        )
+    
+    print(f"  ├── Interns: {result['interns_created']}")
+    print(f"  ├── Projects: {result['projects_created']}")
+    print(f"  └── Mentors: {result['mentors_created']}")
+
+def deduplicate_compliance_records():
+    """Resolve duplicate compliance rows so the schema migration can index them"""
+    with app.app_context():
+        moved = deduplicate_compliance(db)
+        migrate_schema(db)
+    
+    print(f"✅ Moved {moved} duplicate compliance rows to yojana_compliance_duplicates")
+
 def initialize_database():
     """Initialize database with sample data for PM Internship Yojana demo"""
     
@@ -20,7 +54,7 @@ def initialize_database():
     with app.app_context():
         # Create all tables
         print("📋 Creating database tables...")
-        db.create_all()
+        migrate_schema(db)
         print("✅ Database tables created successfully!")
         
         # Generate sample data
@@ -48,4 +82,24 @@ def initialize_database():
         print("🎯 Click 'Generate AI Allocations' to see the magic happen!")
 
 if __name__ == "__main__":
-    initialize_database()
+    parser = argparse.ArgumentParser(description="Initialize the PM Smart Allocation Engine database")
+    parser.add_argument("--interns", type=int, help="Generate a load-test dataset with this many interns")
+    parser.add_argument("--projects", type=int, help="Projects to generate (default: interns / 20)")
+    parser.add_argument("--mentors", type=int, help="Mentors to generate (default: interns / 50)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", choices=["database", "csv", "parquet"], default="database")
+    parser.add_argument("--output-dir", default="sample_data_out")
+    parser.add_argument("--deduplicate-compliance", action="store_true",
+                        help="Keep the newest compliance row per intern, backing up the others, then migrate")
+    args = parser.parse_args()
+    
+    if args.deduplicate_compliance:
+        deduplicate_compliance_records()
+    elif args.interns:
+        args.projects = args.projects or max(1, args.interns // 20)
+        args.mentors = args.mentors or max(1, args.interns // 50)
+        generate_load_test_data(args)
+    else:
+        initialize_database()
@@ -14,6 +14,17 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import json
 import os
+import hashlib
+import atexit
+import threading
+
+from src.admission import AdmissionControl, ConcurrencyLimiter
+from src.allocation_engine import SmartAllocationEngine
+from src.application_store import ApplicationStore, ApplicationStoreBusy
+from src.cache import LRUCache
+from src.metrics import RequestMetrics
+from src.portal_allotment import AllotmentService
+from src.profiling import RequestProfiler
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -24,16 +35,51 @@ tfidf_vectorizer = None
 internship_matrix = None
 candidates_df = None
 internship_df = None
+model_version = None
+
+# Submitted applications (SQLite, written by a group-commit writer thread)
+APPLICATIONS_DB = os.environ.get('APPLICATIONS_DB', 'applications.db')
+APPLICATION_WRITE_TIMEOUT = float(os.environ.get('APPLICATION_WRITE_TIMEOUT', 10))
+_application_store = None
+_application_store_lock = threading.Lock()
+
+def application_store():
+    """The process's application store, opened on first use"""
+    global _application_store
+    with _application_store_lock:
+        if _application_store is None:
+            _application_store = ApplicationStore(APPLICATIONS_DB)
+            atexit.register(_application_store.close)
+        return _application_store
+
+def _forget_application_store():
+    # The writer thread does not survive fork; a forked worker opens its own store
+    global _application_store, _application_store_lock
+    _application_store = None
+    _application_store_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_application_store)
+
+# Allotments from the last allocation run, indexed by candidate
+allotments = AllotmentService(
+    SmartAllocationEngine,
+    results_path=os.environ.get('ALLOTMENTS_PATH', 'allotments.json'),
+    candidate_limit=int(os.environ.get('ALLOTMENT_CANDIDATE_LIMIT', 25))
+)
 
 def load_model_and_data():
     """Load the ML model and data files"""
-    global tfidf_vectorizer, internship_matrix, candidates_df, internship_df
+    global tfidf_vectorizer, internship_matrix, candidates_df, internship_df, model_version
     
     try:
         # Load the pickled model artifacts
         if os.path.exists('tfidf_vectorizer.pkl'):
             with open('tfidf_vectorizer.pkl', 'rb') as f:
-                tfidf_vectorizer = pickle.load(f)
+                payload = f.read()
+            tfidf_vectorizer = pickle.loads(payload)
+            # Content hash identifies which vectorizer build is being served
+            model_version = hashlib.sha1(payload).hexdigest()[:12]
         
         if os.path.exists('internship_tfidf_matrix.pkl'):
             with open('internship_tfidf_matrix.pkl', 'rb') as f:
@@ -53,6 +99,30 @@ def load_model_and_data():
         print(f"❌ Error loading model/data: {e}")
         return False
 
+# Request and model metrics, exported on GET /metrics
+request_metrics = RequestMetrics(app, namespace='recommendation')
+request_metrics.registry.gauge_callback(
+    'recommendation_model_info', 'Loaded recommendation model version',
+    lambda: {(model_version or 'keyword-fallback',): 1}, labelnames=('version',))
+request_metrics.registry.gauge_callback(
+    'recommendation_internships_loaded', 'Internships available for recommendation',
+    lambda: len(internship_df) if internship_df is not None else 0)
+request_metrics.registry.gauge_callback(
+    'recommendation_candidates_loaded', 'Candidate profiles loaded',
+    lambda: len(candidates_df) if candidates_df is not None else 0)
+request_metrics.registry.gauge_callback(
+    'recommendation_vocabulary_size', 'Terms in the TF-IDF vocabulary',
+    lambda: len(tfidf_vectorizer.vocabulary_) if tfidf_vectorizer is not None else None)
+request_metrics.registry.gauge_callback(
+    'recommendation_application_queue_depth', 'Applications waiting for the writer',
+    lambda: _application_store.stats()['pending'] if _application_store is not None else 0)
+request_metrics.registry.gauge_callback(
+    'recommendation_application_batches', 'Group commits by the application writer',
+    lambda: _application_store.batches if _application_store is not None else 0)
+
+# Opt-in sampled profiling of recommendation requests (see /admin/profiling)
+request_profiler = RequestProfiler(app, endpoints=['get_recommendations'])
+
 # Original preprocessing function
 def preprocess_text(text):
     """Preprocess text for ML model"""
@@ -137,6 +207,156 @@ def recommendation_internship(candidate_id, n=10):
         recommendations.sort(key=lambda x: x['matchscore'], reverse=True)
         return recommendations[:n]
 
+# Request handlers shared by the Flask app and the ASGI variant (recommendation_asgi.py)
+
+def application_fields(data, idempotency_key=None):
+    """Validate an application request into ApplicationStore.add() arguments"""
+    if data.get('candidate_id') is None:
+        raise ValueError('candidate_id is required')
+    candidate_id = int(data.get('candidate_id'))
+    company_name = (data.get('company_name') or '').strip()
+    job_title = (data.get('job_title') or '').strip()
+    if not company_name or not job_title:
+        raise ValueError('company_name and job_title are required')
+    
+    match_score = data.get('match_score')
+    # Without a client key, re-applying to the same job returns the original application
+    key = idempotency_key or data.get('idempotency_key') or f"{candidate_id}:{company_name.lower()}:{job_title.lower()}"
+    
+    return {
+        'candidate_id': candidate_id,
+        'company_name': company_name,
+        'job_title': job_title,
+        'idempotency_key': key,
+        'internship_id': str(data['internship_id']) if data.get('internship_id') is not None else None,
+        'match_score': float(match_score) if match_score is not None else None
+    }
+
+def application_response(application, created):
+    company_name = application['company_name']
+    return {
+        'success': True,
+        'application_id': application['application_id'],
+        'message': (f'Application submitted successfully to {company_name}' if created
+                    else f'Application to {company_name} was already submitted'),
+        'status': application['status'],
+        'duplicate': not created
+    }
+
+def submit_application(data, idempotency_key=None):
+    """Record an application once committed; returns the response payload"""
+    future = application_store().add(**application_fields(data, idempotency_key))
+    try:
+        application, created = future.result(timeout=APPLICATION_WRITE_TIMEOUT)
+    except TimeoutError:
+        # Still queued or committing; a retry with the same key returns the stored application
+        raise ApplicationStoreBusy('Application is still being saved, please retry shortly')
+    return application_response(application, created)
+
+def list_applications(candidate_id):
+    """Applications submitted by a candidate, newest first"""
+    if candidate_id is None:
+        raise ValueError('candidate_id is required')
+    return application_store().for_candidate(int(candidate_id))
+
+def allotment_for(candidate_id):
+    """Allotment for a candidate from the last completed run, or None"""
+    if candidate_id is None:
+        raise ValueError('candidate_id is required')
+    return allotments.lookup(candidate_id)
+
+def start_allocation():
+    """Start an allocation run in the background; returns the response payload"""
+    job, started = allotments.start(candidates_df, internship_df)
+    return {
+        'success': True,
+        'message': 'Allocation started' if started else 'Allocation already running',
+        'job': job,
+        'current_run': allotments.status()['current_run']
+    }
+
+def allocation_status():
+    return {'success': True, **allotments.status()}
+
+def candidate_records():
+    """All candidate profiles (mock profile when no data is loaded)"""
+    if candidates_df is not None:
+        return candidates_df.to_dict('records')
+    
+    # Return mock data
+    return [
+        {
+            'candidate_id': 122,
+            'name': 'Arjun Kumar',
+            'email': 'arjun@example.com',
+            'college': 'IIT Delhi',
+            'skills': 'Python, Machine Learning',
+            'status': 'active'
+        }
+    ]
+
+# Recent results per candidate, served when every scoring slot is busy
+recommendation_cache = LRUCache(int(os.environ.get('RECOMMENDATION_CACHE_SIZE', 10000)))
+
+def remember_recommendations(candidate_id, n, recommendations):
+    recommendation_cache.put(candidate_id, (model_version, n, recommendations))
+
+def cached_recommendations(candidate_id, n):
+    """Last recommendations computed for a candidate by the current model, or None"""
+    entry = recommendation_cache.get(candidate_id)
+    if entry is None:
+        return None
+    version, cached_n, recommendations = entry
+    if version != model_version or cached_n < n:
+        return None
+    return recommendations[:n]
+
+def recommendation_payload(candidate_id, recommendations, degraded=False):
+    payload = {
+        'success': True,
+        'candidate_id': candidate_id,
+        'recommendations': recommendations,
+        'total_found': len(recommendations)
+    }
+    if degraded:
+        payload['degraded'] = True
+    return payload
+
+# Admission control for deadline-day bursts (limits are per process)
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT_MS', 1000)) / 1000
+ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 1))
+RECOMMEND_LIMITS = {
+    'max_concurrent': int(os.environ.get('ADMISSION_RECOMMEND_CONCURRENCY', max(2, os.cpu_count() or 1))),
+    'max_queue': int(os.environ.get('ADMISSION_RECOMMEND_QUEUE', 32)),
+    'queue_timeout': ADMISSION_QUEUE_TIMEOUT,
+    'retry_after': ADMISSION_RETRY_AFTER
+}
+APPLY_LIMITS = {
+    # Applications mostly wait on the group commit, so more of them may be in flight
+    'max_concurrent': int(os.environ.get('ADMISSION_APPLY_CONCURRENCY', 32)),
+    'max_queue': int(os.environ.get('ADMISSION_APPLY_QUEUE', 128)),
+    'queue_timeout': ADMISSION_QUEUE_TIMEOUT,
+    'retry_after': ADMISSION_RETRY_AFTER
+}
+
+def cached_recommendation_response():
+    """Degraded /recommend answer from the cache; None to queue for scoring instead"""
+    data = request.get_json(silent=True) or {}
+    try:
+        candidate_id = int(data.get('candidate_id'))
+        n = int(data.get('n', 10))
+    except (TypeError, ValueError):
+        return None
+    
+    recommendations = cached_recommendations(candidate_id, n)
+    if recommendations is None:
+        return None
+    return jsonify(recommendation_payload(candidate_id, recommendations, degraded=True)), 200, {'X-Degraded': 'cached'}
+
+admission = AdmissionControl(app, registry=request_metrics.registry, namespace='recommendation')
+admission.limit('get_recommendations', ConcurrencyLimiter(**RECOMMEND_LIMITS), fallback=cached_recommendation_response)
+admission.limit('apply_to_internship', ConcurrencyLimiter(**APPLY_LIMITS))
+
 # API Routes
 
 @app.route('/health', methods=['GET'])
@@ -148,6 +368,16 @@ def health_check():
         'data_loaded': candidates_df is not None and internship_df is not None
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: only take traffic once the candidate and internship data are loaded"""
+    ready = candidates_df is not None and internship_df is not None
+    return jsonify({
+        'status': 'ready' if ready else 'loading',
+        'model_version': model_version,
+        'pid': os.getpid()
+    }), 200 if ready else 503
+
 @app.route('/recommend', methods=['POST'])
 def get_recommendations():
     """Get recommendations for a candidate"""
@@ -157,13 +387,9 @@ def get_recommendations():
         n = int(data.get('n', 10))
         
         recommendations = recommendation_internship(candidate_id, n)
+        remember_recommendations(candidate_id, n, recommendations)
         
-        return jsonify({
-            'success': True,
-            'candidate_id': candidate_id,
-            'recommendations': recommendations,
-            'total_found': len(recommendations)
-        })
+        return jsonify(recommendation_payload(candidate_id, recommendations))
         
     except Exception as e:
         return jsonify({
@@ -173,23 +399,15 @@ def get_recommendations():
 
 @app.route('/apply', methods=['POST'])
 def apply_to_internship():
-    """Simulate application submission"""
+    """Submit an application (idempotent per Idempotency-Key header or job)"""
     try:
-        data = request.json
-        candidate_id = data.get('candidate_id')
-        company_name = data.get('company_name')
-        job_title = data.get('job_title')
-        
-        # Simulate successful application
-        application_id = f"APP_{candidate_id}_{hash(company_name + job_title) % 10000}"
+        return jsonify(submit_application(request.json, request.headers.get('Idempotency-Key')))
         
+    except ApplicationStoreBusy as e:
         return jsonify({
-            'success': True,
-            'application_id': application_id,
-            'message': f'Application submitted successfully to {company_name}',
-            'status': 'pending'
-        })
-        
+            'success': False,
+            'error': str(e)
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'success': False,
@@ -202,21 +420,9 @@ def get_applications():
     try:
         candidate_id = request.args.get('candidate_id')
         
-        # Return mock applications data
-        mock_applications = [
-            {
-                'application_id': f'APP_{candidate_id}_1001',
-                'company_name': 'Tech Solutions India',
-                'job_title': 'Software Development Intern',
-                'status': 'pending',
-                'applied_date': '2024-12-20',
-                'match_score': 0.89
-            }
-        ]
-        
         return jsonify({
             'success': True,
-            'applications': mock_applications
+            'applications': list_applications(candidate_id)
         })
         
     except Exception as e:
@@ -230,21 +436,9 @@ def get_allotment():
     """Get allotment status for a candidate"""
     try:
         candidate_id = request.args.get('candidate_id')
+        allotment = allotment_for(candidate_id)
         
-        # Simulate allotment data (random chance)
-        import random
-        
-        if random.random() > 0.5:  # 50% chance of having allotment
-            allotment = {
-                'candidate_id': candidate_id,
-                'company_name': 'Tech Solutions India',
-                'job_title': 'Software Development Intern',
-                'status': 'allocated',
-                'start_date': '2025-01-15',
-                'mentor_name': 'Dr. Rajesh Kumar',
-                'location': 'Bengaluru, Karnataka'
-            }
-            
+        if allotment is not None:
             return jsonify({
                 'success': True,
                 'allotment': allotment
@@ -264,23 +458,21 @@ def get_allotment():
 
 @app.route('/allocate', methods=['POST'])
 def run_allocation():
-    """Admin endpoint to run allocation algorithm"""
+    """Admin endpoint to start an allocation run (poll GET /allocate for progress)"""
     try:
-        # Simulate allocation process
-        result = {
-            'success': True,
-            'message': 'Allocation completed successfully',
-            'total_allocations': 15,
-            'processing_time': 2.3,
-            'summary': {
-                'candidates_processed': 50,
-                'internships_available': 25,
-                'successful_matches': 15,
-                'average_match_score': 0.82
-            }
-        }
+        return jsonify(start_allocation()), 202
         
-        return jsonify(result)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/allocate', methods=['GET'])
+def get_allocation_status():
+    """Latest allocation job and the run /allotment currently serves"""
+    try:
+        return jsonify(allocation_status())
         
     except Exception as e:
         return jsonify({
@@ -292,31 +484,12 @@ def run_allocation():
 def get_all_candidates():
     """Get all candidates (admin endpoint)"""
     try:
-        if candidates_df is not None:
-            candidates_list = candidates_df.to_dict('records')
-            return jsonify({
-                'success': True,
-                'candidates': candidates_list,
-                'total': len(candidates_list)
-            })
-        else:
-            # Return mock data
-            mock_candidates = [
-                {
-                    'candidate_id': 122,
-                    'name': 'Arjun Kumar',
-                    'email': 'arjun@example.com',
-                    'college': 'IIT Delhi',
-                    'skills': 'Python, Machine Learning',
-                    'status': 'active'
-                }
-            ]
-            
-            return jsonify({
-                'success': True,
-                'candidates': mock_candidates,
-                'total': len(mock_candidates)
-            })
+        candidates_list = candidate_records()
+        return jsonify({
+            'success': True,
+            'candidates': candidates_list,
+            'total': len(candidates_list)
+        })
         
     except Exception as e:
         return jsonify({
@@ -345,12 +518,16 @@ if __name__ == '__main__':
     print(f"📱 Mobile/Tablet:    http://192.168.0.119:5000")
     print("\n📋 Available endpoints:")
     print("  GET  /health         - Health check")
+    print("  GET  /ready          - Readiness check")
     print("  POST /recommend      - Get recommendations")
     print("  POST /apply          - Submit application")
     print("  GET  /applications   - Get candidate applications")
     print("  GET  /allotment      - Get allotment status")
-    print("  POST /allocate       - Run allocation (admin)")
+    print("  POST /allocate       - Start allocation run (admin)")
+    print("  GET  /allocate       - Allocation run status (admin)")
     print("  GET  /candidates     - Get all candidates (admin)")
+    print("  GET  /metrics        - Prometheus metrics")
+    print("  GET  /admin/profiles - Sampled request profiles (admin)")
     print("\n📱 Frontend URL: http://192.168.0.119:8080")
     print("🔥 Ready for connections!")
     print("="*50)
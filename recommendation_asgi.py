@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+ASGI variant of the recommendation API for high-concurrency serving
+Same endpoints and JSON payloads as recommendation_api.py, but connections are
+handled on one asyncio event loop instead of one blocked thread each:
+
+- CPU-bound scoring runs in a bounded process pool; requests beyond the pool's
+  queue wait (briefly, see src/admission.py) without holding a thread, get
+  cached results, or are shed with 503
+- Application handlers (the endpoints that do storage I/O) run in a small
+  dedicated thread pool or await the store's commit, so the loop never blocks
+
+    uvicorn recommendation_asgi:app --host 0.0.0.0 --port 5000
+
+Tuning: SCORING_WORKERS (processes, default = cores), SCORING_QUEUE (scoring
+requests in flight per worker, default 4), SCORING_BACKLOG (requests waiting
+for a scoring slot, default = slots), IO_THREADS (default 8).
+"""
+
+import asyncio
+import functools
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import recommendation_api as service
+from src.admission import ADMITTED, DEGRADED, QUEUED, AsyncConcurrencyLimiter, overloaded_body
+from src.application_store import ApplicationStoreBusy
+from src.metrics import CONTENT_TYPE, ASGIRequestMetrics
+
+SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', multiprocessing.cpu_count()))
+SCORING_QUEUE = int(os.environ.get('SCORING_QUEUE', 4))
+# The loop accepts every connection, so unlike the threaded server nothing else
+# caps how many recommend requests queue here; each waiter adds one scoring time
+# to the tail, so the backlog defaults to one round of slots, not the Flask queue
+SCORING_BACKLOG = int(os.environ.get('SCORING_BACKLOG', SCORING_WORKERS * SCORING_QUEUE))
+IO_THREADS = int(os.environ.get('IO_THREADS', 8))
+
+
+class CompatJSONResponse(JSONResponse):
+    """JSON encoded like Flask's jsonify: NaN/inf become null instead of raising"""
+
+    def render(self, content):
+        return super().render(_finite(content))
+
+
+def _finite(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _init_scoring_worker():
+    # Forked workers inherit the loaded model; spawned ones (Windows, macOS) load their own
+    if service.candidates_df is None:
+        service.load_model_and_data()
+
+
+class Executors:
+    """Pools created at startup and shut down with the app"""
+
+    def __init__(self):
+        self.scoring = None
+        self.io = None
+        self.recommend = None
+        self.apply = None
+
+    def start(self):
+        self.scoring = ProcessPoolExecutor(max_workers=SCORING_WORKERS, initializer=_init_scoring_worker)
+        self.io = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix='recommendation-io')
+        # Admission limits: scoring slots follow the pool size here rather than the core count
+        self.recommend = AsyncConcurrencyLimiter(**{
+            **service.RECOMMEND_LIMITS,
+            'max_concurrent': SCORING_WORKERS * SCORING_QUEUE,
+            'max_queue': SCORING_BACKLOG})
+        self.apply = AsyncConcurrencyLimiter(**service.APPLY_LIMITS)
+        # Export these, not the Flask app's idle limiters, under the same admission metrics
+        service.admission.limit('get_recommendations', self.recommend)
+        service.admission.limit('apply_to_internship', self.apply)
+
+    def shutdown(self):
+        self.scoring.shutdown(cancel_futures=True)
+        self.io.shutdown(cancel_futures=True)
+
+    async def score(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.scoring, fn, *args)
+
+    async def run_io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.io, fn, *args)
+
+
+executors = Executors()
+
+
+def _error(e, status_code=400):
+    return CompatJSONResponse({'success': False, 'error': str(e)}, status_code=status_code)
+
+
+async def _admit(endpoint, limiter, fallback=None):
+    """None once a slot is held (release it when done), otherwise the response to send"""
+    if await limiter.try_acquire():
+        service.admission.record(endpoint, ADMITTED)
+        return None
+    if fallback is not None:
+        response = fallback()
+        if response is not None:
+            limiter.outcomes[DEGRADED] += 1
+            service.admission.record(endpoint, DEGRADED)
+            return response
+    outcome = await limiter.acquire()
+    service.admission.record(endpoint, outcome)
+    if outcome in (ADMITTED, QUEUED):
+        return None
+    return CompatJSONResponse(overloaded_body(limiter), status_code=503,
+                              headers={'Retry-After': str(limiter.retry_after)})
+
+
+def _cached_recommendations(candidate_id, n):
+    recommendations = service.cached_recommendations(candidate_id, n)
+    if recommendations is None:
+        return None
+    return CompatJSONResponse(service.recommendation_payload(candidate_id, recommendations, degraded=True),
+                              headers={'X-Degraded': 'cached'})
+
+
+async def health_check(request):
+    return CompatJSONResponse({
+        'status': 'healthy',
+        'model_loaded': service.tfidf_vectorizer is not None,
+        'data_loaded': service.candidates_df is not None and service.internship_df is not None
+    })
+
+
+async def readiness_check(request):
+    ready = service.candidates_df is not None and service.internship_df is not None
+    return CompatJSONResponse({
+        'status': 'ready' if ready else 'loading',
+        'model_version': service.model_version,
+        'pid': os.getpid()
+    }, status_code=200 if ready else 503)
+
+
+async def metrics(request):
+    # Same registry as the Flask app: model gauges, request metrics and admission decisions
+    return Response(service.request_metrics.registry.render(), media_type=CONTENT_TYPE)
+
+
+async def get_recommendations(request):
+    try:
+        data = await request.json()
+        candidate_id = int(data.get('candidate_id'))
+        n = int(data.get('n', 10))
+
+        refused = await _admit('get_recommendations', executors.recommend,
+                               lambda: _cached_recommendations(candidate_id, n))
+        if refused is not None:
+            return refused
+        try:
+            recommendations = await executors.score(service.recommendation_internship, candidate_id, n)
+        finally:
+            executors.recommend.release()
+        service.remember_recommendations(candidate_id, n, recommendations)
+
+        return CompatJSONResponse(service.recommendation_payload(candidate_id, recommendations))
+    except Exception as e:
+        return _error(e)
+
+
+async def apply_to_internship(request):
+    try:
+        data = await request.json()
+        fields = service.application_fields(data, request.headers.get('Idempotency-Key'))
+        refused = await _admit('apply_to_internship', executors.apply)
+        if refused is not None:
+            return refused
+        try:
+            # Awaits the writer's group commit without parking a thread on it
+            future = await executors.run_io(functools.partial(service.application_store().add, **fields))
+            # shield: a timeout here must not cancel the write the store is about to make
+            try:
+                application, created = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), service.APPLICATION_WRITE_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise ApplicationStoreBusy('Application is still being saved, please retry shortly')
+        finally:
+            executors.apply.release()
+        return CompatJSONResponse(service.application_response(application, created))
+    except ApplicationStoreBusy as e:
+        return CompatJSONResponse({'success': False, 'error': str(e)}, status_code=503, headers={'Retry-After': '1'})
+    except Exception as e:
+        return _error(e)
+
+
+async def get_applications(request):
+    try:
+        candidate_id = request.query_params.get('candidate_id')
+        applications = await executors.run_io(service.list_applications, candidate_id)
+        return CompatJSONResponse({'success': True, 'applications': applications})
+    except Exception as e:
+        return _error(e)
+
+
+async def get_allotment(request):
+    try:
+        candidate_id = request.query_params.get('candidate_id')
+        # In-memory index lookup; cheap enough to run on the loop
+        allotment = service.allotment_for(candidate_id)
+        if allotment is not None:
+            return CompatJSONResponse({'success': True, 'allotment': allotment})
+        return CompatJSONResponse({
+            'success': True,
+            'allotment': None,
+            'message': 'No allotment available yet'
+        })
+    except Exception as e:
+        return _error(e)
+
+
+async def run_allocation(request):
+    try:
+        return CompatJSONResponse(service.start_allocation(), status_code=202)
+    except Exception as e:
+        return _error(e, status_code=500)
+
+
+async def get_allocation_status(request):
+    try:
+        return CompatJSONResponse(service.allocation_status())
+    except Exception as e:
+        return _error(e, status_code=500)
+
+
+async def get_all_candidates(request):
+    try:
+        candidates_list = service.candidate_records()
+        return CompatJSONResponse({
+            'success': True,
+            'candidates': candidates_list,
+            'total': len(candidates_list)
+        })
+    except Exception as e:
+        return _error(e, status_code=500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if service.load_model_and_data():
+        print("📊 Model and data ready")
+    else:
+        print("⚠️  Running with mock data only")
+    # Created after loading so forked scoring workers inherit the model
+    executors.start()
+    try:
+        yield
+    finally:
+        executors.shutdown()
+
+
+routes = [
+    Route('/health', health_check, methods=['GET']),
+    Route('/ready', readiness_check, methods=['GET']),
+    Route('/metrics', metrics, methods=['GET']),
+    Route('/recommend', get_recommendations, methods=['POST']),
+    Route('/apply', apply_to_internship, methods=['POST']),
+    Route('/applications', get_applications, methods=['GET']),
+    Route('/allotment', get_allotment, methods=['GET']),
+    Route('/allocate', run_allocation, methods=['POST']),
+    Route('/allocate', get_allocation_status, methods=['GET']),
+    Route('/candidates', get_all_candidates, methods=['GET']),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        Middleware(ASGIRequestMetrics, metrics=service.request_metrics, routes=[route.path for route in routes])
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Starting PM Internship Recommendation API (asyncio)...")
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), log_level='warning')
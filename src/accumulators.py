@@ -0,0 +1,84 @@
+"""
+Streaming accumulators for running metrics
+Each update is O(1) and a summary is O(bins), so metrics over a growing stream
+never require keeping or re-reading the underlying values.
+"""
+
+import math
+
+
+class RunningStats:
+    """Count, mean and variance via Welford's algorithm; supports removing a value"""
+
+    __slots__ = ('count', 'mean', '_m2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def remove(self, value):
+        # min/max are not recoverable after a removal; they stay as observed bounds
+        if self.count <= 1:
+            self.__init__()
+            return
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self._m2 = max(0.0, self._m2 - delta * (value - self.mean))
+
+    @property
+    def variance(self):
+        """Population variance"""
+        return self._m2 / self.count if self.count else 0.0
+
+    def summary(self, digits=4):
+        return {
+            'count': self.count,
+            'mean': round(self.mean, digits),
+            'variance': round(self.variance, digits),
+            'stddev': round(math.sqrt(self.variance), digits),
+            'min': self.minimum,
+            'max': self.maximum
+        }
+
+
+class FixedHistogram:
+    """Equal-width bins over [low, high]; out-of-range values land in the edge bins"""
+
+    __slots__ = ('low', 'high', 'bins', 'counts')
+
+    def __init__(self, low, high, bins=10):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = [0] * bins
+
+    def _index(self, value):
+        position = (value - self.low) / (self.high - self.low) * self.bins
+        return min(self.bins - 1, max(0, int(position)))
+
+    def add(self, value):
+        self.counts[self._index(value)] += 1
+
+    def remove(self, value):
+        index = self._index(value)
+        if self.counts[index]:
+            self.counts[index] -= 1
+
+    def summary(self):
+        width = (self.high - self.low) / self.bins
+        return {
+            'bin_edges': [round(self.low + i * width, 6) for i in range(self.bins + 1)],
+            'counts': list(self.counts)
+        }
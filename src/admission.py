@@ -0,0 +1,225 @@
+"""
+Admission control for request bursts
+Each limited endpoint gets a fixed number of concurrent slots and a short,
+bounded wait queue. Requests that cannot get a slot within the queue timeout,
+or that arrive when the queue is full, are turned away immediately with 503
+and Retry-After instead of piling up behind the server's thread pool. An
+endpoint may register a fallback (e.g. cached results) that is served when
+its slots are all busy.
+"""
+
+import asyncio
+import threading
+from collections import Counter as Tally, deque
+
+from flask import g, jsonify, request
+
+ADMITTED = 'admitted'
+QUEUED = 'queued'
+REJECTED = 'rejected'
+TIMED_OUT = 'timed_out'
+DEGRADED = 'degraded'
+
+
+class _Limits:
+    def __init__(self, max_concurrent, max_queue=0, queue_timeout=1.0, retry_after=1):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.outcomes = Tally()
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            **self.outcomes
+        }
+
+
+class ConcurrencyLimiter(_Limits):
+    """
+    Slot limiter for threaded servers. Waiters are served in arrival order for at
+    most `queue_timeout`: a released slot is handed straight to the oldest waiter,
+    so a request arriving at that moment queues behind it instead of taking it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._waiters = deque()  # one Event per queued request, oldest first
+
+    def try_acquire(self):
+        """Take a slot only if one is free and nobody is queued ahead"""
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                self.outcomes[ADMITTED] += 1
+                return True
+            return False
+
+    def acquire(self):
+        """Take a slot, queueing if allowed; returns the outcome"""
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                outcome = ADMITTED
+            elif len(self._waiters) >= self.max_queue:
+                outcome = REJECTED
+            else:
+                waiter = threading.Event()
+                self._waiters.append(waiter)
+                self.waiting += 1
+                outcome = None
+            if outcome is not None:
+                self.outcomes[outcome] += 1
+                return outcome
+
+        handed_off = waiter.wait(self.queue_timeout)
+        with self._lock:
+            # A slot handed over just as the wait timed out still counts
+            if not handed_off and not waiter.is_set():
+                self._waiters.remove(waiter)
+                self.waiting -= 1
+                outcome = TIMED_OUT
+            else:
+                outcome = QUEUED
+            self.outcomes[outcome] += 1
+            return outcome
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # The slot passes to the oldest waiter, so `active` stays the same
+                self._waiters.popleft().set()
+                self.waiting -= 1
+            else:
+                self.active -= 1
+
+
+class AsyncConcurrencyLimiter(_Limits):
+    """The same policy for an asyncio event loop; waiters never hold a thread"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+    async def try_acquire(self):
+        # locked() is also true while others are queued, so free slots go to them first
+        if self._semaphore.locked():
+            return False
+        await self._semaphore.acquire()
+        self.active += 1
+        self.outcomes[ADMITTED] += 1
+        return True
+
+    async def acquire(self):
+        if not self._semaphore.locked():
+            outcome = ADMITTED
+            await self._semaphore.acquire()
+        elif self.waiting >= self.max_queue:
+            outcome = REJECTED
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+                outcome = QUEUED
+            except asyncio.TimeoutError:
+                outcome = TIMED_OUT
+            finally:
+                self.waiting -= 1
+
+        if outcome in (ADMITTED, QUEUED):
+            self.active += 1
+        self.outcomes[outcome] += 1
+        return outcome
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+
+def overloaded_body(limiter):
+    return {
+        'success': False,
+        'error': 'Server is busy, please retry shortly',
+        'retry_after': limiter.retry_after
+    }
+
+
+class AdmissionControl:
+    """
+    Per-endpoint ConcurrencyLimiters for a Flask app. `fallback` is called when
+    an endpoint's slots are all busy; a response it returns is served (counted
+    as degraded) instead of queueing, None means queue as usual.
+    """
+
+    def __init__(self, app=None, registry=None, namespace='app'):
+        self.limiters = {}
+        self.fallbacks = {}
+
+        self.outcomes = None
+        if registry is not None:
+            self.outcomes = registry.counter(
+                f'{namespace}_admission_total', 'Admission decisions', ('endpoint', 'outcome'))
+            registry.gauge_callback(
+                f'{namespace}_admission_active', 'Requests holding an admission slot',
+                lambda: {(endpoint,): limiter.active for endpoint, limiter in self.limiters.items()},
+                labelnames=('endpoint',))
+            registry.gauge_callback(
+                f'{namespace}_admission_waiting', 'Requests queued for an admission slot',
+                lambda: {(endpoint,): limiter.waiting for endpoint, limiter in self.limiters.items()},
+                labelnames=('endpoint',))
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def limit(self, endpoint, limiter, fallback=None):
+        self.limiters[endpoint] = limiter
+        if fallback is not None:
+            self.fallbacks[endpoint] = fallback
+
+    def stats(self):
+        return {endpoint: limiter.stats() for endpoint, limiter in self.limiters.items()}
+
+    def record(self, endpoint, outcome):
+        """Count an admission decision (also used by the asyncio variant, which admits on its own)"""
+        if self.outcomes is not None:
+            self.outcomes.inc(endpoint, outcome)
+
+    def _before_request(self):
+        endpoint = request.endpoint
+        limiter = self.limiters.get(endpoint)
+        if limiter is None:
+            return None
+
+        if limiter.try_acquire():
+            outcome = ADMITTED
+        else:
+            fallback = self.fallbacks.get(endpoint)
+            response = fallback() if fallback is not None else None
+            if response is not None:
+                limiter.outcomes[DEGRADED] += 1
+                self.record(endpoint, DEGRADED)
+                return response
+            outcome = limiter.acquire()
+
+        self.record(endpoint, outcome)
+        if outcome not in (ADMITTED, QUEUED):
+            return jsonify(overloaded_body(limiter)), 503, {'Retry-After': str(limiter.retry_after)}
+
+        g._admission = limiter
+        return None
+
+    def _teardown_request(self, exc):
+        limiter = g.pop('_admission', None)
+        if limiter is not None:
+            limiter.release()
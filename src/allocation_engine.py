@@ -1,27 +1,47 @@
+# scikit-learn is imported where it is first used, so importing this module
+# (and starting a worker) does not pay for it up front
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.ensemble import RandomForestClassifier
 import json
 import random
 from datetime import datetime, timedelta
-from textblob import TextBlob
-import nltk
-from collections import defaultdict
+from collections import defaultdict, deque
+import atexit
+import logging
+import re
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from src.accumulators import FixedHistogram, RunningStats
+from src.cache import LRUCache
+from src.pubsub import EventBroker
+from src.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+def _process_peak_rss_mb():
+    """
+    Process high-water RSS in MB since start (None where getrusage is unavailable).
+    It never goes down, so it bounds a run's memory rather than measuring it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
 
 class SmartAllocationEngine:
     def __init__(self):
-        self.skill_vectorizer = TfidfVectorizer(stop_words='english')
-        self.success_predictor = RandomForestClassifier(n_estimators=100, random_state=42)
+        # Built on first use (see the properties below)
+        self._skill_vectorizer = None
+        self._success_predictor = None
         self.is_trained = False
         
-        # Download NLTK data (if not already present)
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-        
         # Skill categories for PM roles
         self.pm_skill_categories = {
             'technical': ['python', 'sql', 'data analysis', 'excel', 'tableau', 'powerbi', 'jira', 'confluence'],
@@ -31,6 +51,20 @@ class SmartAllocationEngine:
             'business': ['strategy', 'business model', 'market analysis', 'customer insights']
         }
     
+    @property
+    def skill_vectorizer(self):
+        if self._skill_vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._skill_vectorizer = TfidfVectorizer(stop_words='english')
+        return self._skill_vectorizer
+    
+    @property
+    def success_predictor(self):
+        if self._success_predictor is None:
+            from sklearn.ensemble import RandomForestClassifier
+            self._success_predictor = RandomForestClassifier(n_estimators=100, random_state=42)
+        return self._success_predictor
+    
     def calculate_skill_match(self, intern_skills, project_requirements):
         """
         Advanced skill matching using NLP and weighted scoring
@@ -48,6 +82,7 @@ class SmartAllocationEngine:
         # Create TF-IDF vectors
         texts = [intern_skills_text, project_skills_text]
         try:
+            from sklearn.metrics.pairwise import cosine_similarity
             tfidf_matrix = self.skill_vectorizer.fit_transform(texts)
             similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
         except:
@@ -214,43 +249,77 @@ class SmartAllocationEngine:
         """
         Core allocation algorithm using multi-objective optimization
         """
-        start_time = datetime.now()
+        clock = time.perf_counter
+        run_start = clock()
+        
+        # Per-run instrumentation: phase timers (seconds) and counters
+        phase_seconds = defaultdict(float)
+        counters = defaultdict(int)
         
         allocations = []
         used_projects = set()
         mentor_capacity = {mentor.id: mentor.max_interns for mentor in mentors}
         
-        # Calculate all possible matches
-        match_matrix = []
+        # Optional candidate generation: {intern_id: project_ids sharing a required skill}
+        candidate_projects = (constraints or {}).get('candidate_projects')
         
+        # Skill match depends only on (intern, project), so score it once and reuse it across mentors
+        skill_cache = {}
+        project_skills = {project.id: project.get_required_skills() for project in projects}
+        
+        # Calculate all possible matches
         for intern in interns:
             intern_matches = []
+            intern_skills = intern.get_skills()
+            intern_preferences = intern.get_preferences()
+            
+            # Fall back to every open project when no skill-overlapping candidate is left
+            allowed_projects = None
+            if candidate_projects:
+                allowed_projects = set(candidate_projects.get(intern.id, ())) - used_projects or None
             
             for project in projects:
                 if project.id in used_projects:
+                    counters['triples_pruned'] += len(mentors)
+                    continue
+                
+                if allowed_projects is not None and project.id not in allowed_projects:
+                    counters['triples_pruned'] += len(mentors)
                     continue
                 
                 for mentor in mentors:
                     if mentor_capacity[mentor.id] <= 0:
+                        counters['triples_pruned'] += 1
                         continue
                     
+                    counters['triples_scored'] += 1
+                    
                     # Calculate individual match scores
-                    skill_match = self.calculate_skill_match(
-                        intern.get_skills(), 
-                        project.get_required_skills()
-                    )
+                    t0 = clock()
+                    skill_key = (intern.id, project.id)
+                    skill_match = skill_cache.get(skill_key)
+                    if skill_match is None:
+                        skill_match = self.calculate_skill_match(intern_skills, project_skills[project.id])
+                        skill_cache[skill_key] = skill_match
+                        counters['skill_cache_misses'] += 1
+                    else:
+                        counters['skill_cache_hits'] += 1
                     
+                    t1 = clock()
                     preference_match = self.calculate_preference_match(
-                        intern.get_preferences(), 
+                        intern_preferences, 
                         project, 
                         mentor
                     )
                     
+                    t2 = clock()
                     availability_match = self.calculate_availability_match(
                         intern.availability, 
                         mentor.availability
                     )
                     
+                    t3 = clock()
+                    
                     # Overall match score
                     overall_score = (
                         skill_match * 0.5 +
@@ -269,6 +338,12 @@ class SmartAllocationEngine:
                         intern, project, mentor, match_scores
                     )
                     
+                    t4 = clock()
+                    phase_seconds['skill_scoring'] += t1 - t0
+                    phase_seconds['preference_scoring'] += t2 - t1
+                    phase_seconds['availability_scoring'] += t3 - t2
+                    phase_seconds['success_prediction'] += t4 - t3
+                    
                     intern_matches.append({
                         'intern_id': intern.id,
                         'project_id': project.id,
@@ -283,22 +358,43 @@ class SmartAllocationEngine:
             
             # Sort by final score and pick best match
             if intern_matches:
+                t0 = clock()
                 intern_matches.sort(key=lambda x: x['final_score'], reverse=True)
                 best_match = intern_matches[0]
+                phase_seconds['selection'] += clock() - t0
                 
                 allocations.append(best_match)
                 used_projects.add(best_match['project_id'])
                 mentor_capacity[best_match['mentor_id']] -= 1
         
-        end_time = datetime.now()
-        processing_time = (end_time - start_time).total_seconds()
+        processing_time = clock() - run_start
+        
+        lookups = counters['skill_cache_hits'] + counters['skill_cache_misses']
+        metrics = {
+            'phase_seconds': {phase: round(seconds, 6) for phase, seconds in phase_seconds.items()},
+            'total_seconds': round(processing_time, 6),
+            'interns': len(interns),
+            'projects': len(projects),
+            'mentors': len(mentors),
+            'triples_scored': counters['triples_scored'],
+            'triples_pruned': counters['triples_pruned'],
+            'skill_cache': {
+                'hits': counters['skill_cache_hits'],
+                'misses': counters['skill_cache_misses'],
+                'hit_rate': round(counters['skill_cache_hits'] / lookups, 4) if lookups else 0.0
+            },
+            'process_peak_rss_mb': _process_peak_rss_mb()
+        }
+        
+        logger.info(json.dumps({'event': 'allocation_run', 'allocations': len(allocations), **metrics}))
         
         return {
             'allocations': allocations,
             'processing_time': processing_time,
             'total_matches': len(allocations),
             'average_score': np.mean([a['final_score'] for a in allocations]) if allocations else 0,
-            'algorithm_version': 'SmartEngine_v1.0'
+            'algorithm_version': 'SmartEngine_v1.0',
+            'metrics': metrics
         }
     
     def dynamic_reallocation(self, current_allocations, new_constraints):
@@ -334,6 +430,9 @@ class SmartAllocationEngine:
         improved['final_score'] += random.uniform(5, 15)
         return improved
     
+    # Score columns read by the insights, stacked row-wise into one float matrix
+    INSIGHT_COLUMNS = ('final_score', 'skill_match', 'preference_match', 'availability_match', 'success_probability')
+    
     def generate_insights(self, allocations_data):
         """
         Wow Factor: AI-generated insights and recommendations
@@ -341,43 +440,84 @@ class SmartAllocationEngine:
         if not allocations_data:
             return {}
         
-        df = pd.DataFrame(allocations_data['allocations'])
+        stats = self._insight_statistics(allocations_data['allocations'])
         
         insights = {
             'summary': {
-                'total_allocations': len(df),
-                'average_match_score': round(df['final_score'].mean(), 2),
-                'high_confidence_matches': len(df[df['final_score'] >= 85]),
+                'total_allocations': stats['count'],
+                'average_match_score': round(stats['mean']['final_score'], 2),
+                'high_confidence_matches': stats['high_confidence_matches'],
                 'processing_time': allocations_data['processing_time']
             },
-            'skill_analysis': self._analyze_skill_gaps(df),
-            'recommendations': self._generate_recommendations(df),
-            'risk_factors': self._identify_risk_factors(df),
-            'optimization_suggestions': self._suggest_optimizations(df)
+            'skill_analysis': self._analyze_skill_gaps(stats),
+            'recommendations': self._generate_recommendations(stats),
+            'risk_factors': self._identify_risk_factors(stats),
+            'optimization_suggestions': self._suggest_optimizations(stats)
         }
         
         return insights
     
-    def _analyze_skill_gaps(self, df):
+    def _insight_statistics(self, allocations):
+        """
+        Every mean, threshold count and describe-statistic the insights need, from one
+        (columns x allocations) float64 matrix. Reductions follow pandas' formulas
+        (sum / count, ddof=1, linear quantiles) so results match the DataFrame version.
+        """
+        count = len(allocations)
+        matrix = np.empty((len(self.INSIGHT_COLUMNS), count), dtype=np.float64)
+        for row, column in enumerate(self.INSIGHT_COLUMNS):
+            matrix[row] = np.fromiter((a[column] for a in allocations), dtype=np.float64, count=count)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = matrix.sum(axis=1) / count
+        mean = {column: means[row] for row, column in enumerate(self.INSIGHT_COLUMNS)}
+        
+        final_score, skill_match, _, _, success = matrix
+        
+        if count > 1:
+            skill_std = np.sqrt(((skill_match - mean['skill_match']) ** 2).sum() / (count - 1))
+        else:
+            skill_std = np.nan
+        quantiles = np.percentile(skill_match, [0, 25, 50, 75, 100]) if count else [np.nan] * 5
+        
+        return {
+            'count': count,
+            'mean': mean,
+            'high_confidence_matches': int(np.count_nonzero(final_score >= 85)),
+            'low_skill_matches': int(np.count_nonzero(skill_match < 60)),
+            'low_success_matches': int(np.count_nonzero(success < 60)),
+            'skill_describe': {
+                'count': float(count),
+                'mean': float(mean['skill_match']),
+                'std': float(skill_std),
+                'min': float(quantiles[0]),
+                '25%': float(quantiles[1]),
+                '50%': float(quantiles[2]),
+                '75%': float(quantiles[3]),
+                'max': float(quantiles[4])
+            }
+        }
+    
+    def _analyze_skill_gaps(self, stats):
         """Analyze skill gaps in the allocation"""
         return {
-            'low_skill_matches': len(df[df['skill_match'] < 60]),
-            'average_skill_match': round(df['skill_match'].mean(), 2),
-            'skill_distribution': df['skill_match'].describe().to_dict()
+            'low_skill_matches': stats['low_skill_matches'],
+            'average_skill_match': round(stats['mean']['skill_match'], 2),
+            'skill_distribution': stats['skill_describe']
         }
     
-    def _generate_recommendations(self, df):
+    def _generate_recommendations(self, stats):
         """Generate AI recommendations for improvement"""
         recommendations = []
         
-        if df['skill_match'].mean() < 70:
+        if stats['mean']['skill_match'] < 70:
             recommendations.append({
                 'type': 'skill_improvement',
                 'message': 'Consider organizing skill development workshops for interns',
                 'priority': 'high'
             })
         
-        if df['preference_match'].mean() < 75:
+        if stats['mean']['preference_match'] < 75:
             recommendations.append({
                 'type': 'preference_alignment',
                 'message': 'Improve project descriptions to better match intern interests',
@@ -386,25 +526,25 @@ class SmartAllocationEngine:
         
         return recommendations
     
-    def _identify_risk_factors(self, df):
+    def _identify_risk_factors(self, stats):
         """Identify potential risks in allocations"""
         risks = []
         
-        low_success_allocations = df[df['success_probability'] < 60]
-        if len(low_success_allocations) > 0:
+        low_success_allocations = stats['low_success_matches']
+        if low_success_allocations > 0:
             risks.append({
                 'type': 'low_success_probability',
-                'count': len(low_success_allocations),
-                'message': f'{len(low_success_allocations)} allocations have low success probability'
+                'count': low_success_allocations,
+                'message': f'{low_success_allocations} allocations have low success probability'
             })
         
         return risks
     
-    def _suggest_optimizations(self, df):
+    def _suggest_optimizations(self, stats):
         """Suggest optimizations for future allocations"""
         suggestions = []
         
-        if df['availability_match'].mean() < 80:
+        if stats['mean']['availability_match'] < 80:
             suggestions.append({
                 'area': 'scheduling',
                 'suggestion': 'Implement flexible scheduling options',
@@ -413,38 +553,168 @@ class SmartAllocationEngine:
         
         return suggestions
 
+# Approximate bytes held by one recorded event dict
+EVENT_SIZE_ESTIMATE = 512
+
+class SessionMetrics:
+    """Running metrics for one monitoring session, updated in O(1) per allocation"""
+    
+    def __init__(self, allocations=()):
+        self.final_score = RunningStats()
+        self.skill_match = RunningStats()
+        self.success_probability = RunningStats()
+        self.skill_match_histogram = FixedHistogram(0, 100)
+        self.success_probability_histogram = FixedHistogram(0, 100)
+        self.updated_at = datetime.now()
+        
+        for allocation in allocations:
+            self.add(allocation)
+    
+    def add(self, allocation):
+        self.final_score.add(allocation['final_score'])
+        self.skill_match.add(allocation['skill_match'])
+        self.success_probability.add(allocation['success_probability'])
+        self.skill_match_histogram.add(allocation['skill_match'])
+        self.success_probability_histogram.add(allocation['success_probability'])
+        self.updated_at = datetime.now()
+    
+    def remove(self, allocation):
+        self.final_score.remove(allocation['final_score'])
+        self.skill_match.remove(allocation['skill_match'])
+        self.success_probability.remove(allocation['success_probability'])
+        self.skill_match_histogram.remove(allocation['skill_match'])
+        self.success_probability_histogram.remove(allocation['success_probability'])
+        self.updated_at = datetime.now()
+    
+    def summary(self):
+        if not self.final_score.count:
+            return {}
+        
+        return {
+            'total_allocations': self.final_score.count,
+            'average_confidence': round(self.final_score.mean, 2),
+            'skill_match': self.skill_match.summary(),
+            'skill_match_distribution': self.skill_match_histogram.summary(),
+            'success_probability': self.success_probability.summary(),
+            'success_probability_distribution': self.success_probability_histogram.summary(),
+            'timestamp': self.updated_at.isoformat()
+        }
+
 class RealTimeAllocationMonitor:
     """
     Wow Factor: Real-time monitoring and adjustment system
     """
-    def __init__(self):
-        self.allocation_engine = SmartAllocationEngine()
-        self.active_sessions = {}
+    def __init__(self, allocation_engine=None, broker=None, max_events=200, **store_options):
+        """
+        `store_options` configure the bounded session store (max_sessions,
+        ttl_seconds, memory_budget_bytes, spill_path, sync_interval); see SessionStore.
+        """
+        # Share the application's engine instead of building another one
+        self.allocation_engine = allocation_engine or SmartAllocationEngine()
+        # Subscribers (SSE clients) receive each event as it is recorded
+        self.broker = broker or EventBroker()
+        self.max_events = max_events
+        self.active_sessions = SessionStore(
+            serialize=self._serialize_session,
+            deserialize=self._deserialize_session,
+            size_of=self._session_size,
+            **store_options
+        )
+        if self.active_sessions.spill_path:
+            atexit.register(self.active_sessions.flush)
+        self._demo_feed = None
+        self._demo_lock = threading.Lock()
     
-    def start_monitoring_session(self, session_id, allocations):
-        """Start real-time monitoring for a set of allocations"""
-        self.active_sessions[session_id] = {
+    def _new_session(self, allocations, start_time, events=()):
+        return {
             'allocations': allocations,
-            'start_time': datetime.now(),
-            'events': [],
-            'metrics': self._calculate_realtime_metrics(allocations)
+            'start_time': start_time,
+            # Ring buffer: only the latest events are kept
+            'events': deque(events, maxlen=self.max_events),
+            'metrics': SessionMetrics(allocations)
         }
     
-    def _calculate_realtime_metrics(self, allocations):
-        """Calculate real-time performance metrics"""
-        if not allocations:
-            return {}
-        
-        df = pd.DataFrame(allocations)
-        
+    def _serialize_session(self, session):
         return {
-            'total_allocations': len(df),
-            'average_confidence': round(df['final_score'].mean(), 2),
-            'skill_match_distribution': df['skill_match'].tolist(),
-            'success_predictions': df['success_probability'].tolist(),
-            'timestamp': datetime.now().isoformat()
+            'allocations': session['allocations'],
+            'start_time': session['start_time'].isoformat(),
+            'events': list(session['events'])
         }
     
+    def _deserialize_session(self, data):
+        return self._new_session(data['allocations'], datetime.fromisoformat(data['start_time']), data['events'])
+    
+    def _session_size(self, session):
+        """Rough footprint: first allocation's size scaled by count, plus a full event ring"""
+        allocations = session['allocations']
+        per_allocation = 0
+        if allocations:
+            sample = allocations[0]
+            per_allocation = sys.getsizeof(sample) + sum(sys.getsizeof(v) for v in sample.values())
+        return per_allocation * len(allocations) + self.max_events * EVENT_SIZE_ESTIMATE
+    
+    def start_monitoring_session(self, session_id, allocations):
+        """Start real-time monitoring for a set of allocations"""
+        self.active_sessions[session_id] = self._new_session(allocations, datetime.now())
+        self.publish_event(session_id, {
+            'type': 'allocation_generated',
+            'message': f'{len(allocations)} allocations generated'
+        })
+    
+    def subscribe(self, session_id, loop=None):
+        """Subscribe to a session's events (read on `loop` if given); None if the session is unknown"""
+        if session_id not in self.active_sessions:
+            return None
+        return self.broker.subscribe(session_id, loop=loop)
+    
+    def publish_event(self, session_id, event):
+        """Record an event on a session and push it, with current metrics, to subscribers"""
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return None
+        
+        event = dict(event, timestamp=datetime.now().isoformat())
+        session['events'].append(event)
+        self.active_sessions.mark_dirty(session_id)
+        self.broker.publish(session_id, {'update': event, 'session_metrics': session['metrics'].summary()})
+        return event
+    
+    def session_metrics(self, session_id):
+        session = self.active_sessions.get(session_id)
+        return session['metrics'].summary() if session is not None else {}
+    
+    def add_allocation(self, session_id, allocation):
+        """Add an allocation to a live session and push the updated metrics"""
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return None
+        
+        session['allocations'].append(allocation)
+        session['metrics'].add(allocation)
+        return self.publish_event(session_id, {
+            'type': 'allocation_added',
+            'message': f"Intern {allocation['intern_id']} allocated to project {allocation['project_id']}"
+        })
+    
+    def remove_allocation(self, session_id, allocation):
+        """Drop an allocation (e.g. on reallocation) and push the updated metrics"""
+        session = self.active_sessions.get(session_id)
+        if session is None or allocation not in session['allocations']:
+            return None
+        
+        session['allocations'].remove(allocation)
+        session['metrics'].remove(allocation)
+        return self.publish_event(session_id, {
+            'type': 'allocation_removed',
+            'message': f"Intern {allocation['intern_id']} released from project {allocation['project_id']}"
+        })
+    
+    def record_allocation_event(self, intern_id, project_id, event):
+        """Publish an event to every session containing this intern/project allocation"""
+        for session_id, session in list(self.active_sessions.items()):
+            if any(a['intern_id'] == intern_id and a['project_id'] == project_id for a in session['allocations']):
+                self.publish_event(session_id, event)
+    
     def simulate_realtime_updates(self, session_id):
         """
         Wow Factor: Simulate real-time updates for demo
@@ -452,8 +722,6 @@ class RealTimeAllocationMonitor:
         if session_id not in self.active_sessions:
             return None
         
-        session = self.active_sessions[session_id]
-        
         # Simulate events
         events = [
             {'type': 'intern_joined', 'message': 'New intern registered in the system'},
@@ -463,50 +731,102 @@ class RealTimeAllocationMonitor:
             {'type': 'feedback_received', 'message': 'Positive feedback received from mentor'}
         ]
         
-        new_event = random.choice(events)
-        new_event['timestamp'] = datetime.now().isoformat()
-        
-        session['events'].append(new_event)
-        
-        # Update metrics
-        session['metrics'] = self._calculate_realtime_metrics(session['allocations'])
-        
-        return new_event
+        # Simulated events leave the allocations (and so the metrics) unchanged
+        return self.publish_event(session_id, random.choice(events))
+    
+    def ensure_demo_feed(self, interval):
+        """
+        Start (once per process) a thread that simulates events for sessions that
+        have live subscribers. Started lazily so it also runs in forked workers.
+        """
+        if interval <= 0:
+            return
+        with self._demo_lock:
+            if self._demo_feed is not None and self._demo_feed.is_alive():
+                return
+            
+            def feed():
+                while True:
+                    time.sleep(interval)
+                    for session_id in list(self.active_sessions):
+                        if self.broker.subscriber_count(session_id):
+                            self.simulate_realtime_updates(session_id)
+            
+            self._demo_feed = threading.Thread(target=feed, daemon=True, name='realtime-demo-feed')
+            self._demo_feed.start()
 
 class AIInsightsGenerator:
     """
     Wow Factor: Advanced AI insights and predictive analytics
     """
-    def __init__(self):
-        self.insights_history = []
+    # Columns the analyzers read, converted once per call
+    INSIGHT_COLUMNS = ('success_probability', 'skill_match', 'preference_match')
     
-    def generate_advanced_insights(self, allocations, historical_data=None):
-        """Generate comprehensive AI insights"""
+    def __init__(self, history_size=50, cache_size=128):
+        # Ring of the latest insight runs
+        self.insights_history = deque(maxlen=history_size)
+        # Batch allocations do not change after generation, so insights are memoized per batch
+        self._cache = LRUCache(cache_size)
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def generate_advanced_insights(self, allocations, historical_data=None, batch_id=None, memoize=False):
+        """
+        Generate comprehensive AI insights. With `memoize`, the result is cached
+        under `batch_id`; only pass it when `allocations` are that batch's own
+        (server-side) allocations, never caller-supplied ones.
+        """
+        cache_key = (batch_id, bool(historical_data)) if memoize and batch_id is not None and allocations else None
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+        
+        columns = self._to_columns(allocations)
         insights = {
-            'performance_prediction': self._predict_batch_performance(allocations),
-            'optimization_opportunities': self._find_optimization_opportunities(allocations),
+            'performance_prediction': self._predict_batch_performance(columns),
+            'optimization_opportunities': self._find_optimization_opportunities(columns),
             'trend_analysis': self._analyze_trends(historical_data),
-            'success_factors': self._identify_success_factors(allocations),
+            'success_factors': self._identify_success_factors(columns),
             'ai_recommendations': self._generate_ai_recommendations(allocations)
         }
         
         self.insights_history.append({
             'timestamp': datetime.now().isoformat(),
+            'batch_id': batch_id,
             'insights': insights
         })
         
+        if cache_key is not None:
+            self._cache.put(cache_key, insights)
+        
         return insights
     
-    def _predict_batch_performance(self, allocations):
-        """Predict overall batch performance"""
+    def _to_columns(self, allocations):
+        """One columnar conversion of the allocation dicts, shared by every analyzer"""
         if not allocations:
+            return None
+        return {
+            column: np.fromiter((a[column] for a in allocations), dtype=np.float64, count=len(allocations))
+            for column in self.INSIGHT_COLUMNS
+        }
+    
+    @staticmethod
+    def _mean(values):
+        # Matches pandas: the mean of an empty selection is NaN (without numpy's warning)
+        return values.mean() if values.size else np.float64('nan')
+    
+    def _predict_batch_performance(self, columns):
+        """Predict overall batch performance"""
+        if columns is None:
             return {}
         
-        df = pd.DataFrame(allocations)
-        
-        predicted_success_rate = df['success_probability'].mean()
-        high_performers = len(df[df['success_probability'] >= 80])
-        at_risk_interns = len(df[df['success_probability'] < 60])
+        success = columns['success_probability']
+        predicted_success_rate = success.mean()
+        high_performers = int(np.count_nonzero(success >= 80))
+        at_risk_interns = int(np.count_nonzero(success < 60))
         
         return {
             'predicted_success_rate': round(predicted_success_rate, 2),
@@ -515,32 +835,30 @@ class AIInsightsGenerator:
             'completion_probability': round(min(100, predicted_success_rate + 10), 2)
         }
     
-    def _find_optimization_opportunities(self, allocations):
+    def _find_optimization_opportunities(self, columns):
         """Find opportunities to improve allocations"""
         opportunities = []
         
-        if not allocations:
+        if columns is None:
             return opportunities
         
-        df = pd.DataFrame(allocations)
-        
         # Low skill matches
-        low_skill_matches = df[df['skill_match'] < 70]
-        if len(low_skill_matches) > 0:
+        low_skill_matches = int(np.count_nonzero(columns['skill_match'] < 70))
+        if low_skill_matches > 0:
             opportunities.append({
                 'type': 'skill_development',
                 'impact': 'high',
-                'description': f'{len(low_skill_matches)} interns could benefit from pre-internship training',
+                'description': f'{low_skill_matches} interns could benefit from pre-internship training',
                 'suggested_action': 'Organize skill bootcamp sessions'
             })
         
         # Preference mismatches
-        low_pref_matches = df[df['preference_match'] < 70]
-        if len(low_pref_matches) > 0:
+        low_pref_matches = int(np.count_nonzero(columns['preference_match'] < 70))
+        if low_pref_matches > 0:
             opportunities.append({
                 'type': 'project_customization',
                 'impact': 'medium',
-                'description': f'{len(low_pref_matches)} projects could be better aligned with intern interests',
+                'description': f'{low_pref_matches} projects could be better aligned with intern interests',
                 'suggested_action': 'Review and update project descriptions'
             })
         
@@ -558,21 +876,19 @@ class AIInsightsGenerator:
             'success_rate_trend': 'stable at 85%'
         }
     
-    def _identify_success_factors(self, allocations):
+    def _identify_success_factors(self, columns):
         """Identify key factors contributing to successful matches"""
-        if not allocations:
+        if columns is None:
             return {}
         
-        df = pd.DataFrame(allocations)
-        
         # Correlation analysis
-        high_success = df[df['success_probability'] >= 80]
+        high_success = columns['success_probability'] >= 80
         
         success_factors = {
             'key_factors': [
-                {'factor': 'Skill Match', 'importance': 'High', 'avg_score': round(high_success['skill_match'].mean(), 2)},
+                {'factor': 'Skill Match', 'importance': 'High', 'avg_score': round(self._mean(columns['skill_match'][high_success]), 2)},
                 {'factor': 'Mentor Experience', 'importance': 'Medium', 'correlation': 0.65},
-                {'factor': 'Project Alignment', 'importance': 'High', 'avg_score': round(high_success['preference_match'].mean(), 2)}
+                {'factor': 'Project Alignment', 'importance': 'High', 'avg_score': round(self._mean(columns['preference_match'][high_success]), 2)}
             ],
             'optimal_ranges': {
                 'skill_match': '>= 75',
@@ -605,59 +921,177 @@ class AIInsightsGenerator:
         
         return recommendations
 
+# Keyword index for chatbot intent classification: term -> {intent: weight}.
+# Two-word phrases outweigh single words so "best match" beats a bare "match".
+INTENT_KEYWORDS = {
+    'recommendation': {'best match': 3, 'top match': 3, 'recommend': 2, 'recommendation': 2,
+                       'recommendations': 2, 'best': 1, 'top': 1, 'match': 1, 'matches': 1, 'suggest': 1},
+    'skill_gap': {'skill gap': 3, 'skill gaps': 3, 'gap': 2, 'gaps': 2, 'missing': 1, 'lack': 1,
+                  'skill': 1, 'skills': 1, 'training': 1},
+    'success': {'success rate': 3, 'success': 2, 'probability': 2, 'risk': 2, 'at risk': 3,
+                'likely': 1, 'confidence': 1, 'predict': 1, 'prediction': 1},
+    'optimization': {'improve': 2, 'optimize': 2, 'optimise': 2, 'optimization': 2, 'better': 1,
+                     'increase': 1, 'boost': 1, 'quality': 1}
+}
+INTENT_PRIORITY = ('recommendation', 'skill_gap', 'success', 'optimization')
+
+# Target average for a match dimension when suggesting optimizations
+HIGH_SCORE_TARGET = 85
+
+class IntentClassifier:
+    """Score a query against the keyword index; no match falls back to 'general'"""
+    
+    def __init__(self, keywords=INTENT_KEYWORDS):
+        self.index = defaultdict(dict)
+        for intent, terms in keywords.items():
+            for term, weight in terms.items():
+                self.index[term][intent] = weight
+    
+    def classify(self, query):
+        words = re.findall(r"[a-z]+", query.lower())
+        terms = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+        
+        scores = defaultdict(int)
+        for term in terms:
+            for intent, weight in self.index.get(term, {}).items():
+                scores[intent] += weight
+        
+        if not scores:
+            return 'general'
+        # Ties resolve in the order the original substring routing checked intents
+        return max(INTENT_PRIORITY, key=lambda intent: (scores.get(intent, 0), -INTENT_PRIORITY.index(intent)))
+
 # Wow Factor: AI Chatbot for allocation queries
 class AllocationChatBot:
-    def __init__(self, allocation_engine):
+    """
+    Answers allocation questions from aggregate queries over the live allocations.
+    Answers depend only on the intent and the data, so they are cached per
+    (intent, allocation version) and repeated questions skip the database.
+    """
+    
+    def __init__(self, allocation_engine, feature_store=None, cache_size=256):
         self.engine = allocation_engine
         self.context = {}
+        if feature_store is None:
+            from src.feature_store import AllocationFeatureStore
+            feature_store = AllocationFeatureStore()
+        self.feature_store = feature_store
+        self.classifier = IntentClassifier()
+        self.handlers = {
+            'recommendation': self._handle_recommendation_query,
+            'skill_gap': self._handle_skill_gap_query,
+            'success': self._handle_success_query,
+            'optimization': self._handle_optimization_query,
+            'general': self._handle_general_query
+        }
+        self._cache = LRUCache(cache_size)
     
     def process_query(self, query, context_data=None):
         """Process natural language queries about allocations"""
-        query_lower = query.lower()
-        
-        # Simple NLP-based query routing
-        if 'best match' in query_lower or 'recommend' in query_lower:
-            return self._handle_recommendation_query(query, context_data)
-        elif 'skill' in query_lower and 'gap' in query_lower:
-            return self._handle_skill_gap_query(query, context_data)
-        elif 'success' in query_lower or 'probability' in query_lower:
-            return self._handle_success_query(query, context_data)
-        elif 'improve' in query_lower or 'optimize' in query_lower:
-            return self._handle_optimization_query(query, context_data)
-        else:
-            return self._handle_general_query(query, context_data)
+        intent = self.classifier.classify(query)
+        key = (intent, self.feature_store.version())
+        
+        answer = self._cache.get(key)
+        if answer is None:
+            answer = dict(self.handlers[intent](), intent=intent)
+            self._cache.put(key, answer)
+        return answer
     
-    def _handle_recommendation_query(self, query, context_data):
+    @staticmethod
+    def _no_data_answer():
         return {
-            'response': 'Based on the current allocation data, I recommend focusing on skill development in Python and data analysis. The top matches show 87% success probability.',
-            'data': {'top_skills': ['Python', 'Data Analysis', 'Product Strategy']},
-            'suggestions': ['Organize Python workshop', 'Create data analysis bootcamp']
+            'response': 'There are no active allocations yet. Generate an allocation batch and ask me again.',
+            'data': {'allocations': 0},
+            'suggestions': ['Generate AI allocations', 'Load sample data']
         }
     
-    def _handle_skill_gap_query(self, query, context_data):
+    def _handle_recommendation_query(self):
+        matches = self.feature_store.top_matches(3)
+        if not matches:
+            return self._no_data_answer()
+        
+        skills = self.feature_store.most_required_skills(3)
+        best = matches[0]
+        response = (f"The strongest current match is {best['intern']} on {best['project']} "
+                    f"at {best['match_score']}% confidence.")
+        if skills:
+            response += f" The most requested skills are {', '.join(skills)}."
+        
         return {
-            'response': 'I detected skill gaps in 23% of allocations. The main gaps are in advanced analytics and product strategy.',
-            'data': {'gap_percentage': 23, 'main_gaps': ['Advanced Analytics', 'Product Strategy']},
+            'response': response,
+            'data': {'top_matches': matches, 'top_skills': skills},
+            'suggestions': [f'Organize {skill} workshop' for skill in skills[:2]] or ['Review top matches']
+        }
+    
+    def _handle_skill_gap_query(self):
+        summary = self.feature_store.score_summary()
+        if not summary['allocations']:
+            return self._no_data_answer()
+        
+        gaps = self.feature_store.skill_gaps(3)
+        gap_percentage = round(gaps['allocations_with_gaps'] / summary['allocations'] * 100)
+        main_gaps = [gap['skill'] for gap in gaps['skills']]
+        response = f"I detected skill gaps in {gap_percentage}% of allocations."
+        if main_gaps:
+            response += f" The main gaps are in {', '.join(main_gaps)}."
+        
+        return {
+            'response': response,
+            'data': {
+                'gap_percentage': gap_percentage,
+                'main_gaps': main_gaps,
+                'gaps': gaps['skills'],
+                'low_skill_matches': summary['low_skill_matches']
+            },
             'suggestions': ['Pre-internship training program', 'Mentorship pairing for skill development']
         }
     
-    def _handle_success_query(self, query, context_data):
+    def _handle_success_query(self):
+        summary = self.feature_store.score_summary()
+        if not summary['allocations']:
+            return self._no_data_answer()
+        
+        response = (f"Active allocations average {summary['average_match_score']}% match confidence: "
+                    f"{summary['high_confidence']} high-confidence and {summary['at_risk']} at risk.")
+        
         return {
-            'response': 'Current allocation batch shows 89% predicted success rate with high confidence in skill matching.',
-            'data': {'success_rate': 89, 'confidence': 'high'},
+            'response': response,
+            'data': {
+                # Allocations carry no success outcome yet; this is the match confidence the answer quotes
+                'average_match_score': summary['average_match_score'],
+                'high_confidence': summary['high_confidence'],
+                'at_risk': summary['at_risk'],
+                'allocations': summary['allocations']
+            },
             'suggestions': ['Monitor at-risk allocations', 'Provide additional support for low-score matches']
         }
     
-    def _handle_optimization_query(self, query, context_data):
+    def _handle_optimization_query(self):
+        summary = self.feature_store.score_summary()
+        if not summary['allocations']:
+            return self._no_data_answer()
+        
+        components = {
+            'skill match': (summary['average_skill_match'], 'Skill assessment updates'),
+            'preference match': (summary['average_preference_match'], 'Review and update project descriptions'),
+            'availability match': (summary['average_availability_match'], 'Flexible timelines')
+        }
+        weakest, (score, action) = min(components.items(), key=lambda item: item[1][0])
+        improvement = round(max(0, HIGH_SCORE_TARGET - score))
+        
         return {
-            'response': 'I suggest implementing flexible project timelines and cross-functional mentoring to improve allocation quality by 15%.',
-            'data': {'improvement_potential': 15},
-            'suggestions': ['Flexible timelines', 'Cross-functional mentoring', 'Skill assessment updates']
+            'response': (f"The weakest dimension is {weakest} at {score}%. Raising it to {HIGH_SCORE_TARGET}% "
+                         f"would lift allocation quality by about {improvement} points."),
+            'data': {'weakest_dimension': weakest, 'average_score': score, 'improvement_potential': improvement},
+            'suggestions': [action, 'Cross-functional mentoring']
         }
     
-    def _handle_general_query(self, query, context_data):
+    def _handle_general_query(self):
+        summary = self.feature_store.score_summary()
         return {
-            'response': 'I can help you with allocation recommendations, skill gap analysis, success predictions, and optimization suggestions. What specific aspect would you like to explore?',
-            'data': {},
+            'response': (f"There are {summary['allocations']} active allocations. I can help you with allocation "
+                         "recommendations, skill gap analysis, success predictions, and optimization suggestions. "
+                         "What specific aspect would you like to explore?"),
+            'data': {'allocations': summary['allocations']},
             'suggestions': ['Ask about best matches', 'Inquire about skill gaps', 'Request optimization advice']
         }
@@ -0,0 +1,221 @@
+"""
+Durable store for internship applications
+Submissions are queued to a single writer thread that commits everything
+waiting in one SQLite transaction (group commit), so a burst of applications
+costs one WAL sync per batch instead of one per request. Readers use their own
+connections and run alongside the writer under WAL.
+"""
+
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, InvalidStateError
+from datetime import datetime
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS applications ('
+    'id INTEGER PRIMARY KEY, '
+    'candidate_id INTEGER NOT NULL, '
+    'internship_id TEXT, '
+    'company_name TEXT NOT NULL, '
+    'job_title TEXT NOT NULL, '
+    'match_score REAL, '
+    "status TEXT NOT NULL DEFAULT 'pending', "
+    'applied_at TEXT NOT NULL, '
+    'idempotency_key TEXT NOT NULL UNIQUE)',
+    'CREATE INDEX IF NOT EXISTS ix_applications_candidate ON applications (candidate_id, id)',
+)
+
+COLUMNS = ('id', 'candidate_id', 'internship_id', 'company_name', 'job_title',
+           'match_score', 'status', 'applied_at')
+
+_STOP = object()
+
+
+class ApplicationStoreBusy(Exception):
+    """The write queue is full or the commit is slow; the caller should retry later"""
+
+
+class _Pending:
+    __slots__ = ('values', 'future')
+
+    def __init__(self, values):
+        self.values = values
+        self.future = Future()
+
+
+def _settle(future, result=None, exception=None):
+    # A future only becomes un-settleable if its caller cancelled it; never let that reach the writer
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _as_application(row):
+    application = dict(zip(COLUMNS, row))
+    application['application_id'] = f"APP_{application['candidate_id']}_{application.pop('id')}"
+    application['applied_date'] = application['applied_at'][:10]
+    return application
+
+
+class ApplicationStore:
+    """
+    `add()` returns a Future resolved once the application is committed with
+    `(application, created)`; `created` is False when the idempotency key was
+    already used and the original application is returned instead.
+    """
+
+    def __init__(self, path, max_batch=500, max_pending=10000, submit_timeout=1.0,
+                 synchronous='FULL', busy_timeout_ms=5000):
+        self.path = path
+        self.max_batch = max_batch
+        self.submit_timeout = submit_timeout
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self.batches = 0
+        self.written = 0
+        self.duplicates = 0
+        self.largest_batch = 0
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._local = threading.local()
+        self._readers = []  # every thread's read connection, closed with the store
+        self._readers_lock = threading.Lock()
+
+        connection = self._connect()
+        connection.execute('PRAGMA journal_mode=WAL')
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+        self._writer_connection = connection
+
+        self._writer = threading.Thread(target=self._run, name='application-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self, read_only=False):
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        connection.execute(f'PRAGMA synchronous={self.synchronous}')
+        if read_only:
+            connection.execute('PRAGMA query_only=ON')
+        return connection
+
+    # Writes
+
+    def add(self, candidate_id, company_name, job_title, idempotency_key,
+            internship_id=None, match_score=None, status='pending'):
+        applied_at = datetime.now().isoformat(timespec='seconds')
+        pending = _Pending((candidate_id, internship_id, company_name, job_title,
+                            match_score, status, applied_at, idempotency_key))
+        try:
+            self._queue.put(pending, timeout=self.submit_timeout)
+        except queue.Full:
+            raise ApplicationStoreBusy('Application queue is full, please retry shortly')
+        return pending.future
+
+    def close(self, timeout=10):
+        """Commit everything queued, stop the writer and close the read connections"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for connection in readers:
+            connection.close()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            # Everything that queued up during the previous commit goes in this one
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = item is _STOP
+            if batch:
+                self._commit(batch)
+        self._writer_connection.close()
+
+    def _commit(self, batch):
+        # Drop submissions whose callers already gave up; the rest can no longer be cancelled
+        batch = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            results = self._insert(batch)
+        except Exception:
+            # One bad row must not reject unrelated applicants: retry each on its own
+            results = []
+            for pending in batch:
+                try:
+                    results.extend(self._insert([pending]))
+                except Exception as e:
+                    _settle(pending.future, exception=e)
+
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for pending, application, created in results:
+            if created:
+                self.written += 1
+            else:
+                self.duplicates += 1
+            _settle(pending.future, (application, created))
+
+    def _insert(self, batch):
+        """Insert a batch in one transaction; returns (pending, application, created) per row"""
+        connection = self._writer_connection
+        results = []
+        with connection:
+            for pending in batch:
+                cursor = connection.execute(
+                    'INSERT INTO applications (candidate_id, internship_id, company_name, job_title, '
+                    'match_score, status, applied_at, idempotency_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(idempotency_key) DO NOTHING',
+                    pending.values
+                )
+                created = cursor.rowcount == 1
+                row = connection.execute(
+                    f'SELECT {", ".join(COLUMNS)} FROM applications WHERE idempotency_key = ?',
+                    (pending.values[-1],)
+                ).fetchone()
+                results.append((pending, _as_application(row), created))
+        return results
+
+    # Reads
+
+    def _reader(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect(read_only=True)
+            with self._readers_lock:
+                self._readers.append(connection)
+        return connection
+
+    def for_candidate(self, candidate_id, limit=100):
+        """A candidate's applications, newest first"""
+        rows = self._reader().execute(
+            f'SELECT {", ".join(COLUMNS)} FROM applications WHERE candidate_id = ? ORDER BY id DESC LIMIT ?',
+            (candidate_id, limit)
+        ).fetchall()
+        return [_as_application(row) for row in rows]
+
+    def stats(self):
+        return {
+            'pending': self._queue.qsize(),
+            'batches': self.batches,
+            'written': self.written,
+            'duplicates': self.duplicates,
+            'largest_batch': self.largest_batch,
+            'average_batch': round((self.written + self.duplicates) / self.batches, 2) if self.batches else 0
+        }
@@ -0,0 +1,69 @@
+"""
+In-process caches shared by the Flask services
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLSnapshot:
+    """
+    Materialized value recomputed at most once per TTL.
+    Readers never block while the snapshot is fresh; when it expires a single
+    caller rebuilds it and concurrent callers wait for that result.
+    """
+
+    def __init__(self, loader, ttl_seconds=5.0):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entry = None  # (expires_at, value)
+
+    def get(self):
+        entry = self._entry
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entry
+            if entry is not None and time.monotonic() < entry[0]:
+                return entry[1]
+
+            value = self.loader()
+            self._entry = (time.monotonic() + self.ttl_seconds, value)
+            return value
+
+    @property
+    def is_fresh(self):
+        entry = self._entry
+        return entry is not None and time.monotonic() < entry[0]
+
+    def invalidate(self):
+        self._entry = None
+
+
+class LRUCache:
+    """Thread-safe mapping that keeps the `maxsize` most recently used entries"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
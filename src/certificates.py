@@ -0,0 +1,209 @@
+"""
+Batch certificate and performance-report generation for PM Internship Yojana
+Reads completed allocations through one joined query, renders records in parallel
+worker processes and writes gzip JSON-lines parts with a resumable checkpoint.
+"""
+
+import argparse
+import gzip
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from src.models import db, Intern, Project, Mentor, Allocation, YojanaCompliance
+from src.sample_data import YojanaIntegrationHelper
+
+CHECKPOINT_FILE = 'checkpoint.json'
+
+# Model defaults used when a completed allocation has no compliance record
+DEFAULT_COMPLIANCE = {
+    'attendance_percentage': 0.0,
+    'weekly_reports_submitted': 0,
+    'documents_verified': False,
+    'final_presentation': False,
+    'project_deliverables': False
+}
+
+
+def _render_chunk(rows):
+    """Worker: build certificate and report records for one chunk of joined rows"""
+    skills_by_project = {}
+    records = []
+
+    for row in rows:
+        intern = SimpleNamespace(**row['intern'])
+        project = SimpleNamespace(**row['project'])
+        mentor = SimpleNamespace(**row['mentor'])
+        allocation = SimpleNamespace(**row['allocation'])
+        compliance = SimpleNamespace(**(row['compliance'] or DEFAULT_COMPLIANCE))
+
+        try:
+            # Parse each project's skills once per chunk instead of once per certificate;
+            # a malformed value fails this row like any other rendering error
+            if project.id not in skills_by_project:
+                skills_by_project[project.id] = list(json.loads(project.required_skills).keys()) if project.required_skills else []
+
+            records.append({
+                'allocation_id': allocation.id,
+                'certificate': YojanaIntegrationHelper.generate_yojana_certificate(
+                    intern, project, mentor, allocation, skills_developed=skills_by_project[project.id]
+                ),
+                'performance_report': YojanaIntegrationHelper.generate_performance_report(
+                    intern, allocation, compliance
+                )
+            })
+        except Exception as e:
+            records.append({'allocation_id': allocation.id, 'error': str(e)})
+
+    return records
+
+
+class CertificateBatchPipeline:
+    """
+    Generate certificates for every allocation in the given statuses.
+    Progress is checkpointed after each part is written, so a rerun resumes
+    from the last completed chunk instead of starting over.
+    """
+
+    def __init__(self, output_dir, workers=None, chunk_size=1000, statuses=('completed',)):
+        self.output_dir = output_dir
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_size = chunk_size
+        self.statuses = list(statuses)
+
+    def run(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        checkpoint = self._load_checkpoint()
+
+        chunks = self._iter_chunks(checkpoint['last_allocation_id'])
+
+        if self.workers <= 1:
+            for first_id, rows in chunks:
+                self._commit_part(checkpoint, first_id, _render_chunk(rows))
+            return checkpoint
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # Keep a bounded window of chunks in flight and commit them in order
+            pending = deque()
+            for first_id, rows in chunks:
+                pending.append((first_id, executor.submit(_render_chunk, rows)))
+                if len(pending) >= self.workers * 2:
+                    first, future = pending.popleft()
+                    self._commit_part(checkpoint, first, future.result())
+
+            while pending:
+                first, future = pending.popleft()
+                self._commit_part(checkpoint, first, future.result())
+
+        return checkpoint
+
+    def _iter_chunks(self, after_id):
+        """Keyset-paginate the joined allocation rows as plain, picklable dicts"""
+        while True:
+            rows = db.session.query(
+                Allocation.id, Allocation.start_date, Allocation.project_rating,
+                Allocation.match_score, Allocation.mentor_feedback, Allocation.status,
+                Intern.name, Intern.application_id, Intern.college, Intern.category, Intern.state,
+                Project.id, Project.title, Project.organization, Project.duration_weeks, Project.required_skills,
+                Mentor.name,
+                YojanaCompliance.id, YojanaCompliance.attendance_percentage,
+                YojanaCompliance.weekly_reports_submitted, YojanaCompliance.documents_verified,
+                YojanaCompliance.final_presentation, YojanaCompliance.project_deliverables
+            ).join(
+                Intern, Allocation.intern_id == Intern.id
+            ).join(
+                Project, Allocation.project_id == Project.id
+            ).join(
+                Mentor, Allocation.mentor_id == Mentor.id
+            ).outerjoin(
+                YojanaCompliance, YojanaCompliance.intern_id == Allocation.intern_id
+            ).filter(
+                Allocation.status.in_(self.statuses),
+                Allocation.id > after_id
+            ).order_by(Allocation.id).limit(self.chunk_size).all()
+
+            if not rows:
+                return
+
+            yield rows[0][0], [self._row_to_dict(row) for row in rows]
+            after_id = rows[-1][0]
+
+            # Release the reader snapshot between chunks
+            db.session.rollback()
+
+    @staticmethod
+    def _row_to_dict(row):
+        (allocation_id, start_date, project_rating, match_score, mentor_feedback, status,
+         intern_name, application_id, college, category, state,
+         project_id, title, organization, duration_weeks, required_skills,
+         mentor_name,
+         compliance_id, attendance, reports, documents, presentation, deliverables) = row
+
+        return {
+            'allocation': {
+                'id': allocation_id, 'start_date': start_date, 'project_rating': project_rating,
+                'match_score': match_score or 0, 'mentor_feedback': mentor_feedback, 'status': status
+            },
+            'intern': {
+                'name': intern_name, 'application_id': application_id, 'college': college,
+                'category': category, 'state': state
+            },
+            'project': {
+                'id': project_id, 'title': title, 'organization': organization,
+                'duration_weeks': duration_weeks, 'required_skills': required_skills
+            },
+            'mentor': {'name': mentor_name},
+            'compliance': None if compliance_id is None else {
+                'attendance_percentage': attendance, 'weekly_reports_submitted': reports,
+                'documents_verified': documents, 'final_presentation': presentation,
+                'project_deliverables': deliverables
+            }
+        }
+
+    def _commit_part(self, checkpoint, first_id, records):
+        if not records:
+            return
+
+        part_path = os.path.join(self.output_dir, f'part-{first_id:010d}.jsonl.gz')
+        tmp_path = part_path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':')))
+                f.write('\n')
+        os.replace(tmp_path, part_path)
+
+        checkpoint['last_allocation_id'] = records[-1]['allocation_id']
+        checkpoint['certificates'] += sum(1 for r in records if 'certificate' in r)
+        checkpoint['errors'] += sum(1 for r in records if 'error' in r)
+        checkpoint['parts'] += 1
+        self._save_checkpoint(checkpoint)
+
+    def _load_checkpoint(self):
+        path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {'last_allocation_id': 0, 'certificates': 0, 'errors': 0, 'parts': 0}
+
+    def _save_checkpoint(self, checkpoint):
+        path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(path + '.tmp', path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate PM Internship Yojana certificates in bulk')
+    parser.add_argument('--output', default='certificates_out')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    from app import app
+
+    with app.app_context():
+        result = CertificateBatchPipeline(args.output, workers=args.workers, chunk_size=args.chunk_size).run()
+
+    print(f"🎓 Certificates generated: {result['certificates']} ({result['errors']} errors) in {result['parts']} parts")
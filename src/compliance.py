@@ -0,0 +1,147 @@
+"""
+Column-wise PM Internship Yojana compliance scoring
+Vectorized counterparts of calculate_compliance_score and
+YojanaIntegrationHelper.calculate_stipend_eligibility for whole cohorts
+"""
+
+import json
+
+import numpy as np
+
+from src.models import db, Intern, Project, Allocation, YojanaCompliance
+
+MIN_ATTENDANCE = 75  # Percent required for the attendance criterion
+MIN_WEEKLY_REPORTS = 8  # Assuming 12-week program
+STIPEND_REPORT_TARGET = 10  # Reports needed for the full stipend
+DEFAULT_STIPEND = 25000
+BULK_CHUNK_SIZE = 5000
+
+
+def score_compliance_columns(columns):
+    """
+    Score a block of interns at once.
+    `columns` maps each compliance field to a NumPy array; missing compliance
+    records are expected to carry the model defaults (False / 0).
+    """
+    criteria = np.stack([
+        columns['documents_verified'],
+        columns['eligibility_confirmed'],
+        columns['background_check'],
+        columns['attendance_percentage'] >= MIN_ATTENDANCE,
+        columns['weekly_reports_submitted'] >= MIN_WEEKLY_REPORTS,
+        columns['final_presentation'],
+        columns['project_deliverables']
+    ]).astype(np.float64)
+
+    compliance_score = np.round(criteria.mean(axis=0) * 100, 2)
+
+    base_stipend = columns['stipend_amount']
+    attendance_factor = np.minimum(1.0, columns['attendance_percentage'] / MIN_ATTENDANCE)
+    report_factor = np.minimum(1.0, columns['weekly_reports_submitted'] / STIPEND_REPORT_TARGET)
+    deliverable_factor = np.where(columns['project_deliverables'], 1.0, 0.8)
+    final_stipend = base_stipend * attendance_factor * report_factor * deliverable_factor
+
+    return {
+        'compliance_score': compliance_score,
+        'base_stipend': base_stipend,
+        'final_stipend': np.round(final_stipend, 2),
+        'attendance_factor': np.round(attendance_factor, 2),
+        'report_factor': np.round(report_factor, 2),
+        'deliverable_factor': deliverable_factor,
+        'eligible': final_stipend >= base_stipend * 0.75
+    }
+
+
+def _bulk_compliance_query(category=None, state=None):
+    # Latest non-cancelled allocation per intern decides the stipend
+    latest_allocation = db.session.query(
+        Allocation.intern_id,
+        db.func.max(Allocation.id).label('allocation_id')
+    ).filter(Allocation.status != 'cancelled').group_by(Allocation.intern_id).subquery()
+
+    query = db.session.query(
+        Intern.id, Intern.name, Intern.category, Intern.state,
+        YojanaCompliance.id,
+        YojanaCompliance.documents_verified,
+        YojanaCompliance.eligibility_confirmed,
+        YojanaCompliance.background_check,
+        YojanaCompliance.attendance_percentage,
+        YojanaCompliance.weekly_reports_submitted,
+        YojanaCompliance.final_presentation,
+        YojanaCompliance.project_deliverables,
+        Project.stipend_amount
+    ).outerjoin(
+        YojanaCompliance, YojanaCompliance.intern_id == Intern.id
+    ).outerjoin(
+        latest_allocation, latest_allocation.c.intern_id == Intern.id
+    ).outerjoin(
+        Allocation, Allocation.id == latest_allocation.c.allocation_id
+    ).outerjoin(
+        Project, Project.id == Allocation.project_id
+    )
+
+    if category:
+        query = query.filter(Intern.category == category)
+    if state:
+        query = query.filter(Intern.state == state)
+
+    return query.order_by(Intern.id)
+
+
+def _chunk_columns(rows):
+    (intern_ids, names, categories, states, compliance_ids, documents, eligibility, background,
+     attendance, reports, presentation, deliverables, stipends) = zip(*rows)
+
+    def flags(values):
+        return np.array([bool(v) for v in values])
+
+    def numbers(values, default=0.0):
+        return np.array([default if v is None else v for v in values], dtype=np.float64)
+
+    columns = {
+        'documents_verified': flags(documents),
+        'eligibility_confirmed': flags(eligibility),
+        'background_check': flags(background),
+        'attendance_percentage': numbers(attendance),
+        'weekly_reports_submitted': numbers(reports),
+        'final_presentation': flags(presentation),
+        'project_deliverables': flags(deliverables),
+        'stipend_amount': np.array([v or DEFAULT_STIPEND for v in stipends], dtype=np.float64)
+    }
+    return (intern_ids, names, categories, states, compliance_ids), columns
+
+
+def stream_bulk_compliance(category=None, state=None, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Yield one NDJSON line per intern with compliance score and stipend factors.
+    Rows are read in chunks straight from the joined query; nothing is loaded into
+    the ORM and interns without a compliance record are scored on defaults, not created.
+    """
+    result = db.session.execute(
+        _bulk_compliance_query(category, state).statement.execution_options(yield_per=chunk_size)
+    )
+
+    for rows in result.partitions(chunk_size):
+        (intern_ids, names, categories, states, compliance_ids), columns = _chunk_columns(rows)
+        scored = score_compliance_columns(columns)
+        values = {key: array.tolist() for key, array in scored.items()}
+
+        lines = []
+        for i, intern_id in enumerate(intern_ids):
+            lines.append(json.dumps({
+                'intern_id': intern_id,
+                'intern_name': names[i],
+                'category': categories[i],
+                'state': states[i],
+                'has_compliance_record': compliance_ids[i] is not None,
+                'compliance_score': values['compliance_score'][i],
+                'stipend': {
+                    'base_stipend': values['base_stipend'][i],
+                    'final_stipend': values['final_stipend'][i],
+                    'attendance_factor': values['attendance_factor'][i],
+                    'report_factor': values['report_factor'][i],
+                    'deliverable_factor': values['deliverable_factor'][i],
+                    'eligible': values['eligible'][i]
+                }
+            }))
+        yield '\n'.join(lines) + '\n'
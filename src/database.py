@@ -0,0 +1,222 @@
+"""
+Database layer for the PM Smart Allocation Engine
+Applies SQLite production pragmas and splits reads and writes across connection pools
+"""
+
+import logging
+import os
+
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+
+DEFAULT_DATABASE_URI = 'sqlite:///pm_allocation.db'
+READER_BIND = 'reader'
+
+_WRITER_PINNED = 'writer_pinned'
+
+logger = logging.getLogger(__name__)
+
+COMPLIANCE_BACKUP_TABLE = 'yojana_compliance_duplicates'
+
+
+class SchemaMigrationError(Exception):
+    """The database holds data the current schema cannot accept; it needs an explicit fix"""
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _is_sqlite_file(uri):
+    url = sa.engine.make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def configure_database(app, database_uri=None):
+    """Populate SQLAlchemy config with pool sizing, pragmas and the reader bind"""
+    uri = database_uri or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URI)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+
+    # SQLite tuning (override through the environment on production nodes)
+    app.config.setdefault('SQLITE_MMAP_SIZE', _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    app.config.setdefault('SQLITE_CACHE_SIZE_KB', _env_int('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT_MS', _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    app.config.setdefault('DB_READER_POOL_SIZE', _env_int('DB_READER_POOL_SIZE', 8))
+    app.config.setdefault('DB_POOL_TIMEOUT', _env_int('DB_POOL_TIMEOUT', 30))
+
+    if not _is_sqlite_file(uri):
+        return
+
+    connect_args = {
+        'check_same_thread': False,
+        'timeout': app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000
+    }
+
+    # SQLite allows a single writer, so writes share one dedicated connection
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': sa.pool.QueuePool,
+        'pool_size': 1,
+        'max_overflow': 0,
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        'connect_args': dict(connect_args)
+    }
+
+    # WAL lets any number of readers run alongside the writer
+    reader_pool_size = app.config['DB_READER_POOL_SIZE']
+    app.config['SQLALCHEMY_BINDS'] = {
+        READER_BIND: {
+            'url': uri,
+            'poolclass': sa.pool.QueuePool,
+            'pool_size': reader_pool_size,
+            'max_overflow': reader_pool_size,
+            'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+            'connect_args': dict(connect_args)
+        }
+    }
+
+
+def init_database(app, db):
+    """Initialise the extension and register pragmas on every SQLite engine"""
+    db.init_app(app)
+
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name == 'sqlite':
+                sa.event.listen(engine, 'connect', _sqlite_pragmas(app.config, read_only=key == READER_BIND))
+
+
+def _sqlite_pragmas(config, read_only=False):
+    pragmas = [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA temp_store=MEMORY',
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}"
+    ]
+    if read_only:
+        pragmas.append('PRAGMA query_only=ON')
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+class RoutingSession(Session):
+    """
+    Session that serves reads from the reader pool and writes from the writer connection.
+    Once a transaction writes, it stays on the writer so it can read its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        engines = self._db.engines
+
+        if bind is not None or READER_BIND not in engines or engine is not engines.get(None):
+            return engine
+
+        if self._flushing or isinstance(clause, sa.sql.expression.UpdateBase) or self.info.get(_WRITER_PINNED):
+            self.info[_WRITER_PINNED] = True
+            return engine
+
+        return engines[READER_BIND]
+
+
+@sa.event.listens_for(RoutingSession, 'after_transaction_end')
+def _release_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITER_PINNED, None)
+
+
+def migrate_schema(db):
+    """
+    Bring an existing database up to the current models.
+    create_all() only creates missing tables, so indexes added to existing tables are created here.
+    """
+    from src.models import backfill_skill_links, rebuild_report_counters, report_counters_enabled
+
+    engine = db.engine
+    needs_skill_backfill = not sa.inspect(engine).has_table('skills')
+    db.create_all()
+
+    with engine.begin() as connection:
+        _add_missing_columns(connection, db.metadata)
+        _check_compliance_duplicates(connection)
+
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    # Skill association tables are dual-written from the JSON columns; fill them once for old rows
+    if needs_skill_backfill:
+        backfill_skill_links()
+
+    # Counters are only maintained while enabled, so resynchronise them on startup
+    if report_counters_enabled():
+        rebuild_report_counters()
+
+
+def _add_missing_columns(connection, metadata):
+    # New nullable columns on existing tables (SQLite supports ADD COLUMN for these)
+    inspector = sa.inspect(connection)
+    for table in metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+                logger.info('Added column %s.%s', table.name, column.name)
+
+
+def _check_compliance_duplicates(connection):
+    # The unique intern_id index cannot be built while an intern has several compliance rows
+    intern_ids = connection.execute(sa.text(
+        'SELECT intern_id FROM yojana_compliance GROUP BY intern_id HAVING COUNT(*) > 1 ORDER BY intern_id'
+    )).scalars().all()
+    if intern_ids:
+        shown = ', '.join(str(intern_id) for intern_id in intern_ids[:50])
+        more = f' and {len(intern_ids) - 50} more' if len(intern_ids) > 50 else ''
+        raise SchemaMigrationError(
+            f'yojana_compliance has several rows for intern_id {shown}{more}, so its unique intern_id index '
+            f'cannot be created. Resolve them by hand, or run `python init_data.py --deduplicate-compliance` '
+            f'to keep the newest row per intern and move the others to {COMPLIANCE_BACKUP_TABLE}.'
+        )
+
+
+def deduplicate_compliance(db):
+    """
+    Explicit migration step: keep the newest yojana_compliance row per intern and
+    move the others to COMPLIANCE_BACKUP_TABLE. Returns how many rows were moved.
+    """
+    with db.engine.begin() as connection:
+        columns = ', '.join(column['name'] for column in sa.inspect(connection).get_columns('yojana_compliance'))
+        duplicates = (f'SELECT {columns} FROM yojana_compliance WHERE id NOT IN '
+                      '(SELECT MAX(id) FROM yojana_compliance GROUP BY intern_id)')
+
+        connection.exec_driver_sql(
+            f'CREATE TABLE IF NOT EXISTS {COMPLIANCE_BACKUP_TABLE} AS SELECT {columns} FROM yojana_compliance WHERE 0')
+        connection.exec_driver_sql(f'INSERT INTO {COMPLIANCE_BACKUP_TABLE} ({columns}) {duplicates}')
+        moved = connection.exec_driver_sql(
+            'DELETE FROM yojana_compliance WHERE id NOT IN '
+            '(SELECT MAX(id) FROM yojana_compliance GROUP BY intern_id)'
+        ).rowcount
+
+    logger.warning('Moved %d duplicate yojana_compliance rows to %s', moved, COMPLIANCE_BACKUP_TABLE)
+    return moved
+
+
+def explain_query_plan(db, statement):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for a statement"""
+    compiled = statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}').fetchall()
+
+    return [row[-1] for row in rows]
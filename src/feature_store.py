@@ -0,0 +1,129 @@
+"""
+Read-only aggregate views over current allocations
+Pre-defined queries the chatbot answers from, plus a cheap version stamp that
+changes whenever the underlying allocations do.
+"""
+
+from src.cache import TTLSnapshot
+from src.models import (db, Intern, Project, Allocation, Skill, InternSkill, ProjectSkill,
+                        ACTIVE_ALLOCATION_STATUSES)
+
+LOW_SCORE_THRESHOLD = 60
+HIGH_CONFIDENCE_THRESHOLD = 85
+
+
+def _active():
+    return Allocation.status.in_(ACTIVE_ALLOCATION_STATUSES)
+
+
+def allocation_version():
+    """Stamp of the active allocation set; any insert, status change or update moves it"""
+    max_id, count, last_update = db.session.query(
+        db.func.max(Allocation.id),
+        db.func.count(Allocation.id),
+        db.func.max(Allocation.updated_at)
+    ).filter(_active()).one()
+    return f"{max_id or 0}:{count}:{last_update.isoformat() if last_update else ''}"
+
+
+def allocation_score_summary():
+    """Counts and mean scores of active allocations in one aggregate"""
+    low = db.case((Allocation.skill_match_score < LOW_SCORE_THRESHOLD, 1), else_=0)
+    at_risk = db.case((Allocation.match_score < LOW_SCORE_THRESHOLD, 1), else_=0)
+    high = db.case((Allocation.match_score >= HIGH_CONFIDENCE_THRESHOLD, 1), else_=0)
+
+    row = db.session.query(
+        db.func.count(Allocation.id),
+        db.func.avg(Allocation.match_score),
+        db.func.avg(Allocation.skill_match_score),
+        db.func.avg(Allocation.preference_match_score),
+        db.func.avg(Allocation.availability_match_score),
+        db.func.sum(low),
+        db.func.sum(at_risk),
+        db.func.sum(high)
+    ).filter(_active()).one()
+
+    count, match, skill, preference, availability, low_skill, risk, high_confidence = row
+    return {
+        'allocations': count,
+        'average_match_score': round(match or 0, 2),
+        'average_skill_match': round(skill or 0, 2),
+        'average_preference_match': round(preference or 0, 2),
+        'average_availability_match': round(availability or 0, 2),
+        'low_skill_matches': int(low_skill or 0),
+        'at_risk': int(risk or 0),
+        'high_confidence': int(high_confidence or 0)
+    }
+
+
+def top_matches(limit=3):
+    rows = db.session.query(
+        Intern.name, Project.title, Allocation.match_score
+    ).join(
+        Intern, Allocation.intern_id == Intern.id
+    ).join(
+        Project, Allocation.project_id == Project.id
+    ).filter(_active()).order_by(Allocation.match_score.desc()).limit(limit).all()
+
+    return [{'intern': name, 'project': title, 'match_score': round(score or 0, 2)} for name, title, score in rows]
+
+
+def most_required_skills(limit=3):
+    """Skills most often required by currently allocated projects"""
+    rows = db.session.query(
+        Skill.display_name, db.func.count()
+    ).join(
+        ProjectSkill, ProjectSkill.skill_id == Skill.id
+    ).join(
+        Allocation, Allocation.project_id == ProjectSkill.project_id
+    ).filter(_active()).group_by(Skill.id).order_by(db.func.count().desc(), Skill.display_name).limit(limit).all()
+
+    return [name for name, _ in rows]
+
+
+def _skill_gap_query(*columns):
+    # One row per (active allocation, required skill) the intern lacks or holds below the required level
+    return db.session.query(*columns).select_from(Allocation).join(
+        ProjectSkill, ProjectSkill.project_id == Allocation.project_id
+    ).join(
+        Skill, Skill.id == ProjectSkill.skill_id
+    ).outerjoin(
+        InternSkill, db.and_(InternSkill.intern_id == Allocation.intern_id, InternSkill.skill_id == Skill.id)
+    ).filter(
+        _active(),
+        db.or_(InternSkill.proficiency.is_(None), InternSkill.proficiency < ProjectSkill.required_level)
+    )
+
+
+def skill_gaps(limit=3):
+    """Most common unmet required skills and how many active allocations have any gap"""
+    rows = _skill_gap_query(Skill.display_name, db.func.count()).group_by(Skill.id).order_by(
+        db.func.count().desc(), Skill.display_name
+    ).limit(limit).all()
+    affected = _skill_gap_query(db.func.count(db.distinct(Allocation.id))).scalar()
+
+    return {
+        'allocations_with_gaps': affected or 0,
+        'skills': [{'skill': name, 'allocations': count} for name, count in rows]
+    }
+
+
+class AllocationFeatureStore:
+    """
+    Query surface handed to the chatbot. The version stamp is re-read at most
+    once per `version_ttl` seconds and can be invalidated after local writes.
+    """
+
+    def __init__(self, version_ttl=1.0):
+        self._version = TTLSnapshot(allocation_version, ttl_seconds=version_ttl)
+
+    def version(self):
+        return self._version.get()
+
+    def invalidate(self):
+        self._version.invalidate()
+
+    score_summary = staticmethod(allocation_score_summary)
+    top_matches = staticmethod(top_matches)
+    most_required_skills = staticmethod(most_required_skills)
+    skill_gaps = staticmethod(skill_gaps)
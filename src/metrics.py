@@ -0,0 +1,260 @@
+"""
+Prometheus-style request and model metrics for the Flask services
+Counters, latency histograms and in-flight gauges are kept per route and
+rendered in the text exposition format on GET /metrics.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+# Default Prometheus latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Base for one metric family. Each family owns a lock that is held only
+    for the dictionary update, so concurrent request threads never wait on
+    rendering or on each other for longer than a few bytecodes.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in items]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+    render = Counter.render
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose value is read from the application at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, callback, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self):
+        value = self.callback()
+        if value is None:
+            return []
+        # Labelled callbacks return {label_tuple: value}
+        items = sorted(value.items()) if self.labelnames else [((), value)]
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}'
+                for labels, v in items if v is not None]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum, count
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, (list(buckets), total, count))
+                           for labels, (buckets, total, count) in self._values.items())
+
+        lines = []
+        bucket_names = self.labelnames + ('le',)
+        for labels, (buckets, total, count) in items:
+            cumulative = 0
+            for bound, observed in zip(self.buckets + (float('inf'),), buckets):
+                cumulative += observed
+                lines.append(f'{self.name}_bucket{_format_labels(bucket_names, labels + (_format_value(bound),))} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def gauge_callback(self, name, documentation, callback, labelnames=()):
+        return self.register(CallbackGauge(name, documentation, callback, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = metric.render()
+            except Exception:
+                # A failing model gauge must not take the whole scrape down
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+class RequestMetrics:
+    """
+    Per-route request count, latency histogram and in-flight gauge for a Flask app.
+    Routes are labelled by their URL rule (e.g. /api/interns/<int:intern_id>) so the
+    label set stays bounded; unmatched paths are grouped under "unmatched".
+    """
+
+    def __init__(self, app=None, namespace='app', registry=None):
+        self.registry = registry or MetricsRegistry()
+        self.requests = self.registry.counter(
+            f'{namespace}_http_requests_total', 'HTTP requests handled', ('method', 'route', 'status'))
+        self.latency = self.registry.histogram(
+            f'{namespace}_http_request_duration_seconds', 'HTTP request latency', ('method', 'route'))
+        self.in_flight = self.registry.gauge(
+            f'{namespace}_http_requests_in_flight', 'HTTP requests currently being served', ('route',))
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+
+    @staticmethod
+    def _route():
+        rule = request.url_rule
+        return rule.rule if rule is not None else 'unmatched'
+
+    def _before_request(self):
+        g._metrics_start = time.perf_counter()
+        g._metrics_route = self._route()
+        self.in_flight.inc(g._metrics_route)
+
+    def _after_request(self, response):
+        start = g.get('_metrics_start')
+        if start is not None:
+            route = g._metrics_route
+            self.latency.observe(request.method, route, value=time.perf_counter() - start)
+            self.requests.inc(request.method, route, str(response.status_code))
+        return response
+
+    def _teardown_request(self, exc):
+        route = g.pop('_metrics_route', None)
+        if route is not None:
+            self.in_flight.dec(route)
+
+    def metrics_view(self):
+        return Response(self.registry.render(), content_type=CONTENT_TYPE)
+
+
+class ASGIRequestMetrics:
+    """
+    ASGI middleware recording a RequestMetrics' families, for an ASGI variant of a
+    Flask service that shares its registry. `routes` are the app's route paths;
+    other paths are grouped under "unmatched".
+    """
+
+    def __init__(self, app, metrics, routes):
+        self.app = app
+        self.metrics = metrics
+        self.routes = set(routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        route = scope['path'] if scope['path'] in self.routes else 'unmatched'
+        status = 500  # if the app fails before responding
+
+        async def record_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        self.metrics.in_flight.inc(route)
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            self.metrics.in_flight.dec(route)
+            self.metrics.latency.observe(scope['method'], route, value=time.perf_counter() - start)
+            self.metrics.requests.inc(scope['method'], route, str(status))
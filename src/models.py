@@ -1,8 +1,16 @@
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import attributes
 from datetime import datetime
 import json
 
-db = SQLAlchemy()
+from src.database import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Allocation statuses that take an intern and a project out of the available pool
+ACTIVE_ALLOCATION_STATUSES = ['pending', 'active']
 
 class Intern(db.Model):
     __tablename__ = 'interns'
@@ -32,6 +40,15 @@ class Intern(db.Model):
     
     # Relationships
     allocations = db.relationship('Allocation', backref='intern', lazy=True)
+    skill_links = db.relationship('InternSkill', backref='intern', lazy=True, cascade='all, delete-orphan')
+    
+    @classmethod
+    def with_skill(cls, skill_name, min_proficiency=0):
+        """Query interns holding a skill at or above a proficiency level"""
+        return cls.query.join(InternSkill).join(Skill).filter(
+            Skill.name == normalize_skill_name(skill_name),
+            InternSkill.proficiency >= min_proficiency
+        )
     
     def get_skills(self):
         return json.loads(self.skills) if self.skills else {}
@@ -73,6 +90,8 @@ class Project(db.Model):
     
     # Relationships
     allocations = db.relationship('Allocation', backref='project', lazy=True)
+    skill_links = db.relationship('ProjectSkill', backref='project', lazy=True, cascade='all, delete-orphan')
+    tech_links = db.relationship('ProjectTech', backref='project', lazy=True, cascade='all, delete-orphan')
     
     def get_required_skills(self):
         return json.loads(self.required_skills) if self.required_skills else {}
@@ -102,9 +121,15 @@ class Mentor(db.Model):
     
     # Relationships
     allocations = db.relationship('Allocation', backref='mentor', lazy=True)
+    expertise_links = db.relationship('MentorExpertise', backref='mentor', lazy=True, cascade='all, delete-orphan')
 
 class Allocation(db.Model):
     __tablename__ = 'allocations'
+    __table_args__ = (
+        # Availability lookups in generate_allocations filter on status and read the ids
+        db.Index('ix_allocations_status_intern_id', 'status', 'intern_id'),
+        db.Index('ix_allocations_status_project_id', 'status', 'project_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     intern_id = db.Column(db.Integer, db.ForeignKey('interns.id'), nullable=False)
@@ -128,7 +153,7 @@ class Allocation(db.Model):
     project_rating = db.Column(db.Float)
     learning_outcomes = db.Column(db.Text)  # JSON string
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class AllocationHistory(db.Model):
@@ -142,15 +167,16 @@ class AllocationHistory(db.Model):
     average_match_score = db.Column(db.Float)
     allocation_time_seconds = db.Column(db.Float)
     algorithm_version = db.Column(db.String(20))
+    run_metrics = db.Column(db.Text)  # JSON string of per-phase timings and counters
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
 # Government Compliance Model for PM Internship Yojana
 class YojanaCompliance(db.Model):
     __tablename__ = 'yojana_compliance'
     
     id = db.Column(db.Integer, primary_key=True)
-    intern_id = db.Column(db.Integer, db.ForeignKey('interns.id'), nullable=False)
+    intern_id = db.Column(db.Integer, db.ForeignKey('interns.id'), nullable=False, unique=True, index=True)
     
     # Documentation requirements
     documents_verified = db.Column(db.Boolean, default=False)
@@ -169,3 +195,346 @@ class YojanaCompliance(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Normalized skill dictionary and association tables.
+# The JSON columns stay the source of truth for the API; these rows are written
+# alongside them on every flush so skill filters run as indexed SQL.
+class Skill(db.Model):
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)  # Normalized lower-case key
+    display_name = db.Column(db.String(100))
+
+class InternSkill(db.Model):
+    __tablename__ = 'intern_skill'
+    __table_args__ = (
+        db.Index('ix_intern_skill_skill_proficiency', 'skill_id', 'proficiency', 'intern_id'),
+    )
+    
+    intern_id = db.Column(db.Integer, db.ForeignKey('interns.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    proficiency = db.Column(db.Integer)  # 1-10 scale
+    
+    skill = db.relationship('Skill')
+
+class ProjectSkill(db.Model):
+    __tablename__ = 'project_skill'
+    __table_args__ = (
+        db.Index('ix_project_skill_skill_level', 'skill_id', 'required_level', 'project_id'),
+    )
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    required_level = db.Column(db.Integer)  # 1-10 scale
+    
+    skill = db.relationship('Skill')
+
+class ProjectTech(db.Model):
+    __tablename__ = 'project_tech'
+    __table_args__ = (
+        db.Index('ix_project_tech_skill', 'skill_id', 'project_id'),
+    )
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    
+    skill = db.relationship('Skill')
+
+class MentorExpertise(db.Model):
+    __tablename__ = 'mentor_expertise'
+    __table_args__ = (
+        db.Index('ix_mentor_expertise_skill', 'skill_id', 'mentor_id'),
+    )
+    
+    mentor_id = db.Column(db.Integer, db.ForeignKey('mentors.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    
+    skill = db.relationship('Skill')
+
+# (JSON column, relationship, link model, level attribute) per owning model
+SKILL_LINK_COLUMNS = {
+    Intern: [('skills', 'skill_links', InternSkill, 'proficiency')],
+    Project: [('required_skills', 'skill_links', ProjectSkill, 'required_level'),
+              ('tech_stack', 'tech_links', ProjectTech, None)],
+    Mentor: [('expertise_areas', 'expertise_links', MentorExpertise, None)]
+}
+
+def normalize_skill_name(name):
+    return str(name).strip().lower()
+
+def _parse_skill_levels(raw):
+    """Turn a skills JSON blob (dict of levels or list of names) into {name: level}"""
+    try:
+        value = json.loads(raw) if raw else {}
+    except (TypeError, ValueError):
+        return {}
+    
+    if isinstance(value, dict):
+        levels = {}
+        for name, level in value.items():
+            try:
+                levels[name] = int(level)
+            except (TypeError, ValueError):
+                levels[name] = None
+        return levels
+    if isinstance(value, list):
+        return {name: None for name in value}
+    return {}
+
+def _resolve_skills(session, names, skill_cache):
+    """Get or create Skill rows for the given display names"""
+    missing = {normalize_skill_name(name): name for name in names}
+    missing = {key: name for key, name in missing.items() if key and key not in skill_cache}
+    
+    if missing:
+        with session.no_autoflush:
+            for skill in session.query(Skill).filter(Skill.name.in_(list(missing))):
+                skill_cache[skill.name] = skill
+        
+        for key, name in missing.items():
+            if key not in skill_cache:
+                skill = Skill(name=key, display_name=str(name).strip())
+                session.add(skill)
+                skill_cache[key] = skill
+    
+    return skill_cache
+
+def _sync_skill_links(session, obj, skill_cache, force=False):
+    for column, relationship, link_model, level_attr in SKILL_LINK_COLUMNS[type(obj)]:
+        if not force and obj in session.dirty and not attributes.get_history(obj, column).has_changes():
+            continue
+        
+        levels = _parse_skill_levels(getattr(obj, column))
+        _resolve_skills(session, levels, skill_cache)
+        
+        links = {}
+        for name, level in levels.items():
+            key = normalize_skill_name(name)
+            if key and key not in links:
+                link = link_model(skill=skill_cache[key])
+                if level_attr:
+                    setattr(link, level_attr, level)
+                links[key] = link
+        
+        with session.no_autoflush:
+            setattr(obj, relationship, list(links.values()))
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _dual_write_skill_links(session, flush_context, instances):
+    skill_cache = {}
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) in SKILL_LINK_COLUMNS:
+            _sync_skill_links(session, obj, skill_cache, force=obj in session.new)
+
+def backfill_skill_links(batch_size=500):
+    """Populate the association tables for rows written before they existed"""
+    total = 0
+    for model, columns in SKILL_LINK_COLUMNS.items():
+        last_id = 0
+        while True:
+            batch = model.query.filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+            if not batch:
+                break
+            
+            for obj in batch:
+                for column, _, _, _ in columns:
+                    attributes.flag_modified(obj, column)
+            
+            db.session.commit()
+            total += len(batch)
+            last_id = batch[-1].id
+    
+    return total
+
+def skill_candidate_pairs(intern_ids=None, project_ids=None):
+    """
+    Candidate generation for allocation: (intern, project) pairs sharing at least one
+    required skill, with the overlap count, computed by an indexed join on skill_id.
+    """
+    query = db.session.query(
+        InternSkill.intern_id,
+        ProjectSkill.project_id,
+        db.func.count().label('overlap')
+    ).join(ProjectSkill, ProjectSkill.skill_id == InternSkill.skill_id)
+    
+    if intern_ids is not None:
+        query = query.filter(InternSkill.intern_id.in_(intern_ids))
+    if project_ids is not None:
+        query = query.filter(ProjectSkill.project_id.in_(project_ids))
+    
+    candidates = {}
+    for intern_id, project_id, overlap in query.group_by(InternSkill.intern_id, ProjectSkill.project_id):
+        candidates.setdefault(intern_id, {})[project_id] = overlap
+    
+    return candidates
+
+# Incrementally maintained counters for the Yojana batch report.
+# Enabled with the YOJANA_REPORT_COUNTERS config flag; rows are keyed by (dimension, key).
+class ReportCounter(db.Model):
+    __tablename__ = 'report_counters'
+    
+    dimension = db.Column(db.String(30), primary_key=True)  # interns, category, state, compliance
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Float, nullable=False, default=0)
+
+def report_counters_enabled():
+    return has_app_context() and bool(current_app.config.get('YOJANA_REPORT_COUNTERS'))
+
+def _intern_report_keys(category, state):
+    return [('interns', 'total'), ('category', category or 'General'), ('state', state or 'Unknown')]
+
+def _compliance_report_values(documents_verified, certificate_issued, final_presentation,
+                              attendance_percentage, weekly_reports_submitted):
+    return {
+        ('compliance', 'records'): 1,
+        ('compliance', 'documents_verified'): 1 if documents_verified else 0,
+        ('compliance', 'certificate_issued'): 1 if certificate_issued else 0,
+        ('compliance', 'final_presentation'): 1 if final_presentation else 0,
+        ('compliance', 'attendance_sum'): attendance_percentage or 0,
+        ('compliance', 'attendance_count'): 0 if attendance_percentage is None else 1,
+        ('compliance', 'reports_sum'): weekly_reports_submitted or 0
+    }
+
+REPORT_COUNTER_COLUMNS = {
+    Intern: ['category', 'state'],
+    YojanaCompliance: ['documents_verified', 'certificate_issued', 'final_presentation',
+                       'attendance_percentage', 'weekly_reports_submitted']
+}
+
+def _report_contribution(obj, values):
+    if isinstance(obj, Intern):
+        return {key: 1 for key in _intern_report_keys(*values)}
+    return _compliance_report_values(*values)
+
+def _previous_values(obj, columns):
+    values = []
+    for column in columns:
+        history = attributes.get_history(obj, column)
+        values.append(history.deleted[0] if history.deleted else getattr(obj, column))
+    return values
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _maintain_report_counters(session, flush_context):
+    if not report_counters_enabled():
+        return
+    
+    deltas = {}
+    
+    def apply(contribution, sign):
+        for counter_key, amount in contribution.items():
+            deltas[counter_key] = deltas.get(counter_key, 0) + sign * amount
+    
+    for obj in session.new:
+        if type(obj) in REPORT_COUNTER_COLUMNS:
+            columns = REPORT_COUNTER_COLUMNS[type(obj)]
+            apply(_report_contribution(obj, [getattr(obj, c) for c in columns]), 1)
+    
+    for obj in session.deleted:
+        if type(obj) in REPORT_COUNTER_COLUMNS:
+            columns = REPORT_COUNTER_COLUMNS[type(obj)]
+            apply(_report_contribution(obj, _previous_values(obj, columns)), -1)
+    
+    for obj in session.dirty:
+        if type(obj) in REPORT_COUNTER_COLUMNS and session.is_modified(obj):
+            columns = REPORT_COUNTER_COLUMNS[type(obj)]
+            apply(_report_contribution(obj, _previous_values(obj, columns)), -1)
+            apply(_report_contribution(obj, [getattr(obj, c) for c in columns]), 1)
+    
+    changes = [
+        {'dimension': dimension, 'key': key, 'value': amount}
+        for (dimension, key), amount in deltas.items() if amount
+    ]
+    if changes:
+        session.connection().execute(db.text(
+            'INSERT INTO report_counters (dimension, key, value) VALUES (:dimension, :key, :value) '
+            'ON CONFLICT (dimension, key) DO UPDATE SET value = report_counters.value + excluded.value'
+        ), changes)
+
+def yojana_report_totals(use_counters=False):
+    """
+    Category/state distributions and compliance totals for the batch report.
+    Reads the maintained counters when requested, otherwise two GROUP BY aggregates.
+    """
+    if use_counters:
+        totals = {}
+        for counter in ReportCounter.query.all():
+            totals.setdefault(counter.dimension, {})[counter.key] = counter.value
+        
+        compliance = totals.get('compliance', {})
+        return {
+            'total_interns': int(totals.get('interns', {}).get('total', 0)),
+            'category_distribution': {k: int(v) for k, v in totals.get('category', {}).items() if v},
+            'state_distribution': {k: int(v) for k, v in totals.get('state', {}).items() if v},
+            'documents_verified': int(compliance.get('documents_verified', 0)),
+            'certificate_issued': int(compliance.get('certificate_issued', 0)),
+            'final_presentation': int(compliance.get('final_presentation', 0)),
+            'average_attendance': (compliance['attendance_sum'] / compliance['attendance_count']
+                                   if compliance.get('attendance_count') else 0),
+            'reports_submitted': int(compliance.get('reports_sum', 0))
+        }
+    
+    category = db.func.coalesce(db.func.nullif(Intern.category, ''), 'General')
+    state = db.func.coalesce(db.func.nullif(Intern.state, ''), 'Unknown')
+    
+    category_distribution = {}
+    state_distribution = {}
+    total_interns = 0
+    for category_name, state_name, count in db.session.query(
+        category, state, db.func.count(Intern.id)
+    ).group_by(category, state):
+        category_distribution[category_name] = category_distribution.get(category_name, 0) + count
+        state_distribution[state_name] = state_distribution.get(state_name, 0) + count
+        total_interns += count
+    
+    def count_true(column):
+        return db.func.coalesce(db.func.sum(db.case((column == True, 1), else_=0)), 0)
+    
+    (documents_verified, certificate_issued, final_presentation,
+     average_attendance, reports_submitted) = db.session.query(
+        count_true(YojanaCompliance.documents_verified),
+        count_true(YojanaCompliance.certificate_issued),
+        count_true(YojanaCompliance.final_presentation),
+        db.func.avg(YojanaCompliance.attendance_percentage),
+        db.func.sum(YojanaCompliance.weekly_reports_submitted)
+    ).one()
+    
+    return {
+        'total_interns': total_interns,
+        'category_distribution': category_distribution,
+        'state_distribution': state_distribution,
+        'documents_verified': documents_verified,
+        'certificate_issued': certificate_issued,
+        'final_presentation': final_presentation,
+        'average_attendance': average_attendance or 0,
+        'reports_submitted': reports_submitted or 0
+    }
+
+def rebuild_report_counters():
+    """Recompute the report counters from the base tables (after bulk loads or deletes)"""
+    totals = yojana_report_totals()
+    compliance = db.session.query(
+        db.func.count(YojanaCompliance.id),
+        db.func.coalesce(db.func.sum(YojanaCompliance.attendance_percentage), 0),
+        db.func.count(YojanaCompliance.attendance_percentage)
+    ).one()
+    
+    counters = {('interns', 'total'): totals['total_interns']}
+    counters.update({('category', k): v for k, v in totals['category_distribution'].items()})
+    counters.update({('state', k): v for k, v in totals['state_distribution'].items()})
+    counters.update({
+        ('compliance', 'records'): compliance[0],
+        ('compliance', 'documents_verified'): totals['documents_verified'],
+        ('compliance', 'certificate_issued'): totals['certificate_issued'],
+        ('compliance', 'final_presentation'): totals['final_presentation'],
+        ('compliance', 'attendance_sum'): compliance[1],
+        ('compliance', 'attendance_count'): compliance[2],
+        ('compliance', 'reports_sum'): totals['reports_submitted']
+    })
+    
+    db.session.query(ReportCounter).delete()
+    db.session.add_all([
+        ReportCounter(dimension=dimension, key=key, value=value)
+        for (dimension, key), value in counters.items()
+    ])
+    db.session.commit()
@@ -0,0 +1,389 @@
+"""
+Allotment runs for the candidate portal
+Runs the SmartAllocationEngine over the portal's candidate and internship data
+in a separate process, so the CPU-bound run never competes with request threads
+or an event loop, and publishes the result as a candidate -> allotment hash
+index, so /allotment is a dictionary lookup. Each completed run is written to a
+JSON file that every worker process picks up on its next read.
+
+The job record (`<results>.job`) and a lock file (`<results>.lock`) sit next to
+the results, so every worker reports the same job and only one run happens at
+a time. The running process holds the lock, which the OS releases if it dies.
+
+    python -m src.portal_allotment allotments.json --engine module:Factory < data.pickle
+"""
+
+import argparse
+import importlib
+import json
+import os
+import pickle
+import re
+import subprocess
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process serving, see wsgi.py
+    fcntl = None
+
+from src.cache import TTLSnapshot
+
+CANDIDATE_CITY = re.compile(r'opportunity in ([A-Za-z ]+?)\.')
+CANDIDATE_CGPA = re.compile(r'CGPA is (\d+(?:\.\d+)?)')
+CANDIDATE_SKILLS = re.compile(r'skills in (.+?)\.?$')
+INTERNSHIP_CITY = re.compile(r'intern in ([A-Za-z ]+?)\.')
+INTERNSHIP_CGPA = re.compile(r'minimum CGPA (\d+(?:\.\d+)?)')
+INTERNSHIP_SKILLS = re.compile(r'Required skills: (.+?)\.?$')
+
+DEFAULT_PROFICIENCY = 3
+START_DELAY_DAYS = 7
+
+
+def _match(pattern, text, default=None):
+    found = pattern.search(text or '')
+    return found.group(1).strip() if found else default
+
+
+def _skills(text):
+    return {skill.strip(): DEFAULT_PROFICIENCY for skill in (text or '').split(',') if skill.strip()}
+
+
+class PortalCandidate:
+    """Intern-shaped view of a candidates.csv row, as the engine expects"""
+
+    def __init__(self, row):
+        resume = str(row.get('resume', ''))
+        self.id = int(row['candidate_id'])
+        self.name = row.get('candidate_name')
+        self.city = _match(CANDIDATE_CITY, resume)
+        cgpa = _match(CANDIDATE_CGPA, resume)
+        self.cgpa = float(cgpa) if cgpa else None
+        self.skills = json.dumps(_skills(_match(CANDIDATE_SKILLS, resume)))
+        # Preferred city is the only preference the portal collects; internships carry it as project_type
+        self.preferences = json.dumps({'project_type': self.city} if self.city else {})
+        self.availability = None
+
+    def get_skills(self):
+        return json.loads(self.skills)
+
+    def get_preferences(self):
+        return json.loads(self.preferences)
+
+
+class PortalInternship:
+    """Project-shaped view of an internship.csv row"""
+
+    def __init__(self, row):
+        description = str(row.get('job_description', ''))
+        self.id = int(row['internship_id'])
+        self.company_name = row.get('Company_name', 'Unknown Company')
+        self.job_title = row.get('job_title', 'Unknown Position')
+        self.city = _match(INTERNSHIP_CITY, description)
+        cgpa = _match(INTERNSHIP_CGPA, description)
+        self.min_cgpa = float(cgpa) if cgpa else 0.0
+        self.required_skills = json.dumps(_skills(_match(INTERNSHIP_SKILLS, description)))
+        self.project_type = self.city
+        self.tech_stack = None
+        self.difficulty_level = min(5, max(1, int(self.min_cgpa) - 5))
+        self.remote_allowed = False
+
+    def get_required_skills(self):
+        return json.loads(self.required_skills)
+
+
+class PortalMentor:
+    """
+    The portal data has no mentors; host organisations assign them after allotment.
+    A single placeholder with capacity for every candidate keeps the engine's
+    mentor dimension neutral.
+    """
+
+    def __init__(self, capacity):
+        self.id = 0
+        self.max_interns = capacity
+        self.availability = None
+        self.mentoring_style = None
+        self.rating = 4.0
+        self.experience_years = 5
+
+
+def _skill_keys(skills):
+    # "HTML/CSS" on a resume should meet "HTML" and "CSS" on a posting
+    return {part.strip().lower() for skill in skills for part in skill.split('/') if part.strip()}
+
+
+def candidate_internships(candidates, internships, limit):
+    """
+    Candidate generation: for each candidate, the `limit` CGPA-eligible internships
+    covering most of their required skills, as {candidate_id: {internship_id: overlap}}.
+    Candidates without any overlap get the eligible internships in their city (then
+    anywhere) so the engine never falls back to scoring every internship.
+    """
+    by_skill = {}
+    required = {}
+    for internship in internships:
+        required[internship.id] = _skill_keys(internship.get_required_skills())
+        for skill in required[internship.id]:
+            by_skill.setdefault(skill, []).append(internship)
+
+    candidates_map = {}
+    for candidate in candidates:
+        eligible = lambda internship: candidate.cgpa is None or candidate.cgpa >= internship.min_cgpa
+        overlap = {}
+        for skill in _skill_keys(candidate.get_skills()):
+            for internship in by_skill.get(skill, ()):
+                if eligible(internship):
+                    overlap[internship] = overlap.get(internship, 0) + 1
+        if not overlap:
+            overlap = {internship: 0 for internship in internships if eligible(internship)}
+        ranked = sorted(overlap.items(), key=lambda item: (
+            -item[1] / max(len(required[item[0].id]), 1), item[0].city != candidate.city, item[0].id
+        ))[:limit]
+        candidates_map[candidate.id] = {internship.id: count for internship, count in ranked}
+    return candidates_map
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_json(path, payload):
+    # Write-then-rename so readers in other processes never see a partial file
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(temp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _factory_spec(factory):
+    return f'{factory.__module__}:{factory.__qualname__}'
+
+
+def _load_factory(spec):
+    module, _, name = spec.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class AllotmentService:
+    """
+    Owns the current allotment index and starts allocation jobs.
+    `lookup()` is a dict read; the index is replaced wholesale when a run
+    finishes (in whichever process shares `results_path`).
+    """
+
+    def __init__(self, engine_factory, results_path='allotments.json', candidate_limit=25, refresh_seconds=1.0):
+        self.engine_factory = engine_factory
+        self.results_path = os.path.abspath(results_path)
+        self.job_path = f'{self.results_path}.job'
+        self.lock_path = f'{self.results_path}.lock'
+        self.candidate_limit = candidate_limit
+
+        self._lock = threading.Lock()
+        self._local_run = threading.Lock()  # stands in for the lock file where fcntl is unavailable
+        self._index = {}
+        self._run = None  # summary of the run the index came from
+        self._loaded_mtime = None
+        self._results_mtime = TTLSnapshot(self._stat_results, ttl_seconds=refresh_seconds)
+
+    # Reads
+
+    def lookup(self, candidate_id):
+        """Allotment for a candidate, or None when nothing is allotted yet"""
+        self._refresh()
+        return self._index.get(int(candidate_id))
+
+    def status(self):
+        self._refresh()
+        return {'job': self._current_job(), 'current_run': self._run}
+
+    def _current_job(self):
+        job = _read_json(self.job_path)
+        if job is not None and job['status'] == 'running' and not self._run_in_progress():
+            # The process died without recording an outcome (killed, out of memory)
+            job.update(status='failed', error='Allocation process exited before finishing', finished_at=None)
+        return job
+
+    def _stat_results(self):
+        try:
+            return os.stat(self.results_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self):
+        mtime = self._results_mtime.get()
+        if mtime is None or mtime == self._loaded_mtime:
+            return
+        with self._lock:
+            if mtime == self._loaded_mtime:
+                return
+            with open(self.results_path) as f:
+                payload = json.load(f)
+            self._index = {int(candidate_id): allotment for candidate_id, allotment in payload['allotments'].items()}
+            self._run = payload['run']
+            self._loaded_mtime = mtime
+
+    # Job
+
+    def _try_lock(self):
+        """An open lock-file descriptor holding the run lock, or None if a run holds it"""
+        if fcntl is None:
+            return -1 if self._local_run.acquire(blocking=False) else None
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _unlock(self, fd):
+        if fcntl is None:
+            self._local_run.release()
+        else:
+            os.close(fd)
+
+    def _run_in_progress(self):
+        fd = self._try_lock()
+        if fd is None:
+            return True
+        self._unlock(fd)
+        return False
+
+    def start(self, candidates_df, internship_df):
+        """Start an allocation run unless one is already going (in any process); returns the job"""
+        fd = self._try_lock()
+        if fd is None:
+            return self._current_job(), False
+
+        job = {
+            'job_id': str(uuid.uuid4()),
+            'status': 'running',
+            'started_at': _now(),
+            'finished_at': None,
+            'error': None
+        }
+        try:
+            _write_json(self.job_path, job)
+            command = [sys.executable, '-m', 'src.portal_allotment', self.results_path,
+                       '--engine', _factory_spec(self.engine_factory),
+                       '--candidate-limit', str(self.candidate_limit)]
+            # The run inherits the locked descriptor and keeps the lock until it exits; its own
+            # session keeps it out of the worker's signals, so worker restarts do not kill it
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, cwd=ROOT, start_new_session=True,
+                                       pass_fds=(fd,) if fcntl is not None else ())
+        except Exception:
+            self._unlock(fd)
+            raise
+        if fcntl is not None:
+            self._unlock(fd)
+
+        def feed_and_reap():
+            try:
+                with process.stdin:
+                    pickle.dump((candidates_df, internship_df), process.stdin)
+            except OSError:
+                pass  # the process failed to start; it records nothing, and status() reports it
+            process.wait()
+            if fcntl is None:
+                self._unlock(fd)
+
+        threading.Thread(target=feed_and_reap, name='allotment-job', daemon=True).start()
+        return job, True
+
+    def _execute(self, candidates_df, internship_df):
+        """Body of the allocation process: run, publish and record the outcome"""
+        job = _read_json(self.job_path)
+        try:
+            run, allotments = self._allocate(job['job_id'], candidates_df, internship_df)
+            self._publish(run, allotments)
+            job.update(status='completed')
+        except Exception as e:
+            job.update(status='failed', error=str(e))
+        job['finished_at'] = _now()
+        _write_json(self.job_path, job)
+
+    def _allocate(self, run_id, candidates_df, internship_df):
+        if candidates_df is None or internship_df is None:
+            raise Exception("Data not loaded")
+
+        candidates = [PortalCandidate(row) for row in candidates_df.to_dict('records')]
+        internships = [PortalInternship(row) for row in internship_df.to_dict('records')]
+        by_id = {internship.id: internship for internship in internships}
+
+        result = self.engine_factory().generate_optimal_allocation(
+            candidates, internships, [PortalMentor(len(candidates))],
+            constraints={'candidate_projects': candidate_internships(candidates, internships, self.candidate_limit)}
+        )
+
+        start_date = (datetime.now() + timedelta(days=START_DELAY_DAYS)).date().isoformat()
+        allotments = {}
+        for allocation in result['allocations']:
+            internship = by_id[allocation['project_id']]
+            allotments[allocation['intern_id']] = {
+                'candidate_id': allocation['intern_id'],
+                'internship_id': internship.id,
+                'company_name': internship.company_name,
+                'job_title': internship.job_title,
+                'status': 'allocated',
+                'start_date': start_date,
+                'mentor_name': f'Assigned by {internship.company_name}',
+                'location': internship.city or 'To be confirmed',
+                'match_score': round(allocation['final_score'] / 100, 4),
+                'run_id': run_id
+            }
+
+        run = {
+            'run_id': run_id,
+            'completed_at': datetime.now().isoformat(timespec='seconds'),
+            'total_allocations': len(allotments),
+            'processing_time': round(result['processing_time'], 3),
+            'algorithm_version': result['algorithm_version'],
+            'summary': {
+                'candidates_processed': len(candidates),
+                'internships_available': len(internships),
+                'successful_matches': len(allotments),
+                'average_match_score': round(float(result['average_score']) / 100, 4)
+            }
+        }
+        return run, allotments
+
+    def _publish(self, run, allotments):
+        _write_json(self.results_path, {'run': run, 'allotments': allotments})
+
+        with self._lock:
+            self._index = allotments
+            self._run = run
+            self._loaded_mtime = self._stat_results()
+            self._results_mtime.invalidate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run one portal allocation job (started by AllotmentService)')
+    parser.add_argument('results_path')
+    parser.add_argument('--engine', required=True, help='module:factory of the allocation engine')
+    parser.add_argument('--candidate-limit', type=int, default=25)
+    args = parser.parse_args(argv)
+
+    candidates_df, internship_df = pickle.load(sys.stdin.buffer)
+    service = AllotmentService(_load_factory(args.engine), results_path=args.results_path,
+                               candidate_limit=args.candidate_limit)
+    service._execute(candidates_df, internship_df)
+
+
+if __name__ == '__main__':
+    main()
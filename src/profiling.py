@@ -0,0 +1,215 @@
+"""
+Opt-in sampled request profiling for the Flask services
+A background thread samples the serving thread's stack at a fixed interval
+and folds the samples into collapsed-stack text (flamegraph.pl / speedscope
+input). Profiles are kept per endpoint in bounded in-memory rings and served
+through token-protected admin endpoints.
+"""
+
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from flask import Response, g, jsonify, request
+
+MIN_INTERVAL_SECONDS = 0.001
+MAX_SAMPLES_PER_PROFILE = 5000  # ~25s of a request at the default 5ms interval
+MAX_STACKS_PER_PROFILE = 500  # distinct collapsed stacks kept per profile
+MAX_STACK_DEPTH = 64
+TRUNCATED_STACK = '[truncated]'
+
+
+class StackSampler(threading.Thread):
+    """Sample one thread's Python stack until stopped or the sample cap is hit"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True, name=f'stack-sampler-{thread_id}')
+        self.thread_id = thread_id
+        self.interval = max(interval, MIN_INTERVAL_SECONDS)
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval) and self.samples < MAX_SAMPLES_PER_PROFILE:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.samples += 1
+            stack = self._collapse(frame)
+            if stack in self.stacks or len(self.stacks) < MAX_STACKS_PER_PROFILE:
+                self.stacks[stack] += 1
+            else:
+                self.stacks[TRUNCATED_STACK] += 1
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+            frame = frame.f_back
+        # Collapsed stacks are written root first
+        return ';'.join(reversed(names))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfiler:
+    """
+    Profile a sample of requests to selected endpoints.
+
+    A request is profiled when the sampling toggle is on and it wins the
+    sample-rate draw, or when it carries `X-Profile: <admin token>`. At most
+    `max_concurrent` requests are sampled at once and each endpoint keeps only
+    its `max_profiles` most recent profiles, which bounds both overhead and
+    storage. Admin endpoints require `X-Admin-Token` and are disabled when
+    PROFILING_ADMIN_TOKEN is unset.
+    """
+
+    def __init__(self, app=None, endpoints=(), sample_rate=None, interval_ms=None,
+                 max_profiles=20, max_concurrent=1, admin_token=None):
+        self.endpoints = set(endpoints)
+        self.enabled = os.environ.get('PROFILING_ENABLED', '0') == '1'
+        self.sample_rate = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.01) if sample_rate is None else sample_rate)
+        self.interval = float(os.environ.get('PROFILING_INTERVAL_MS', 5) if interval_ms is None else interval_ms) / 1000
+        self.admin_token = admin_token or os.environ.get('PROFILING_ADMIN_TOKEN')
+        self.max_profiles = max_profiles
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._profiles = {}  # endpoint -> deque of profiles, newest last
+        self._ids = itertools.count(1)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/admin/profiling', 'profiling_settings', self.settings_view, methods=['GET', 'POST'])
+        app.add_url_rule('/admin/profiles', 'profile_list', self.list_view, methods=['GET'])
+        app.add_url_rule('/admin/profiles/<int:profile_id>', 'profile_detail', self.detail_view, methods=['GET'])
+
+    def _is_admin(self, header):
+        supplied = request.headers.get(header)
+        return bool(self.admin_token and supplied and hmac.compare_digest(supplied, self.admin_token))
+
+    def _should_profile(self):
+        if request.endpoint not in self.endpoints:
+            return False
+        if self._is_admin('X-Profile'):
+            return True
+        return self.enabled and random.random() < self.sample_rate
+
+    def _before_request(self):
+        if not self._should_profile():
+            return
+        # Never queue behind another profile; skip sampling instead
+        if not self._slots.acquire(blocking=False):
+            return
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        g._profile = {
+            'id': next(self._ids),
+            'endpoint': request.endpoint,
+            'path': request.path,
+            'started_at': datetime.now().isoformat(),
+            'start': time.perf_counter(),
+            'sampler': sampler
+        }
+        sampler.start()
+
+    def _after_request(self, response):
+        profile = g.get('_profile')
+        if profile is not None:
+            response.headers['X-Profile-Id'] = str(profile['id'])
+        return response
+
+    def _teardown_request(self, exc):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return
+
+        try:
+            sampler = profile.pop('sampler')
+            sampler.stop()
+            profile['duration_ms'] = round((time.perf_counter() - profile.pop('start')) * 1000, 2)
+            profile['samples'] = sampler.samples
+            profile['interval_ms'] = sampler.interval * 1000
+            profile['stacks'] = sampler.stacks
+
+            with self._lock:
+                ring = self._profiles.setdefault(profile['endpoint'], deque(maxlen=self.max_profiles))
+                ring.append(profile)
+        finally:
+            self._slots.release()
+
+    def _find(self, profile_id):
+        with self._lock:
+            for ring in self._profiles.values():
+                for profile in ring:
+                    if profile['id'] == profile_id:
+                        return profile
+        return None
+
+    @staticmethod
+    def collapsed(profile):
+        return ''.join(f'{stack} {count}\n' for stack, count in profile['stacks'].most_common())
+
+    def settings_view(self):
+        if not self._is_admin('X-Admin-Token'):
+            return jsonify({'error': 'Forbidden'}), 403
+
+        if request.method == 'POST':
+            data = request.json or {}
+            if 'enabled' in data:
+                self.enabled = bool(data['enabled'])
+            if 'sample_rate' in data:
+                self.sample_rate = min(1.0, max(0.0, float(data['sample_rate'])))
+
+        return jsonify({
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'interval_ms': self.interval * 1000,
+            'endpoints': sorted(self.endpoints),
+            'max_profiles_per_endpoint': self.max_profiles
+        })
+
+    def list_view(self):
+        if not self._is_admin('X-Admin-Token'):
+            return jsonify({'error': 'Forbidden'}), 403
+
+        endpoint = request.args.get('endpoint')
+        with self._lock:
+            profiles = [p for name, ring in self._profiles.items() if endpoint in (None, name) for p in ring]
+
+        return jsonify({
+            'profiles': [{
+                'id': p['id'],
+                'endpoint': p['endpoint'],
+                'path': p['path'],
+                'started_at': p['started_at'],
+                'duration_ms': p['duration_ms'],
+                'samples': p['samples']
+            } for p in sorted(profiles, key=lambda p: p['id'], reverse=True)]
+        })
+
+    def detail_view(self, profile_id):
+        if not self._is_admin('X-Admin-Token'):
+            return jsonify({'error': 'Forbidden'}), 403
+
+        profile = self._find(profile_id)
+        if profile is None:
+            return jsonify({'error': 'Profile not found'}), 404
+
+        return Response(self.collapsed(profile), content_type='text/plain; charset=utf-8')
@@ -0,0 +1,113 @@
+"""
+In-process publish/subscribe for pushing real-time updates to connected clients
+Each subscriber owns a small bounded queue; a publisher never blocks on a slow
+reader, which instead loses its oldest undelivered messages. Subscribers on an
+asyncio event loop get an AsyncSubscription, so waiting for a message costs a
+coroutine rather than a thread.
+"""
+
+import asyncio
+import queue
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, broker, topic, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.broker = broker
+        self.topic = topic
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Block until a message arrives; None on timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class AsyncSubscription:
+    """Subscription read from an event loop; publishers in any thread hand messages to the loop"""
+
+    def __init__(self, broker, topic, loop, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.broker = broker
+        self.topic = topic
+        self.dropped = 0
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:  # loop already closed
+            pass
+
+    def _put(self, message):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Wait for a message; None on timeout"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Topic-keyed fan-out of messages to live subscriptions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # topic -> set of Subscription
+
+    def subscribe(self, topic, loop=None):
+        """A blocking Subscription, or an AsyncSubscription read on `loop` when one is given"""
+        subscription = Subscription(self, topic) if loop is None else AsyncSubscription(self, topic, loop)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def publish(self, topic, message):
+        """Deliver to every subscriber of `topic`; returns how many received it"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+        return len(subscribers)
+
+    def subscriber_count(self, topic=None):
+        with self._lock:
+            if topic is not None:
+                return len(self._subscribers.get(topic, ()))
+            return sum(len(s) for s in self._subscribers.values())
@@ -1,7 +1,12 @@
+import csv
 import json
+import os
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from src.models import db, Intern, Project, Mentor, YojanaCompliance, Allocation
+from src.models import db, Intern, Project, Mentor, YojanaCompliance, Allocation, InternSkill, ProjectSkill, ProjectTech, MentorExpertise
+from src.models import Skill, normalize_skill_name, rebuild_report_counters, report_counters_enabled
 
 class PMYojanaSampleDataGenerator:
     """
@@ -68,6 +73,15 @@ class PMYojanaSampleDataGenerator:
             "Competitive Analysis": [5, 6, 7, 8]
         }
         
+        # Relative frequency of each skill among applicants (foundational skills are common)
+        self.skill_popularity = {
+            "Excel": 3.0, "Communication": 3.0, "Presentation": 2.5, "Python": 2.5,
+            "Data Analysis": 2.0, "SQL": 2.0, "Project Management": 1.5, "Analytics": 1.5,
+            "Market Research": 1.2, "Agile": 1.2, "Leadership": 1.2, "Statistics": 1.0,
+            "User Research": 0.8, "Scrum": 0.8, "Product Strategy": 0.7, "Tableau": 0.7,
+            "PowerBI": 0.6, "Customer Insights": 0.6, "Competitive Analysis": 0.5, "Business Model": 0.5
+        }
+        
         self.project_templates = [
             {
                 "title": "Digital India Portal Enhancement",
@@ -186,19 +200,20 @@ class PMYojanaSampleDataGenerator:
             }
         ]
     
-    def generate_realistic_intern(self, index):
+    def generate_realistic_intern(self, index, rng=random):
         """Generate a realistic intern profile for PM Internship Yojana"""
         name = self.indian_names[index % len(self.indian_names)]
         
         # Generate skills realistically
         skills = {}
         skill_items = list(self.pm_skills.keys())
-        num_skills = random.randint(4, 8)
+        skill_weights = [self.skill_popularity.get(skill, 1.0) for skill in skill_items]
+        num_skills = rng.randint(4, 8)
         
         for _ in range(num_skills):
-            skill = random.choice(skill_items)
+            skill = rng.choices(skill_items, weights=skill_weights)[0]
             if skill not in skills:
-                skills[skill] = random.choice(self.pm_skills[skill])
+                skills[skill] = rng.choice(self.pm_skills[skill])
         
         # Generate interests based on skills
         interests = []
@@ -210,51 +225,51 @@ class PMYojanaSampleDataGenerator:
             interests.extend(["Product Management", "Strategy Planning"])
         
         # Remove duplicates and limit
-        interests = list(set(interests))[:4]
+        interests = list(dict.fromkeys(interests))[:4]
         
         # Generate preferences
         preferences = {
-            "project_type": random.choice(["Development", "Research", "Analytics", "Strategy"]),
-            "mentoring_style": random.choice(["Collaborative", "Guidance", "Hands-on"]),
-            "technologies": random.sample(["Python", "React", "Tableau", "Excel", "SQL"], random.randint(2, 4)),
-            "remote_preference": random.choice([True, False])
+            "project_type": rng.choice(["Development", "Research", "Analytics", "Strategy"]),
+            "mentoring_style": rng.choice(["Collaborative", "Guidance", "Hands-on"]),
+            "technologies": rng.sample(["Python", "React", "Tableau", "Excel", "SQL"], rng.randint(2, 4)),
+            "remote_preference": rng.choice([True, False])
         }
         
         return {
             "name": name,
             "email": f"{name.lower().replace(' ', '.')}.{index}@college.edu",
-            "phone": f"+91{random.randint(7000000000, 9999999999)}",
-            "college": random.choice(self.indian_colleges),
-            "branch": random.choice(self.branches),
-            "year": random.randint(2, 4),
-            "cgpa": round(random.uniform(6.5, 9.5), 2),
+            "phone": f"+91{rng.randint(7000000000, 9999999999)}",
+            "college": rng.choice(self.indian_colleges),
+            "branch": rng.choice(self.branches),
+            "year": rng.randint(2, 4),
+            "cgpa": round(rng.uniform(6.5, 9.5), 2),
             "skills": skills,
             "interests": interests,
             "preferences": preferences,
             "availability": {
-                "hours_per_week": random.randint(20, 40),
-                "preferred_time": random.choice(["Morning", "Afternoon", "Evening", "Flexible"])
+                "hours_per_week": rng.randint(20, 40),
+                "preferred_time": rng.choice(["Morning", "Afternoon", "Evening", "Flexible"])
             },
-            "aadhar_number": f"{random.randint(100000000000, 999999999999)}",
+            "aadhar_number": f"{rng.randint(100000000000, 999999999999)}",
             "application_id": f"PM2025{str(index+1).zfill(3)}",
-            "category": random.choice(self.categories),
-            "state": random.choice(self.indian_states)
+            "category": rng.choice(self.categories),
+            "state": rng.choice(self.indian_states)
         }
     
-    def generate_realistic_project(self, template, index):
+    def generate_realistic_project(self, template, index, rng=random):
         """Generate project based on template with variations"""
         project = template.copy()
         
         # Add variations
-        project["title"] = f"{project['title']} - Phase {random.randint(1, 3)}"
-        project["estimated_hours"] = random.randint(200, 400)
-        project["duration_weeks"] = random.randint(8, 16)
-        project["max_interns"] = random.randint(1, 3)
-        project["remote_allowed"] = random.choice([True, False])
+        project["title"] = f"{project['title']} - Phase {rng.randint(1, 3)}"
+        project["estimated_hours"] = rng.randint(200, 400)
+        project["duration_weeks"] = rng.randint(8, 16)
+        project["max_interns"] = rng.randint(1, 3)
+        project["remote_allowed"] = rng.choice([True, False])
         
         return project
     
-    def generate_realistic_mentor(self, profile, index):
+    def generate_realistic_mentor(self, profile, index, rng=random):
         """Generate mentor based on profile with variations"""
         mentor = profile.copy()
         
@@ -262,15 +277,15 @@ class PMYojanaSampleDataGenerator:
         mentor["email"] = f"{mentor['name'].lower().replace(' ', '.').replace('dr.', '').replace('ms.', '').replace('mr.', '')}.{index}@{mentor['organization'].lower().replace(' ', '')}.com"
         
         # Add performance metrics
-        mentor["rating"] = round(random.uniform(4.2, 5.0), 1)
-        mentor["total_mentored"] = random.randint(10, 50)
-        mentor["success_rate"] = round(random.uniform(80, 98), 1)
-        mentor["max_interns"] = random.randint(2, 5)
+        mentor["rating"] = round(rng.uniform(4.2, 5.0), 1)
+        mentor["total_mentored"] = rng.randint(10, 50)
+        mentor["success_rate"] = round(rng.uniform(80, 98), 1)
+        mentor["max_interns"] = rng.randint(2, 5)
         
         # Add availability
         mentor["availability"] = {
-            "hours_per_week": random.randint(5, 15),
-            "preferred_days": random.sample(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"], random.randint(3, 5)),
+            "hours_per_week": rng.randint(5, 15),
+            "preferred_days": rng.sample(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"], rng.randint(3, 5)),
             "time_zone": "IST"
         }
         
@@ -280,12 +295,7 @@ class PMYojanaSampleDataGenerator:
         """Populate database with realistic PM Yojana data"""
         
         # Clear existing data
-        db.session.query(Allocation).delete()
-        db.session.query(YojanaCompliance).delete()
-        db.session.query(Intern).delete()
-        db.session.query(Project).delete()
-        db.session.query(Mentor).delete()
-        db.session.commit()
+        self.clear_database()
         
         print(f"🧑‍🎓 Generating {num_interns} PM Internship Yojana interns...")
         
@@ -312,10 +322,11 @@ class PMYojanaSampleDataGenerator:
             )
             
             db.session.add(intern)
+            db.session.flush()  # Assigns intern.id for the compliance record
             
             # Create compliance record
             compliance = YojanaCompliance(
-                intern_id=i+1,  # Will be updated after commit
+                intern_id=intern.id,
                 documents_verified=random.choice([True, False]),
                 eligibility_confirmed=random.choice([True, False]),
                 background_check=random.choice([True, False]),
@@ -379,6 +390,10 @@ class PMYojanaSampleDataGenerator:
         
         db.session.commit()
         
+        # Bulk deletes above bypass the incremental report counters
+        if report_counters_enabled():
+            rebuild_report_counters()
+        
         print("✅ Sample data generation completed!")
         print(f"📊 Created: {num_interns} interns, {num_projects} projects, {num_mentors} mentors")
         
@@ -389,6 +404,99 @@ class PMYojanaSampleDataGenerator:
             "yojana_compliance_records": num_interns
         }
     
+    def clear_database(self):
+        """Remove all interns, projects, mentors and their dependent rows"""
+        db.session.query(Allocation).delete()
+        db.session.query(YojanaCompliance).delete()
+        db.session.query(InternSkill).delete()
+        db.session.query(ProjectSkill).delete()
+        db.session.query(ProjectTech).delete()
+        db.session.query(MentorExpertise).delete()
+        db.session.query(Intern).delete()
+        db.session.query(Project).delete()
+        db.session.query(Mentor).delete()
+        db.session.commit()
+    
+    def skill_vocabulary(self):
+        """Every skill and technology name the generator can emit"""
+        names = set(self.pm_skills)
+        for template in self.project_templates:
+            names.update(template["required_skills"])
+            names.update(template["tech_stack"])
+        for profile in self.mentor_profiles:
+            names.update(profile["expertise_areas"])
+        return sorted(names)
+    
+    def populate_at_scale(self, num_interns, num_projects, num_mentors, seed=42, chunk_size=10000,
+                          workers=None, output="database", output_dir="sample_data_out"):
+        """
+        Deterministic load-test dataset generator.
+        Rows are produced in fixed-size chunks by worker processes, each chunk seeded from
+        (seed, table, chunk index), so the same seed and chunk_size always give the same data.
+        Output goes to the database as chunked bulk inserts, or to CSV/Parquet files;
+        at most 2 * workers chunks are held in memory at once.
+        """
+        workers = workers or os.cpu_count() or 1
+        
+        if output == "database":
+            self.clear_database()
+            skill_ids = self._ensure_skills()
+            sink = _DatabaseSink()
+        elif output in ("csv", "parquet"):
+            skill_ids = {normalize_skill_name(name): i + 1 for i, name in enumerate(self.skill_vocabulary())}
+            sink = _FileSink(output_dir, output)
+            sink.write({"skills": [
+                {"id": skill_id, "name": name, "display_name": name} for name, skill_id in skill_ids.items()
+            ]})
+        else:
+            raise ValueError(f"Unknown output '{output}' (expected database, csv or parquet)")
+        
+        tasks = []
+        for kind, total in (("intern", num_interns), ("project", num_projects), ("mentor", num_mentors)):
+            for chunk_index, start in enumerate(range(0, total, chunk_size)):
+                tasks.append((kind, chunk_index, start + 1, min(chunk_size, total - start), seed, skill_ids))
+        
+        print(f"🏭 Generating {num_interns} interns, {num_projects} projects, {num_mentors} mentors "
+              f"in {len(tasks)} chunks on {workers} workers...")
+        
+        try:
+            if workers <= 1:
+                for task in tasks:
+                    sink.write(_generate_chunk(task))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    pending = deque()
+                    for task in tasks:
+                        pending.append(executor.submit(_generate_chunk, task))
+                        if len(pending) >= workers * 2:
+                            sink.write(pending.popleft().result())
+                    while pending:
+                        sink.write(pending.popleft().result())
+        finally:
+            sink.close()
+        
+        if output == "database" and report_counters_enabled():
+            rebuild_report_counters()
+        
+        print("✅ Scaled sample data generation completed!")
+        
+        return {
+            "interns_created": num_interns,
+            "projects_created": num_projects,
+            "mentors_created": num_mentors,
+            "yojana_compliance_records": num_interns
+        }
+    
+    def _ensure_skills(self):
+        skills = {skill.name: skill for skill in Skill.query.all()}
+        for name in self.skill_vocabulary():
+            key = normalize_skill_name(name)
+            if key not in skills:
+                skills[key] = Skill(name=key, display_name=name)
+                db.session.add(skills[key])
+        db.session.commit()
+        return {key: skill.id for key, skill in skills.items()}
+    
     def generate_demo_scenario(self):
         """Generate specific demo scenario for hackathon presentation"""
         
@@ -440,6 +548,168 @@ class PMYojanaSampleDataGenerator:
         
         return demo_interns
 
+_worker_generator = None
+
+def _generate_chunk(task):
+    """Worker: build the table rows for one chunk of ids"""
+    global _worker_generator
+    kind, chunk_index, start_id, count, seed, skill_ids = task
+    
+    if _worker_generator is None:
+        _worker_generator = PMYojanaSampleDataGenerator()
+    generator = _worker_generator
+    rng = random.Random(f"{seed}:{kind}:{chunk_index}")
+    
+    def links(names, owner_column, owner_id, level_column=None):
+        rows = {}
+        for name, level in names.items():
+            skill_id = skill_ids[normalize_skill_name(name)]
+            row = {owner_column: owner_id, "skill_id": skill_id}
+            if level_column:
+                row[level_column] = level
+            rows[skill_id] = row
+        return list(rows.values())
+    
+    tables = {}
+    for record_id in range(start_id, start_id + count):
+        if kind == "intern":
+            data = generator.generate_realistic_intern(record_id - 1, rng)
+            tables.setdefault("interns", []).append({
+                "id": record_id,
+                "name": data["name"],
+                "email": data["email"],
+                "phone": data["phone"],
+                "college": data["college"],
+                "branch": data["branch"],
+                "year": data["year"],
+                "cgpa": data["cgpa"],
+                "skills": json.dumps(data["skills"]),
+                "interests": json.dumps(data["interests"]),
+                "preferences": json.dumps(data["preferences"]),
+                "availability": json.dumps(data["availability"]),
+                "aadhar_number": data["aadhar_number"],
+                "application_id": data["application_id"],
+                "category": data["category"],
+                "state": data["state"]
+            })
+            tables.setdefault("intern_skill", []).extend(
+                links(data["skills"], "intern_id", record_id, "proficiency")
+            )
+            tables.setdefault("yojana_compliance", []).append({
+                "intern_id": record_id,
+                "documents_verified": rng.choice([True, False]),
+                "eligibility_confirmed": rng.choice([True, False]),
+                "background_check": rng.choice([True, False]),
+                "attendance_percentage": rng.uniform(70, 95),
+                "weekly_reports_submitted": rng.randint(0, 12)
+            })
+        elif kind == "project":
+            template = rng.choice(generator.project_templates)
+            data = generator.generate_realistic_project(template, record_id - 1, rng)
+            tables.setdefault("projects", []).append({
+                "id": record_id,
+                "title": data["title"],
+                "description": data["description"],
+                "department": data["department"],
+                "organization": data["organization"],
+                "required_skills": json.dumps(data["required_skills"]),
+                "preferred_skills": json.dumps({}),
+                "difficulty_level": data["difficulty_level"],
+                "estimated_hours": data["estimated_hours"],
+                "duration_weeks": data["duration_weeks"],
+                "tech_stack": json.dumps(data["tech_stack"]),
+                "project_type": data["project_type"],
+                "remote_allowed": data["remote_allowed"],
+                "max_interns": data["max_interns"],
+                "yojana_approved": data["yojana_approved"],
+                "stipend_amount": data["stipend_amount"],
+                "certificate_provided": True
+            })
+            tables.setdefault("project_skill", []).extend(
+                links(data["required_skills"], "project_id", record_id, "required_level")
+            )
+            tables.setdefault("project_tech", []).extend(
+                links(dict.fromkeys(data["tech_stack"]), "project_id", record_id)
+            )
+        else:
+            profile = generator.mentor_profiles[(record_id - 1) % len(generator.mentor_profiles)]
+            data = generator.generate_realistic_mentor(profile, record_id - 1, rng)
+            tables.setdefault("mentors", []).append({
+                "id": record_id,
+                "name": data["name"],
+                "email": data["email"],
+                "designation": data["designation"],
+                "organization": data["organization"],
+                "experience_years": data["experience_years"],
+                "expertise_areas": json.dumps(data["expertise_areas"]),
+                "mentoring_style": data["mentoring_style"],
+                "max_interns": data["max_interns"],
+                "availability": json.dumps(data["availability"]),
+                "rating": data["rating"],
+                "total_mentored": data["total_mentored"],
+                "success_rate": data["success_rate"]
+            })
+            tables.setdefault("mentor_expertise", []).extend(
+                links(dict.fromkeys(data["expertise_areas"]), "mentor_id", record_id)
+            )
+    
+    return tables
+
+class _DatabaseSink:
+    """Chunked Core bulk inserts (no ORM objects); parent tables are written first"""
+    
+    def write(self, tables):
+        for name, rows in tables.items():
+            if rows:
+                db.session.execute(db.metadata.tables[name].insert(), rows)
+        db.session.commit()
+    
+    def close(self):
+        pass
+
+class _FileSink:
+    """Append each table's rows to its own CSV or Parquet file"""
+    
+    def __init__(self, output_dir, file_format):
+        if file_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.writers = {}
+    
+    def write(self, tables):
+        for name, rows in tables.items():
+            if not rows:
+                continue
+            
+            if self.file_format == "csv":
+                if name not in self.writers:
+                    f = open(os.path.join(self.output_dir, f"{name}.csv"), "w", newline="", encoding="utf-8")
+                    writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+                    writer.writeheader()
+                    self.writers[name] = (f, writer)
+                self.writers[name][1].writerows(rows)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                
+                table = pa.Table.from_pylist(rows)
+                if name not in self.writers:
+                    self.writers[name] = pq.ParquetWriter(os.path.join(self.output_dir, f"{name}.parquet"), table.schema)
+                self.writers[name].write_table(table.cast(self.writers[name].schema))
+    
+    def close(self):
+        for writer in self.writers.values():
+            if self.file_format == "csv":
+                writer[0].close()
+            else:
+                writer.close()
+
 class YojanaIntegrationHelper:
     """
     Helper class for PM Internship Yojana integration features
@@ -479,8 +749,12 @@ class YojanaIntegrationHelper:
         return recommendations
     
     @staticmethod
-    def generate_yojana_certificate(intern, project, mentor, allocation):
+    def generate_yojana_certificate(intern, project, mentor, allocation, skills_developed=None):
         """Generate PM Internship Yojana completion certificate data"""
+        # Batch callers pass the skills pre-parsed once per project
+        if skills_developed is None:
+            skills_developed = list(json.loads(project.required_skills).keys()) if project.required_skills else []
+        
         certificate_data = {
             "certificate_id": f"PM-CERT-{allocation.id}-{datetime.now().year}",
             "intern_name": intern.name,
@@ -490,7 +764,7 @@ class YojanaIntegrationHelper:
             "start_date": allocation.start_date.strftime("%d/%m/%Y") if allocation.start_date else "TBD",
             "completion_date": (allocation.start_date + timedelta(weeks=project.duration_weeks)).strftime("%d/%m/%Y") if allocation.start_date else "TBD",
             "duration_weeks": project.duration_weeks,
-            "skills_developed": list(json.loads(project.required_skills).keys()) if project.required_skills else [],
+            "skills_developed": skills_developed,
             "performance_rating": allocation.project_rating or 0,
             "issued_date": datetime.now().strftime("%d/%m/%Y"),
             "authority": "Prime Minister's Office - Internship Yojana",
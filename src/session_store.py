@@ -0,0 +1,232 @@
+"""
+Bounded store for real-time monitoring sessions
+Sessions are kept in memory in LRU order and evicted when they outlive their
+TTL, exceed the session cap or push the estimated footprint over the memory
+budget. With a spill path configured, sessions are also written to SQLite so
+evicted sessions can be reloaded, survive restarts and be read by other
+worker processes. Reads are written back to SQLite at most every
+`sync_interval` seconds per session (with the payload if it changed), so a
+session in use by one process never looks expired to the others.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class SessionStore:
+    """
+    Dict-like session container (`in`, `get`, `[]`, `len`, iteration) with
+    TTL + LRU eviction and a memory budget. `serialize`/`deserialize` convert
+    a session to and from JSON-compatible data for the SQLite tier, and
+    `size_of` estimates a session's in-memory footprint in bytes.
+    """
+
+    def __init__(self, max_sessions=100, ttl_seconds=3600, memory_budget_bytes=64 * 1024 * 1024,
+                 spill_path=None, serialize=None, deserialize=None, size_of=None, sync_interval=None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # Must stay well under the TTL so the spilled row is refreshed before it expires
+        self.sync_interval = min(ttl_seconds / 4, 60) if sync_interval is None else sync_interval
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_path = spill_path
+        self.serialize = serialize or (lambda session: session)
+        self.deserialize = deserialize or (lambda data: data)
+        self.size_of = size_of or (lambda session: 0)
+
+        self.evictions = 0
+        self._lock = threading.RLock()
+        # session_id -> [session, last_access, size, dirty, last_access as spilled]
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+        if spill_path:
+            with self._connection() as connection:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS monitoring_sessions ('
+                    'session_id TEXT PRIMARY KEY, payload TEXT NOT NULL, last_access REAL NOT NULL)'
+                )
+
+    # Mapping interface
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def __getitem__(self, session_id):
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id, session):
+        self.put(session_id, session)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._entries))
+
+    def items(self):
+        with self._lock:
+            return [(session_id, entry[0]) for session_id, entry in self._entries.items()]
+
+    def get(self, session_id, default=None):
+        now = time.time()
+        writes = []
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                if now - entry[1] > self.ttl_seconds:
+                    self._drop(session_id)
+                    entry = None
+                else:
+                    entry[1] = now
+                    self._entries.move_to_end(session_id)
+                    writes = self._due_sync(session_id, entry, now)
+                    session = entry[0]
+
+        if entry is None:
+            # Miss in memory: another process, an earlier run or an eviction may have spilled it
+            loaded = self._load(session_id, now)
+            if loaded is None:
+                return default
+            session, spilled_access = loaded
+
+            with self._lock:
+                entry = self._entries.get(session_id)
+                if entry is None:
+                    writes = self._insert(session_id, session, now, dirty=False, synced=spilled_access)
+                    entry = self._entries.get(session_id)
+                    if entry is not None:
+                        writes += self._due_sync(session_id, entry, now)
+                else:
+                    session = entry[0]
+
+        self._write(writes)
+        return session
+
+    def put(self, session_id, session):
+        now = time.time()
+        with self._lock:
+            if session_id in self._entries:
+                self._drop(session_id)
+            writes = self._insert(session_id, session, now, dirty=False, synced=now)
+        self._write([(session_id, session, now)] + writes)
+
+    def mark_dirty(self, session_id):
+        """Flag an in-memory session as changed since it was last spilled"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                entry[3] = True
+
+    def flush(self):
+        """Write every changed session, and every read not yet written back, to the spill tier"""
+        with self._lock:
+            writes = [self._sync(session_id, entry) for session_id, entry in self._entries.items()
+                      if entry[3] or entry[1] > entry[4]]
+        self._write(writes)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._entries),
+                'estimated_bytes': self._bytes,
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'evictions': self.evictions,
+                'spill_enabled': bool(self.spill_path)
+            }
+
+    # Internals (callers hold self._lock). Spill writes are returned as
+    # (session_id, session or None, last_access) for _write, which callers run
+    # after releasing the lock; None means only last_access changed.
+
+    def _insert(self, session_id, session, now, dirty, synced):
+        size = self.size_of(session)
+        self._entries[session_id] = [session, now, size, dirty, synced]
+        self._bytes += size
+        return self._evict(now)
+
+    def _sync(self, session_id, entry):
+        write = (session_id, entry[0] if entry[3] else None, entry[1])
+        entry[3] = False
+        entry[4] = entry[1]
+        return write
+
+    def _due_sync(self, session_id, entry, now):
+        if not self.spill_path or now - entry[4] < self.sync_interval:
+            return []
+        return [self._sync(session_id, entry)]
+
+    def _drop(self, session_id):
+        entry = self._entries.pop(session_id)
+        self._bytes -= entry[2]
+        return entry
+
+    def _evict(self, now):
+        # Least recently used first; expired sessions are always at the front
+        writes = []
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            expired = now - entry[1] > self.ttl_seconds
+            over_limit = len(self._entries) > self.max_sessions or (
+                self._bytes > self.memory_budget_bytes and len(self._entries) > 1)
+            if not (expired or over_limit):
+                return writes
+
+            self._drop(session_id)
+            self.evictions += 1
+            if self.spill_path and not expired and (entry[3] or entry[1] > entry[4]):
+                writes.append(self._sync(session_id, entry))
+        return writes
+
+    # SQLite spill tier
+
+    @contextmanager
+    def _connection(self):
+        connection = sqlite3.connect(self.spill_path, timeout=5)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _write(self, writes):
+        if not (self.spill_path and writes):
+            return
+        rows = [(session_id, json.dumps(self.serialize(session)), last_access)
+                for session_id, session, last_access in writes if session is not None]
+        touches = [(last_access, session_id) for session_id, session, last_access in writes if session is None]
+        with self._connection() as connection:
+            # MAX: another process may have read (and written back) the session more recently
+            connection.executemany(
+                'INSERT INTO monitoring_sessions (session_id, payload, last_access) VALUES (?, ?, ?) '
+                'ON CONFLICT(session_id) DO UPDATE SET payload = excluded.payload, '
+                'last_access = MAX(last_access, excluded.last_access)',
+                rows
+            )
+            connection.executemany(
+                'UPDATE monitoring_sessions SET last_access = MAX(last_access, ?) WHERE session_id = ?',
+                touches
+            )
+            # Expired sessions are purged here rather than by a background sweeper. Every
+            # process writes back reads within sync_interval, so rows older than the TTL
+            # are not in use anywhere.
+            connection.execute('DELETE FROM monitoring_sessions WHERE last_access < ?', (time.time() - self.ttl_seconds,))
+
+    def _load(self, session_id, now):
+        if not self.spill_path:
+            return None
+        with self._connection() as connection:
+            row = connection.execute(
+                'SELECT payload, last_access FROM monitoring_sessions WHERE session_id = ? AND last_access >= ?',
+                (session_id, now - self.ttl_seconds)
+            ).fetchone()
+        return (self.deserialize(json.loads(row[0])), row[1]) if row else None
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the app's modules (`src.*`, `app`) the same way the servers do, from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from src.admission import ADMITTED, QUEUED, REJECTED, TIMED_OUT, ConcurrencyLimiter
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached'
+        time.sleep(0.001)
+
+
+def queue_up(limiter, outcomes, name):
+    thread = threading.Thread(target=lambda: outcomes.append((name, limiter.acquire())))
+    waiting = limiter.waiting
+    thread.start()
+    wait_until(lambda: limiter.waiting == waiting + 1)
+    return thread
+
+
+def test_released_slot_goes_to_the_waiter_not_a_new_arrival():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=4, queue_timeout=0.2)
+    assert limiter.acquire() == ADMITTED
+    outcomes = []
+    waiter = queue_up(limiter, outcomes, 'waiter')
+
+    limiter.release()
+
+    # Arrives before the woken waiter runs; it must queue behind it, not take the slot
+    assert not limiter.try_acquire()
+    assert limiter.acquire() == TIMED_OUT
+    waiter.join()
+    assert outcomes == [('waiter', QUEUED)]
+    assert limiter.active == 1 and limiter.waiting == 0
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=4, queue_timeout=5)
+    limiter.acquire()
+    outcomes = []
+    threads = [queue_up(limiter, outcomes, name) for name in ('a', 'b', 'c')]
+
+    for thread in threads:
+        limiter.release()
+        thread.join()
+
+    assert [name for name, _ in outcomes] == ['a', 'b', 'c']
+    assert all(outcome == QUEUED for _, outcome in outcomes)
+
+
+def test_full_queue_rejects_and_slow_queue_times_out():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    limiter.acquire()
+    outcomes = []
+    waiter = queue_up(limiter, outcomes, 'waiter')
+
+    assert limiter.acquire() == REJECTED
+    waiter.join()
+
+    assert outcomes == [('waiter', TIMED_OUT)]
+    assert limiter.active == 1 and limiter.waiting == 0
+    limiter.release()
+    assert limiter.try_acquire()
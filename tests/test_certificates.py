@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from src.certificates import _render_chunk
+
+
+def row(allocation_id, project_id, required_skills):
+    return {
+        'allocation': {'id': allocation_id, 'start_date': datetime(2026, 1, 5), 'project_rating': 4.5,
+                       'match_score': 82.0, 'mentor_feedback': 'Strong work', 'status': 'completed'},
+        'intern': {'name': 'Asha', 'application_id': f'PMIY{allocation_id}', 'college': 'IIT',
+                   'category': 'General', 'state': 'Delhi'},
+        'project': {'id': project_id, 'title': 'Dashboards', 'organization': 'Acme',
+                    'duration_weeks': 12, 'required_skills': required_skills},
+        'mentor': {'name': 'Ravi'},
+        'compliance': None
+    }
+
+
+def test_malformed_skills_fail_only_their_own_rows():
+    records = _render_chunk([
+        row(1, 10, '{"python": 3}'),
+        row(2, 20, 'not json'),
+        row(3, 10, '{"python": 3}')
+    ])
+
+    assert [record['allocation_id'] for record in records] == [1, 2, 3]
+    assert 'error' in records[1]
+    assert 'certificate' in records[0] and 'certificate' in records[2]
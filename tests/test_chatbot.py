@@ -0,0 +1,37 @@
+from src.allocation_engine import AllocationChatBot
+
+
+class FakeFeatureStore:
+    def __init__(self):
+        self.summaries = 0
+        self.current_version = 1
+
+    def version(self):
+        return self.current_version
+
+    def score_summary(self):
+        self.summaries += 1
+        return {'allocations': 4, 'average_match_score': 72.5, 'high_confidence': 3, 'at_risk': 1}
+
+
+def test_success_answer_reports_match_score_under_its_own_name():
+    chatbot = AllocationChatBot(None, feature_store=FakeFeatureStore())
+
+    answer = chatbot.process_query('What is the success rate?')
+
+    assert answer['intent'] == 'success'
+    assert answer['data']['average_match_score'] == 72.5
+    assert 'success_rate' not in answer['data']
+
+
+def test_answers_are_cached_per_allocation_version():
+    store = FakeFeatureStore()
+    chatbot = AllocationChatBot(None, feature_store=store)
+
+    chatbot.process_query('What is the success rate?')
+    chatbot.process_query('What is the success rate?')
+    assert store.summaries == 1
+
+    store.current_version = 2
+    chatbot.process_query('What is the success rate?')
+    assert store.summaries == 2
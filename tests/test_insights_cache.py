@@ -0,0 +1,25 @@
+from src.allocation_engine import AIInsightsGenerator
+
+
+def allocation(success_probability):
+    return {'success_probability': success_probability, 'skill_match': 60.0, 'preference_match': 70.0,
+            'intern_id': 1, 'project_id': 1, 'final_score': 65.0}
+
+
+def test_empty_input_is_not_memoized():
+    generator = AIInsightsGenerator()
+    generator.generate_advanced_insights([], batch_id='batch', memoize=True)
+    insights = generator.generate_advanced_insights([allocation(80.0)], batch_id='batch', memoize=True)
+
+    assert generator.cache_hits == 0
+    assert insights['performance_prediction'] != generator.generate_advanced_insights([])['performance_prediction']
+
+
+def test_caller_supplied_allocations_bypass_the_batch_cache():
+    generator = AIInsightsGenerator()
+    server_side = generator.generate_advanced_insights([allocation(80.0)], batch_id='batch', memoize=True)
+    supplied = generator.generate_advanced_insights([allocation(10.0)], batch_id='batch')
+
+    assert supplied is not server_side
+    assert generator.generate_advanced_insights([allocation(80.0)], batch_id='batch', memoize=True) is server_side
+    assert generator.cache_hits == 1
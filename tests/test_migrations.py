@@ -0,0 +1,49 @@
+import pytest
+import sqlalchemy as sa
+from flask import Flask
+
+from src.database import (COMPLIANCE_BACKUP_TABLE, SchemaMigrationError, configure_database,
+                          deduplicate_compliance, init_database, migrate_schema)
+from src.models import db
+
+
+@pytest.fixture
+def legacy_database(tmp_path):
+    """A database from before the unique compliance index, with two rows for intern 7"""
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'legacy.db'}")
+    init_database(app, db)
+    with app.app_context():
+        migrate_schema(db)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('DROP INDEX ix_yojana_compliance_intern_id')
+            for intern_id, attendance in ((7, 60.0), (7, 90.0), (8, 75.0)):
+                connection.exec_driver_sql(
+                    'INSERT INTO yojana_compliance (intern_id, attendance_percentage) VALUES (?, ?)',
+                    (intern_id, attendance))
+        yield
+
+
+def count(table):
+    with db.engine.connect() as connection:
+        return connection.execute(sa.text(f'SELECT COUNT(*) FROM {table}')).scalar()
+
+
+def test_migration_refuses_to_drop_duplicate_compliance_rows(legacy_database):
+    with pytest.raises(SchemaMigrationError, match='intern_id 7,'):
+        migrate_schema(db)
+
+    assert count('yojana_compliance') == 3
+
+
+def test_explicit_deduplication_backs_up_removed_rows(legacy_database):
+    assert deduplicate_compliance(db) == 1
+    migrate_schema(db)
+
+    with db.engine.connect() as connection:
+        kept = connection.execute(sa.text(
+            'SELECT attendance_percentage FROM yojana_compliance WHERE intern_id = 7')).scalar()
+        backed_up = connection.execute(sa.text(
+            f'SELECT attendance_percentage FROM {COMPLIANCE_BACKUP_TABLE}')).scalars().all()
+    assert kept == 90.0 and backed_up == [60.0]
+    assert 'ix_yojana_compliance_intern_id' in {index['name'] for index in sa.inspect(db.engine).get_indexes('yojana_compliance')}
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from src.portal_allotment import AllotmentService
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+
+class FakeEngine:
+    """Allots each candidate the first internship after a short pause"""
+
+    def generate_optimal_allocation(self, interns, projects, mentors, constraints=None):
+        time.sleep(float(os.environ.get('FAKE_ENGINE_SECONDS', 0)))
+        allocations = [{'intern_id': intern.id, 'project_id': projects[0].id, 'final_score': 80.0}
+                       for intern in interns]
+        return {'allocations': allocations, 'processing_time': 0.0, 'average_score': 80.0,
+                'algorithm_version': 'fake'}
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    # The job runs in a child process, which imports FakeEngine from this module
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(filter(None, [TESTS, os.environ.get('PYTHONPATH')])))
+    candidates = pd.DataFrame([{'candidate_id': 101, 'candidate_name': 'A',
+                                'resume': 'Seeking opportunity in Pune. My CGPA is 8.1. I have skills in Python'}])
+    internships = pd.DataFrame([{'internship_id': 7, 'Company_name': 'Acme', 'job_title': 'Intern',
+                                 'job_description': 'Intern in Pune. minimum CGPA 7. Required skills: Python'}])
+    return candidates, internships
+
+
+def wait_for(service, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.status()['job']
+        if job['status'] != 'running':
+            return job
+        time.sleep(0.1)
+    raise AssertionError('allocation job did not finish')
+
+
+def test_job_is_shared_by_every_process_and_runs_once(tmp_path, frames, monkeypatch):
+    monkeypatch.setenv('FAKE_ENGINE_SECONDS', '1')
+    results = str(tmp_path / 'allotments.json')
+    worker_a = AllotmentService(FakeEngine, results_path=results)
+    worker_b = AllotmentService(FakeEngine, results_path=results, refresh_seconds=0)
+
+    job, started = worker_a.start(*frames)
+    again, started_again = worker_b.start(*frames)
+
+    assert started and not started_again
+    assert again['job_id'] == job['job_id']
+    assert worker_b.status()['job']['status'] == 'running'
+
+    finished = wait_for(worker_b)
+    assert finished['status'] == 'completed' and finished['finished_at']
+    assert worker_b.lookup(101)['internship_id'] == 7
+
+
+def test_failed_run_is_recorded(tmp_path, frames):
+    service = AllotmentService(FakeEngine, results_path=str(tmp_path / 'allotments.json'))
+
+    service.start(None, None)
+
+    job = wait_for(service)
+    assert job['status'] == 'failed' and job['error'] == 'Data not loaded'
@@ -0,0 +1,32 @@
+import asyncio
+import threading
+
+from src.pubsub import AsyncSubscription, EventBroker
+
+
+def test_async_subscription_receives_from_other_threads():
+    broker = EventBroker()
+
+    async def scenario():
+        subscription = broker.subscribe('session', loop=asyncio.get_running_loop())
+        threading.Thread(target=broker.publish, args=('session', {'n': 1})).start()
+        message = await subscription.get(timeout=5)
+        subscription.close()
+        return message
+
+    assert asyncio.run(scenario()) == {'n': 1}
+    assert broker.subscriber_count() == 0
+
+
+def test_async_subscription_drops_oldest_when_full():
+    broker = EventBroker()
+
+    async def scenario():
+        subscription = AsyncSubscription(broker, 'session', asyncio.get_running_loop(), maxsize=2)
+        for n in range(3):
+            subscription.deliver(n)
+        await asyncio.sleep(0)
+        return [await subscription.get(timeout=1) for _ in range(2)], subscription.dropped, \
+            await subscription.get(timeout=0.01)
+
+    assert asyncio.run(scenario()) == ([1, 2], 1, None)
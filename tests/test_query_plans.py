@@ -0,0 +1,36 @@
+import pytest
+from flask import Flask
+
+from src.database import configure_database, explain_query_plan, init_database, migrate_schema
+from src.models import ACTIVE_ALLOCATION_STATUSES, Allocation, Intern, Project, db
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'plans.db'}")
+    init_database(app, db)
+    with app.app_context():
+        migrate_schema(db)
+        yield
+
+
+def unallocated(model, column):
+    # The anti-joins generate_allocations uses to find free interns and projects
+    allocated = db.session.query(Allocation.id).filter(
+        Allocation.status.in_(ACTIVE_ALLOCATION_STATUSES),
+        column == model.id
+    ).exists()
+    return model.query.filter(~allocated).statement
+
+
+def test_unallocated_interns_use_status_intern_index(app_context):
+    plan = explain_query_plan(db, unallocated(Intern, Allocation.intern_id))
+
+    assert any('ix_allocations_status_intern_id' in line for line in plan), plan
+
+
+def test_unallocated_projects_use_status_project_index(app_context):
+    plan = explain_query_plan(db, unallocated(Project, Allocation.project_id))
+
+    assert any('ix_allocations_status_project_id' in line for line in plan), plan
@@ -0,0 +1,22 @@
+from src.allocation_engine import SessionMetrics
+
+
+def allocation(success_probability, skill_match=50.0, final_score=50.0):
+    return {'final_score': final_score, 'skill_match': skill_match, 'success_probability': success_probability}
+
+
+def test_success_probability_bins_on_percent_scale():
+    metrics = SessionMetrics([allocation(p) for p in (20, 45, 65, 88)])
+
+    distribution = metrics.summary()['success_probability_distribution']
+
+    assert distribution['counts'] == [0, 0, 1, 0, 1, 0, 1, 0, 1, 0]
+    assert distribution['bin_edges'][0] == 0 and distribution['bin_edges'][-1] == 100
+
+
+def test_remove_takes_allocation_out_of_its_bin():
+    metrics = SessionMetrics([allocation(20), allocation(88)])
+    metrics.remove(allocation(88))
+
+    assert metrics.summary()['success_probability_distribution']['counts'][8] == 0
+    assert metrics.summary()['success_probability']['count'] == 1
@@ -0,0 +1,69 @@
+from src import session_store
+from src.session_store import SessionStore
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def stores(tmp_path, monkeypatch, **options):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, 'time', clock.time)
+    path = str(tmp_path / 'sessions.db')
+    # Two stores on one spill file stand in for two worker processes
+    return clock, SessionStore(spill_path=path, ttl_seconds=100, **options), SessionStore(spill_path=path, ttl_seconds=100, **options)
+
+
+def test_reads_keep_spilled_session_live_for_other_processes(tmp_path, monkeypatch):
+    clock, first, second = stores(tmp_path, monkeypatch)
+    first['a'] = {'n': 1}
+
+    for _ in range(6):
+        clock.now += 30
+        assert first.get('a') == {'n': 1}
+
+    # 180s after it was written, but read every 30s by the first process
+    assert second.get('a') == {'n': 1}
+
+
+def test_spill_purge_keeps_sessions_read_elsewhere(tmp_path, monkeypatch):
+    clock, first, second = stores(tmp_path, monkeypatch)
+    first['a'] = {'n': 1}
+    for _ in range(4):
+        clock.now += 30
+        first.get('a')
+
+    second['b'] = {'n': 2}  # spilling purges rows past the TTL
+    first._entries.clear()
+
+    assert first.get('a') == {'n': 1}
+
+
+def test_dirty_sessions_reach_other_processes_without_eviction(tmp_path, monkeypatch):
+    clock, first, second = stores(tmp_path, monkeypatch)
+    first['a'] = {'n': 1}
+    first['a']['n'] = 2
+    first.mark_dirty('a')
+
+    clock.now += 30
+    first.get('a')
+
+    assert second.get('a') == {'n': 2}
+
+
+def test_eviction_spills_outside_the_lock(tmp_path, monkeypatch):
+    clock, first, _ = stores(tmp_path, monkeypatch, max_sessions=1)
+    held = []
+    write = first._write
+    monkeypatch.setattr(first, '_write', lambda writes: (held.append(first._lock._is_owned()), write(writes)))
+
+    first['a'] = {'n': 1}
+    first.mark_dirty('a')
+    first['b'] = {'n': 2}
+
+    assert held and not any(held)
+    assert first.get('a') == {'n': 1}
@@ -0,0 +1,59 @@
+"""
+Production WSGI entry points for the PM Internship services
+Each factory loads its models and data once in the gunicorn master (preload_app),
+so forked workers share those pages copy-on-write instead of loading their own.
+
+    gunicorn -c gunicorn.conf.py "wsgi:create_recommendation_app()"
+    WEB_CONCURRENCY=1 gunicorn -c gunicorn.conf.py "wsgi:create_allocation_app()"
+
+The allocation app's real-time streams each hold a gthread thread here; serve
+it with `uvicorn allocation_asgi:app` when dashboards stream updates.
+
+Gunicorn needs fork() and runs on Linux/macOS; on Windows keep using
+`python recommendation_api.py` / `python app.py` for local serving.
+"""
+
+import gc
+import os
+
+
+def _freeze_heap():
+    # Collect once, then move every surviving object into the permanent generation.
+    # Workers' garbage collections then skip the preloaded model objects and do not
+    # write to (and so un-share) the pages inherited from the master.
+    gc.collect()
+    gc.freeze()
+
+
+def create_recommendation_app():
+    import recommendation_api
+
+    if recommendation_api.load_model_and_data():
+        print("📊 Model and data preloaded in master process")
+    else:
+        print("⚠️  Model/data failed to load; /ready will report 503")
+
+    _freeze_heap()
+    return recommendation_api.app
+
+
+def create_allocation_app():
+    from app import app, db
+    from src.database import migrate_schema
+
+    with app.app_context():
+        migrate_schema(db)
+        engines = list(db.engines.values())
+
+    # Connections opened in the master must never be used by a forked child
+    for engine in engines:
+        engine.dispose()
+
+    def reset_pools():
+        for engine in engines:
+            engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=reset_pools)
+
+    _freeze_heap()
+    return app